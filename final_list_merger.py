@@ -4,44 +4,49 @@ Final Listesi Birleştirme Aracı
 Excel dosyalarını birleştir
 """
 
-import customtkinter as ctk
-from tkinter import filedialog, messagebox, ttk
-from pathlib import Path
-import pandas as pd
-import threading
-import subprocess
 import sys
-import shutil
-from datetime import datetime
-import os
-import json
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 import time
 
-try:
-    from tkinterdnd2 import DND_FILES, TkinterDnD
-    HAS_DND = True
-except ImportError:
-    HAS_DND = False
+_START_TIME = time.perf_counter()
+_IMPORT_PROFILER = None
+if __name__ == '__main__' and ('--startup-profile' in sys.argv or '--startup-budget' in sys.argv):
+    # Profil, arayüz kütüphanelerinden önce kurulmalı
+    from startup_profile import ImportProfiler
+    _IMPORT_PROFILER = ImportProfiler()
+    _IMPORT_PROFILER.install()
 
-ctk.set_appearance_mode("light")
-ctk.set_default_color_theme("blue")
+from pathlib import Path
+import threading
+import queue
+import multiprocessing
+import os
+import json
 
-CURRENCY_SYMBOLS = {
-    'EUR': '€', 'USD': '$', 'GBP': '£', 'TRY': '₺', 'JPY': '¥', 'CNY': '¥',
+from merger_engine import (
+    HEAVY_MODULES, MEMORY_LIMIT_DEFAULT, STARTUP_BUDGET_SECONDS, MergeCancelled, MergeEngine, MergeError,
+    available_export_formats, get_script_dir, supported_extensions, warm_up_imports
+)
+from folder_watcher import WATCH_OUTPUT_NAME, FolderWatcher, describe_event
+from output_shards import SHARD_SIZE_DEFAULTS, create_sharded_output
+from scan_scheduler import ScanScheduler
+
+# Arayüz kütüphaneleri main()'de yüklenir (bkz. _import_gui): tarama ve parça
+# süreçleri spawn ile başlar ve bu dosyayı __mp_main__ olarak yeniden import eder
+ctk = filedialog = messagebox = ttk = None
+DND_FILES = TkinterDnD = None
+HAS_DND = False
+
+SETTINGS_FILE = get_script_dir() / '.merger_settings.json'
+SCAN_WORKERS = max(1, os.cpu_count() or 1)
+PROGRESS_TICK_MS = 100  # birleştirme ilerleme kuyruğunun okunma aralığı
+SHARD_LABELS = {  # parçalı çıktı seçenekleri (output_shards.SHARD_MODES)
+    'rows': f"{SHARD_SIZE_DEFAULTS['rows']:,} satırda bir".replace(',', '.'),
+    'orders': f"{SHARD_SIZE_DEFAULTS['orders']} siparişte bir",
+    'currency': "Para birimine göre",
+    'rfq': "RFQ referansına göre",
 }
 
 
-def _get_script_dir():
-    if getattr(sys, 'frozen', False):
-        return Path(sys.executable).parent
-    return Path(__file__).parent
-
-
-SETTINGS_FILE = _get_script_dir() / '.merger_settings.json'
-
-
 class Tooltip:
     """Widget üzerine gelince açıklama baloncuğu gösterir"""
     def __init__(self, widget, text):
@@ -93,28 +98,24 @@ class FinalListMerger:
         self.root = root
         self.uploaded_files = []
         self.file_item_counts = {}
+        self._tree_items = {}   # dosya yolu -> Treeview item id (satır ömrü boyunca sabit)
+        self._tree_paths = {}   # item id -> dosya yolu
+        self._total_items = 0   # taranmış dosyaların item toplamı
+        self._bloated_files = {}  # şişkin sayfalı dosya -> bildirilen boyut (ör. A1:XFD1048576)
         self.template_path = None
         self.output_path = None
         self.custom_output_dir = None
         self.is_processing = False
-        self._pulsing = False
+        self._progress_queue = queue.Queue()
+        self._cancel_event = threading.Event()
         self._all_buttons = []
+        self.engine = MergeEngine()
+        self._extensions = supported_extensions()
+        self._scanner = ScanScheduler(self.engine.parse_cache, self._report_item_count, SCAN_WORKERS)
+        self._watcher = None
 
         self._last_browse_dir = self._load_setting('last_browse_dir', '')
 
-        # Openpyxl stil objeleri (her satırda yeniden oluşturmamak için)
-        self._thin_border = Border(
-            left=Side(style='thin'), right=Side(style='thin'),
-            top=Side(style='thin'), bottom=Side(style='thin')
-        )
-        self._no_border = Border()
-        self._header_fill = PatternFill(start_color='3498DB', end_color='3498DB', fill_type='solid')
-        self._header_font = Font(bold=True, size=11, color='FFFFFF')
-        self._center_align = Alignment(horizontal='center', vertical='center')
-        self._data_align = Alignment(vertical='center', wrap_text=True)
-        self._bold_font = Font(bold=True, size=11)
-        self._right_align = Alignment(horizontal='right', vertical='center')
-
         self.setup_ui()
         self._setup_dnd()
 
@@ -157,14 +158,9 @@ class FinalListMerger:
 
     def _on_drop(self, event):
         files = self.root.tk.splitlist(event.data)
-        added = False
-        for file_path in files:
-            path = Path(file_path)
-            if path.suffix.lower() == '.xlsx' and path not in self.uploaded_files:
-                self.uploaded_files.append(path)
-                added = True
+        added = self._add_files(files)
         if added:
-            self._scan_and_update()
+            self._scan_and_update(added)
 
     # ── UI ───────────────────────────────────────────────────
 
@@ -235,11 +231,12 @@ class FinalListMerger:
         self.tree.column("items", anchor="center", width=120)
         self.tree.tag_configure('even', background='#F8FBFF')
         self.tree.tag_configure('odd', background='#FFFFFF')
+        self.tree.tag_configure('bloated', foreground='#E67E22')
 
-        scrollbar = ttk.Scrollbar(tree_frame, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self._tree_scrollbar = ttk.Scrollbar(tree_frame, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
         self.tree.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        self._tree_scrollbar.pack(side="right", fill="y")
 
         # BUTTONS
         btn_frame = ctk.CTkFrame(file_list_card, fg_color="#FFFFFF")
@@ -292,6 +289,19 @@ class FinalListMerger:
         Tooltip(btn_out, "Çıktı klasörü seç")
         Tooltip(btn_reset, "Varsayılana sıfırla")
 
+        self.watch_label = ctk.CTkLabel(
+            output_inner,
+            text="Klasör izlenmiyor",
+            font=("Segoe UI", 11),
+            text_color="#7F8C8D",
+            anchor="w"
+        )
+        self.watch_label.grid(row=1, column=0, sticky="ew", padx=(0, 10), pady=(8, 0))
+        self.watch_btn = ctk.CTkButton(output_inner, text="👁 İzle", command=self.toggle_watch, fg_color="#8E44AD", hover_color="#6C3483", text_color="white", font=("Segoe UI", 11, "bold"), width=125, corner_radius=8)
+        self.watch_btn.grid(row=1, column=1, columnspan=2, pady=(8, 0), sticky="e")
+        Tooltip(self.watch_btn, "Bir klasörü izle: dosyalar eklendikçe ya da değiştikçe\n"
+                                f"{WATCH_OUTPUT_NAME} arka planda güncellenir")
+
         # ── STATUS CARD ──
         status_card = self._create_card(content_frame, "⚙️ Durum")
         status_card.grid(row=3, column=0, sticky="ew", pady=(0, 20))
@@ -327,11 +337,86 @@ class FinalListMerger:
             command=lambda: self._save_setting('show_header_info', self.show_header_info_var.get())
         ).pack(anchor="w", pady=(5, 0))
 
+        self.streaming_reader_var = ctk.BooleanVar(value=self._load_setting('streaming_reader', False))
+        ctk.CTkCheckBox(
+            options_frame,
+            text="Hızlı okuma modu (TOTAL satırında durur)",
+            variable=self.streaming_reader_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('streaming_reader', self.streaming_reader_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
+        self.streaming_writer_var = ctk.BooleanVar(value=self._load_setting('streaming_writer', False))
+        ctk.CTkCheckBox(
+            options_frame,
+            text="Hızlı yazma modu (büyük listeler için, düşük bellek)",
+            variable=self.streaming_writer_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('streaming_writer', self.streaming_writer_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
+        self.bounded_memory_var = ctk.BooleanVar(value=self._load_setting('bounded_memory', False))
+        ctk.CTkCheckBox(
+            options_frame,
+            text=f"Düşük bellek modu (binlerce dosya için, en fazla ~{MEMORY_LIMIT_DEFAULT // (1024 * 1024)} MB)",
+            variable=self.bounded_memory_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('bounded_memory', self.bounded_memory_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
+        shard_frame = ctk.CTkFrame(options_frame, fg_color="transparent")
+        shard_frame.pack(anchor="w", pady=(5, 0))
+        self.shard_output_var = ctk.BooleanVar(value=self._load_setting('shard_output', False))
+        ctk.CTkCheckBox(
+            shard_frame,
+            text="Çıktıyı paralel yazılan parçalara böl:",
+            variable=self.shard_output_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('shard_output', self.shard_output_var.get())
+        ).pack(side="left")
+        shard_by = self._load_setting('shard_by', 'rows')
+        self.shard_by_var = ctk.StringVar(value=SHARD_LABELS.get(shard_by, SHARD_LABELS['rows']))
+        ctk.CTkOptionMenu(
+            shard_frame,
+            values=list(SHARD_LABELS.values()),
+            variable=self.shard_by_var,
+            font=("Segoe UI", 12),
+            width=190,
+            height=26,
+            command=lambda label: self._save_setting('shard_by', self._shard_mode())
+        ).pack(side="left", padx=(8, 0))
+
+        self._export_formats = available_export_formats()
+        self.export_items_var = ctk.BooleanVar(value=self._load_setting('export_items', False))
+        ctk.CTkCheckBox(
+            options_frame,
+            text=f"Item verisini ayrıca dışa aktar ({' / '.join(f.upper() for f in self._export_formats)})",
+            variable=self.export_items_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('export_items', self.export_items_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
+        self.show_timing_var = ctk.BooleanVar(value=self._load_setting('show_timing', False))
+        ctk.CTkCheckBox(
+            options_frame,
+            text="Birleştirme sonrası süre dökümünü göster (hata ayıklama)",
+            variable=self.show_timing_var,
+            font=("Segoe UI", 12),
+            text_color="#2C3E50",
+            command=lambda: self._save_setting('show_timing', self.show_timing_var.get())
+        ).pack(anchor="w", pady=(5, 0))
+
         # ── ACTION BUTTONS ──
         action_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
         action_frame.grid(row=5, column=0, sticky="ew", pady=(10, 0))
         action_frame.grid_columnconfigure(0, weight=1)
         action_frame.grid_columnconfigure(1, weight=1)
+        action_frame.grid_columnconfigure(2, weight=1)
 
         self.merge_btn = ctk.CTkButton(
             action_frame,
@@ -347,6 +432,32 @@ class FinalListMerger:
         )
         self.merge_btn.grid(row=0, column=0, sticky="ew", padx=(0, 10))
 
+        # Birleştirme sürerken merge butonunun yerini alır
+        self.cancel_btn = ctk.CTkButton(
+            action_frame,
+            text="⛔ İptal",
+            command=self.cancel_merge,
+            fg_color="#C0392B",
+            hover_color="#922B21",
+            text_color="white",
+            font=("Segoe UI", 14, "bold"),
+            height=50,
+            corner_radius=10
+        )
+
+        self.append_btn = ctk.CTkButton(
+            action_frame,
+            text="➕ Listeye Ekle",
+            command=self.append_files,
+            fg_color="#8E44AD",
+            hover_color="#6C3483",
+            text_color="white",
+            font=("Segoe UI", 14, "bold"),
+            height=50,
+            corner_radius=10
+        )
+        self.append_btn.grid(row=0, column=1, sticky="ew", padx=(0, 10))
+
         self.open_btn = ctk.CTkButton(
             action_frame,
             text="📄 Sonucu Aç",
@@ -359,17 +470,19 @@ class FinalListMerger:
             corner_radius=10,
             state="disabled"
         )
-        self.open_btn.grid(row=0, column=1, sticky="ew")
+        self.open_btn.grid(row=0, column=2, sticky="ew")
 
         Tooltip(self.drop_area, "Excel dosyalarını seçmek için tıkla")
         Tooltip(self.merge_btn, "Seçili dosyaları tek bir Excel'de birleştir")
+        Tooltip(self.append_btn, "Seçili dosyaları daha önce oluşturulmuş bir Final List'e ekle;\n"
+                                 "listedeki değişen siparişler de güncellenir")
         Tooltip(self.open_btn, "Oluşturulan birleştirilmiş dosyayı aç")
 
         # İşlem sırasında kilitlenecek butonlar
         self._all_buttons = [
             self.drop_area, btn_add, btn_del, btn_clear,
             btn_up, btn_down, btn_out, btn_reset,
-            self.merge_btn, self.open_btn
+            self.merge_btn, self.append_btn, self.open_btn
         ]
 
     def _create_card(self, parent, title):
@@ -385,54 +498,95 @@ class FinalListMerger:
         files = filedialog.askopenfilenames(
             title="Excel Dosyalarını Seçin",
             initialdir=initial_dir,
-            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+            filetypes=[("Excel files", " ".join(f"*{ext}" for ext in self._extensions)), ("All files", "*.*")]
         )
         if not files:
             return
-        added = False
-        for file_path in files:
-            path = Path(file_path)
-            if path.suffix.lower() == '.xlsx' and path not in self.uploaded_files:
-                self.uploaded_files.append(path)
-                added = True
+        added = self._add_files(files)
         # Son klasörü kaydet
         self._last_browse_dir = str(Path(files[0]).parent)
         self._save_setting('last_browse_dir', self._last_browse_dir)
         if added:
-            self._scan_and_update()
-
-    def _scan_and_update(self):
-        """Yeni eklenen dosyaları tara ve item sayısını göster"""
-        self.update_file_list()
-        threading.Thread(target=self._scan_worker, daemon=True).start()
-
-    def _scan_worker(self):
-        for f in list(self.uploaded_files):
-            if f not in self.file_item_counts:
-                data = self._extract_order_data(f)
-                self.file_item_counts[f] = len(data['data_rows']) if data else -1
-        self.root.after(0, self.update_file_list)
-
-    def update_file_list(self):
-        self.tree.delete(*self.tree.get_children())
-        for i, f in enumerate(self.uploaded_files):
-            count = self.file_item_counts.get(f)
-            if count is None:
-                status = "⏳ Taranıyor..."
-            elif count < 0:
-                status = "⚠️ Okunamadı"
-            else:
-                status = f"📊 {count} item"
-            tag = 'even' if i % 2 == 0 else 'odd'
-            self.tree.insert("", "end", values=(f.name, status), tags=(tag,))
+            self._scan_and_update(added)
 
+    def _add_files(self, files):
+        """Okunabilen yeni Excel dosyalarını listenin sonuna ekle, eklenenleri döndür"""
+        added = []
+        for file_path in files:
+            path = Path(file_path)
+            if path.suffix.lower() in self._extensions and path not in self._tree_items:
+                self.uploaded_files.append(path)
+                self._insert_row(path)
+                added.append(path)
+        return added
+
+    def _scan_and_update(self, files):
+        """Yeni eklenen dosyaları tarama kuyruğuna al ve item sayısını göster"""
+        self._update_summary()
+        self._sync_engine_options()
+        self._scanner.submit(files, self.engine.reader)
+
+    def _on_tree_scroll(self, first, last):
+        """Scrollbar'ı güncelle ve görünen satırları taramada öne al"""
+        self._tree_scrollbar.set(first, last)
+        count = len(self.uploaded_files)
+        top = int(float(first) * count)
+        bottom = min(count, int(float(last) * count) + 1)
+        self._scanner.set_visible(self.uploaded_files[top:bottom])
+
+    def _report_item_count(self, file_path, count, bloated):
+        """Tarama thread'inden: sonucu Tk thread'ine aktar (file_item_counts yalnızca orada değişir)"""
+        self.root.after(0, self._set_item_count, file_path, count, bloated)
+
+    def _set_item_count(self, file_path, count, bloated=None):
+        """Tek satırın durumunu ve item toplamını güncelle; şişkin sayfalı dosyayı işaretle"""
+        iid = self._tree_items.get(file_path)
+        if iid is None:  # tarama sürerken listeden kaldırıldı
+            return
+        self._total_items += max(count, 0) - max(self.file_item_counts.get(file_path, 0), 0)
+        self.file_item_counts[file_path] = count
+        if bloated:
+            self._bloated_files[file_path] = bloated
+            self.tree.item(iid, tags=self._row_tags(file_path, self.tree.index(iid)))
+        self.tree.item(iid, values=(file_path.name, self._status_text(count, bloated)))
+        self._update_summary()
+
+    @staticmethod
+    def _status_text(count, bloated=None):
+        if count is None:
+            return "⏳ Taranıyor..."
+        if count < 0:
+            return "⚠️ Okunamadı"
+        if bloated:
+            return f"📊 {count} item ⚠️"
+        return f"📊 {count} item"
+
+    def _row_tags(self, path, index):
+        """Satır rengi (sıraya göre) ve şişkin sayfa işareti"""
+        stripe = 'even' if index % 2 == 0 else 'odd'
+        return (stripe, 'bloated') if path in self._bloated_files else (stripe,)
+
+    def _insert_row(self, path):
+        index = len(self._tree_items)
+        iid = self.tree.insert("", "end", values=(path.name, self._status_text(self.file_item_counts.get(path))),
+                               tags=self._row_tags(path, index))
+        self._tree_items[path] = iid
+        self._tree_paths[iid] = path
+
+    def _restripe(self, start=0):
+        """Satır renklerini start indeksinden itibaren yeniden ata"""
+        children = self.tree.get_children()
+        for i in range(start, len(children)):
+            self.tree.item(children[i], tags=self._row_tags(self._tree_paths[children[i]], i))
+
+    def _update_summary(self):
         file_count = len(self.uploaded_files)
         if file_count > 0:
-            total = sum(c for c in self.file_item_counts.values() if c and c > 0)
-            self.status_label.configure(
-                text=f"✅ {file_count} dosya seçildi ({total} item)" if total else f"✅ {file_count} dosya seçildi",
-                text_color="#27AE60"
-            )
+            total = self._total_items
+            text = f"✅ {file_count} dosya seçildi ({total} item)" if total else f"✅ {file_count} dosya seçildi"
+            if self._bloated_files:
+                text += f" - ⚠️ {len(self._bloated_files)} dosyada şişkin sayfa (sadece veri alanı okunur)"
+            self.status_label.configure(text=text, text_color="#27AE60")
             self.merge_btn.configure(state="normal")
         else:
             self.status_label.configure(text="⏳ Dosya seçin", text_color="#7F8C8D")
@@ -443,38 +597,54 @@ class FinalListMerger:
         selected = self.tree.selection()
         if not selected:
             return
-        indices = sorted([self.tree.index(item) for item in selected], reverse=True)
-        for idx in indices:
-            if 0 <= idx < len(self.uploaded_files):
-                removed = self.uploaded_files.pop(idx)
-                self.file_item_counts.pop(removed, None)
-        self.update_file_list()
+        first = min(self.tree.index(iid) for iid in selected)
+        removed = set()
+        for iid in selected:
+            path = self._tree_paths.pop(iid)
+            del self._tree_items[path]
+            self._total_items -= max(self.file_item_counts.pop(path, 0), 0)
+            self._bloated_files.pop(path, None)
+            removed.add(path)
+        self._scanner.discard(removed)
+        self.tree.delete(*selected)
+        self.uploaded_files[:] = [f for f in self.uploaded_files if f not in removed]
+        self._restripe(first)
+        self._update_summary()
 
     def clear_all(self):
+        self._scanner.discard(self.uploaded_files)
+        self.tree.delete(*self.tree.get_children())
         self.uploaded_files.clear()
         self.file_item_counts.clear()
-        self.update_file_list()
+        self._tree_items.clear()
+        self._tree_paths.clear()
+        self._total_items = 0
+        self._bloated_files.clear()
+        self._update_summary()
         self.open_btn.configure(state="disabled")
 
     def move_up(self):
-        selected = self.tree.selection()
-        if not selected or len(selected) != 1:
-            return
-        idx = self.tree.index(selected[0])
-        if idx > 0:
-            self.uploaded_files[idx], self.uploaded_files[idx - 1] = self.uploaded_files[idx - 1], self.uploaded_files[idx]
-            self.update_file_list()
-            self.tree.selection_set(self.tree.get_children()[idx - 1])
+        self._move_selected(-1)
 
     def move_down(self):
+        self._move_selected(1)
+
+    def _move_selected(self, step):
+        """Tek seçili dosyayı komşusuyla yer değiştir"""
         selected = self.tree.selection()
         if not selected or len(selected) != 1:
             return
-        idx = self.tree.index(selected[0])
-        if idx < len(self.uploaded_files) - 1:
-            self.uploaded_files[idx], self.uploaded_files[idx + 1] = self.uploaded_files[idx + 1], self.uploaded_files[idx]
-            self.update_file_list()
-            self.tree.selection_set(self.tree.get_children()[idx + 1])
+        iid = selected[0]
+        idx = self.tree.index(iid)
+        new_idx = idx + step
+        if not 0 <= new_idx < len(self.uploaded_files):
+            return
+        self.uploaded_files[idx], self.uploaded_files[new_idx] = self.uploaded_files[new_idx], self.uploaded_files[idx]
+        neighbour = self.tree.prev(iid) if step < 0 else self.tree.next(iid)
+        self.tree.move(iid, "", new_idx)
+        self.tree.item(iid, tags=self._row_tags(self._tree_paths[iid], new_idx))
+        self.tree.item(neighbour, tags=self._row_tags(self._tree_paths[neighbour], idx))
+        self.tree.see(iid)
 
     # ── Çıktı Konumu ─────────────────────────────────────────
 
@@ -488,97 +658,235 @@ class FinalListMerger:
         self.custom_output_dir = None
         self.output_dir_label.configure(text="İlk dosyanın klasörü (varsayılan)", text_color="#7F8C8D")
 
+    # ── Klasör İzleme ────────────────────────────────────────
+
+    def toggle_watch(self):
+        """Klasör izlemeyi başlat ya da durdur"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+            self.watch_btn.configure(text="👁 İzle")
+            self.watch_label.configure(text="Klasör izlenmiyor", text_color="#7F8C8D")
+            return
+        folder = filedialog.askdirectory(
+            title="İzlenecek Klasörü Seçin",
+            initialdir=self._load_setting('watch_dir') or self._last_browse_dir or None
+        )
+        if not folder:
+            return
+        self._save_setting('watch_dir', folder)
+        # İzleme kendi thread'inde birleştirir; seçenekler başlarken sabitlenir
+        self._sync_engine_options()
+        engine = MergeEngine(
+            template_path=self.engine.template_path,
+            show_header_info=self.engine.show_header_info,
+            reader=self.engine.reader,
+            writer=self.engine.writer,
+            parse_cache=self.engine.parse_cache,
+            export_formats=self.engine.export_formats,
+            memory_limit=self.engine.memory_limit,
+        )
+        output_path = self.custom_output_dir / WATCH_OUTPUT_NAME if self.custom_output_dir else None
+        watcher = FolderWatcher(
+            engine, folder, output_path,
+            on_event=lambda event: self.root.after(0, self._show_watch_event, watcher, event)
+        )
+        self._watcher = watcher
+        watcher.start()
+        self.watch_btn.configure(text="⏹ İzlemeyi Durdur")
+        self.watch_label.configure(text=f"👁 İzleniyor: {self._watcher.folder}", text_color="#8E44AD")
+
+    def _show_watch_event(self, watcher, event):
+        """İzleme olayını etiketle göster (Tk thread'inde)"""
+        if watcher is not self._watcher:
+            return  # izleme durduruldu
+        color = {'waiting': "#F39C12", 'merging': "#F39C12", 'error': "#E74C3C"}.get(event['phase'], "#8E44AD")
+        if event['phase'] == 'merged':
+            color = "#E74C3C" if event['failed'] else "#27AE60"
+            if not self.is_processing:
+                self.output_path = event['output']
+                self.open_btn.configure(state="normal")
+        self.watch_label.configure(text=f"👁 {describe_event(event)}", text_color=color)
+
     # ── Birleştirme ──────────────────────────────────────────
 
-    def merge_files(self):
+    def merge_files(self, append_to=None):
         if self.is_processing:
             return
         self.is_processing = True
+        self._cancel_event.clear()
         self._lock_ui()
-        threading.Thread(target=self._merge_worker, daemon=True).start()
+        self.merge_btn.grid_remove()
+        self.cancel_btn.configure(state="normal", text="⛔ İptal")
+        self.cancel_btn.grid(row=0, column=0, sticky="ew", padx=(0, 10))
+        threading.Thread(target=self._merge_worker, args=(append_to,), daemon=True).start()
+        self.root.after(PROGRESS_TICK_MS, self._drain_progress)
+
+    def append_files(self):
+        """Seçili dosyaları daha önce oluşturulmuş bir Final List'e ekle"""
+        if self.is_processing:
+            return
+        if self.output_path:
+            initial_dir = self.output_path.parent
+        elif self.custom_output_dir:
+            initial_dir = self.custom_output_dir
+        else:
+            initial_dir = self.uploaded_files[0].parent if self.uploaded_files else None
+        path = filedialog.askopenfilename(
+            title="Eklenecek Final List'i Seçin",
+            initialdir=initial_dir,
+            filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")]
+        )
+        if path:
+            self.merge_files(append_to=Path(path))
 
-    def _check_write_permission(self, dir_path):
-        """Klasöre yazma izni olup olmadığını kontrol et"""
-        try:
-            test_file = dir_path / '.write_test_tmp'
-            test_file.touch()
-            test_file.unlink()
-            return True
-        except Exception:
-            return False
+    def cancel_merge(self):
+        """Birleştirmeyi bir sonraki dosya sınırında durdur"""
+        if self.is_processing:
+            self._cancel_event.set()
+            self.cancel_btn.configure(state="disabled", text="⏳ İptal ediliyor...")
 
-    def _is_file_locked(self, file_path):
-        """Dosyanın başka bir program tarafından kilitli olup olmadığını kontrol et"""
-        if not file_path.exists():
-            return False
-        try:
-            with open(file_path, 'r+b'):
-                return False
-        except (IOError, PermissionError):
-            return True
+    def _drain_progress(self):
+        """Birleştirme thread'inin ilerleme olaylarını Tk döngüsünde sırayla işle.
 
-    def _merge_worker(self):
+        Thread bitmeden önce tüm olaylarını kuyruğa koyar; bu yüzden bitmiş
+        görüldüyse kuyruk son kez boşaltılıp döngü durur.
+        """
+        running = self.is_processing
+        try:
+            while True:
+                self._show_progress_event(self._progress_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if running:
+            self.root.after(PROGRESS_TICK_MS, self._drain_progress)
+
+    def _show_progress_event(self, event):
+        """Olaya göre progress bar ve durum metni (dosya i / n, yazılan satır)"""
+        phase = event['phase']
+        if phase == 'status':
+            self.status_label.configure(text=event['text'], text_color=event['color'])
+            return
+        if phase == 'progress':
+            self.progress.set(event['value'])
+            return
+        count = max(event['file_count'], 1)
+        if phase == 'parse':
+            index = event['file_index']
+            self.progress.set(0.05 + 0.8 * index / count)
+            self.status_label.configure(
+                text=f"📊 {index + 1}/{count} dosya - {event['file_name']} ({event['rows']} satır yazıldı)",
+                text_color="#F39C12"
+            )
+            return
+        if phase == 'plan':
+            index = event['file_index']
+            self.progress.set(0.05 + 0.4 * index / count)
+            self.status_label.configure(text=f"📊 {index + 1}/{count} dosya okundu - {event['file_name']}",
+                                        text_color="#F39C12")
+            return
+        if phase == 'shard':
+            index = event['file_index']
+            self.progress.set(0.45 + 0.45 * (index + 1) / count)
+            self.status_label.configure(text=f"🧩 {index + 1}/{count} parça yazıldı - {event['file_name']}",
+                                        text_color="#F39C12")
+            return
+        value, text = {
+            'index': (0.92, "📑 İçindekiler yazılıyor..."),
+            'summary': (0.85, "📊 GRAND SUMMARY yazılıyor..."),
+            'save': (0.88, f"💾 Kaydediliyor... ({event['rows'] or 0} satır)"),
+            'cached_values': (0.92, "🧮 Toplamlar hesaplanıyor..."),
+            'verify': (0.95, "🔍 Toplamlar doğrulanıyor..."),
+        }.get(phase, (None, None))
+        if value is not None:
+            self.progress.set(value)
+            self.status_label.configure(text=text, text_color="#F39C12")
+
+    def _merge_worker(self, append_to=None):
         try:
             self._update_progress(0)
             self._update_status("⏳ Şablon aranıyor...", "#F39C12")
 
-            script_dir = _get_script_dir()
-            self.template_path = script_dir / 'Final_List_Template.xlsx'
-
-            if not self.template_path.exists():
+            self._sync_engine_options()
+            shard_mode = self._shard_mode() if append_to is None else None
+            if append_to is not None:
+                output_dir = append_to.parent
+            else:
+                output_dir = self.custom_output_dir or self.uploaded_files[0].parent
+            trace = self.engine.new_trace(self.uploaded_files)
+            try:
+                with trace.phase('template'):
+                    self.template_path = self.engine.compiled_template().path
+                self.engine.check_output_dir(output_dir)
+            except MergeError as e:
                 self._update_status("❌ Hata!", "#E74C3C")
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Hata",
-                    f"Template bulunamadı!\n\nLütfen Final_List_Template.xlsx dosyasını\nscript ile aynı klasöre koy.\n\n{script_dir}"
-                ))
+                error_msg = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Hata", error_msg))
                 return
 
-            # Template erişim kontrolü
-            if self._is_file_locked(self.template_path):
-                self._update_status("❌ Hata!", "#E74C3C")
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Hata",
-                    "Template dosyası kilitli!\nExcel'de açıksa kapatıp tekrar deneyin."
-                ))
-                return
+            self._update_progress(0.05)
+            self._update_status("✅ Şablon bulundu", "#27AE60")
 
-            # Çıktı klasörü yazma izni kontrolü
-            output_dir = self.custom_output_dir or self.uploaded_files[0].parent
-            if not self._check_write_permission(output_dir):
+            try:
+                if append_to is not None:
+                    self.output_path = append_to
+                    stats = self.engine.append_merged_file(
+                        self.uploaded_files, self.output_path, trace,
+                        progress=self._progress_queue.put, cancel=self._cancel_event
+                    )
+                elif shard_mode is not None:
+                    # Çıktı yolu parçaların içindekiler kitabıdır
+                    self.output_path = self.engine.default_output_path(output_dir)
+                    stats = create_sharded_output(
+                        self.engine, self.uploaded_files, self.output_path, shard_mode, trace=trace,
+                        progress=self._progress_queue.put, cancel=self._cancel_event
+                    )
+                else:
+                    self.output_path = self.engine.default_output_path(output_dir)
+                    stats = self.engine.create_merged_file(
+                        self.uploaded_files, self.output_path, trace,
+                        progress=self._progress_queue.put, cancel=self._cancel_event
+                    )
+            except MergeCancelled:
+                # Yarım kalan çıktıyı motor siler (eklemede eski liste korunur);
+                # okunan dosyalar önbellekte kalır
+                self.engine.parse_cache.flush()
+                trace.finish(output=str(self.output_path), cancelled=True).save()
+                self._update_progress(0)
+                self._update_status("⛔ Birleştirme iptal edildi", "#7F8C8D")
+                return
+            except MergeError as e:
+                # Ör. eklenecek listenin manifest'i yok ya da liste Excel'de açık
                 self._update_status("❌ Hata!", "#E74C3C")
-                err_dir = str(output_dir)
-                self.root.after(0, lambda: messagebox.showerror(
-                    "Hata",
-                    f"Çıktı klasörüne yazılamıyor!\n{err_dir}"
-                ))
+                error_msg = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Hata", error_msg))
                 return
+            total_items = stats['total_items']
+            self.engine.parse_cache.flush()
 
-            self._update_progress(0.15)
-            self._update_status("✅ Şablon bulundu", "#27AE60")
-            time.sleep(0.5)
-
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            self.output_path = output_dir / f'MERGED_FINAL_LIST_{timestamp}.xlsx'
-
-            self._update_progress(0.3)
-            self._update_status("📊 Dosyalar birleştiriliyor... (%30)", "#F39C12")
-            self.root.after(0, self._start_pulse)
-
-            total_items = self._create_merged_file()
-
-            self.root.after(0, lambda: self._stop_pulse(0.8))
-            self._update_status("🔄 Son işlemler... (%80)", "#F39C12")
-
-            recalc_script = script_dir / 'recalc.py'
-            if recalc_script.exists():
-                try:
-                    subprocess.run([sys.executable, str(recalc_script), str(self.output_path), '30'], capture_output=True, timeout=30)
-                except Exception:
-                    pass
+            if 'results' in stats:
+                results = stats['results']  # parçalar kendi süreçlerinde doğrulandı
+            else:
+                self._progress_queue.put({'phase': 'verify', 'file_index': None,
+                                          'file_count': len(self.uploaded_files), 'file_name': None, 'rows': None})
+                results = self.engine.verify_merged_file(self.output_path, stats)
+            failed = [r for r in results if not r['ok']]
+            trace.finish(
+                output=str(self.output_path), orders=stats['orders'], items=total_items,
+                output_bytes=self.output_path.stat().st_size, verified=not failed,
+            )
+            trace.save()
+            if self.show_timing_var.get():
+                timing_text = trace.format()
+                self.root.after(0, lambda: messagebox.showinfo("⏱ Zamanlama", timing_text))
 
             self._update_progress(1.0)
-            file_count = len(self.uploaded_files)
-            self._update_status(f"✅ Tamamlandı! ({file_count} sipariş, {total_items} item)", "#27AE60")
+            file_count = stats['orders'] if append_to is not None else len(self.uploaded_files)
+            if failed:
+                self._update_status(f"⚠️ Tamamlandı, {len(failed)} kontrol başarısız!", "#E74C3C")
+                self.root.after(0, lambda: self._show_verification_report(results))
+                return
+            self._update_status(f"✅ Tamamlandı! ({file_count} sipariş, {total_items} item) - toplamlar doğrulandı", "#27AE60")
 
             # Otomatik aç veya bilgi göster
             if self.auto_open_var.get():
@@ -586,16 +894,27 @@ class FinalListMerger:
             else:
                 out_name = self.output_path.name
                 out_parent = str(self.output_path.parent)
+                exports = ', '.join(p.suffix.lstrip('.').upper() for p in stats['exports'])
+                export_text = f"\n📤 Item verisi: {exports}" if exports else ""
+                title_text = "Final List oluşturuldu!"
+                if append_to is not None:
+                    append = stats['append']
+                    if append['rebuild_reason']:
+                        title_text = f"Final List baştan birleştirildi ({append['rebuild_reason']})"
+                    else:
+                        title_text = (f"Final List güncellendi! ({append['reused']} sipariş korundu, "
+                                      f"{append['rewritten']} sipariş yazıldı)")
+                elif 'shards' in stats:
+                    title_text = (f"Final List {len(stats['shards'])} parça olarak oluşturuldu!\n"
+                                  f"(bağlantılar ve genel toplam içindekiler dosyasında)")
                 self.root.after(0, lambda: messagebox.showinfo(
                     "✅ Başarılı",
-                    f"Final List oluşturuldu!\n\n📁 {out_name}\n📍 {out_parent}\n\n📊 {file_count} sipariş\n🔢 {total_items} item"
+                    f"{title_text}\n\n📁 {out_name}\n📍 {out_parent}\n\n📊 {file_count} sipariş\n🔢 {total_items} item"
+                    f"{export_text}\n\n✔ Toplamlar doğrulandı ({len(results)} kontrol)"
                 ))
 
-            # Doğrulama uyarısı
-            self.root.after(300, self._show_verification_warning)
-
         except Exception as e:
-            self.root.after(0, lambda: self._stop_pulse(0))
+            self._update_progress(0)
             self._update_status("❌ Hata!", "#E74C3C")
             error_msg = str(e)
             self.root.after(0, lambda: messagebox.showerror("Hata", f"Birleştirme hatası:\n{error_msg}"))
@@ -603,96 +922,80 @@ class FinalListMerger:
             self.is_processing = False
             self.root.after(0, self._unlock_ui)
 
-    def _show_verification_warning(self):
-        """Birleştirme sonrası doğrulama uyarısı (3sn bekleme)"""
+    def _show_verification_report(self, results):
+        """Toplam doğrulaması başarısız olursa sipariş bazında sonuçları göster"""
         dlg = ctk.CTkToplevel(self.root)
-        dlg.title("⚠️ Önemli Uyarı")
-        dlg.geometry("520x280")
-        dlg.resizable(False, False)
+        dlg.title("⚠️ Toplam Doğrulaması")
+        dlg.geometry("620x420")
         dlg.attributes('-topmost', True)
         dlg.grab_set()
 
         # Pencereyi ortala
         dlg.update_idletasks()
-        x = self.root.winfo_x() + (self.root.winfo_width() - 520) // 2
-        y = self.root.winfo_y() + (self.root.winfo_height() - 280) // 2
+        x = self.root.winfo_x() + (self.root.winfo_width() - 620) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - 420) // 2
         dlg.geometry(f"+{x}+{y}")
 
-        # Uyarı ikonu
-        ctk.CTkLabel(
-            dlg, text="⚠️", font=("Segoe UI", 48)
-        ).pack(pady=(20, 5))
-
-        # Uyarı metni
+        failed = sum(1 for r in results if not r['ok'])
         ctk.CTkLabel(
             dlg,
-            text="TOPLAM TUTARLARI MUTLAKA\nELLE KONTROL EDİNİZ!",
+            text=f"{failed} / {len(results)} KONTROL BAŞARISIZ",
             font=("Segoe UI", 18, "bold"),
             text_color="#C0392B"
-        ).pack(pady=(0, 5))
+        ).pack(pady=(20, 5))
 
         ctk.CTkLabel(
             dlg,
-            text="Birleştirilmiş dosyadaki tüm fiyat ve toplam değerlerini\ngöndermeden önce manuel olarak doğrulamanız gerekmektedir.",
+            text="Aşağıdaki siparişlerin toplamları kaynak dosyalarla uyuşmuyor.\nDosyayı göndermeden önce kontrol edin.",
             font=("Segoe UI", 11),
             text_color="#7F8C8D"
-        ).pack(pady=(0, 15))
-
-        # Buton (3sn geri sayım)
-        btn = ctk.CTkButton(
-            dlg,
-            text="Anladım (3)",
-            fg_color="#95A5A6",
-            hover_color="#95A5A6",
-            text_color="white",
-            font=("Segoe UI", 13, "bold"),
-            width=200, height=40,
-            corner_radius=8,
-            state="disabled"
-        )
-        btn.pack(pady=(0, 20))
-
-        def countdown(sec):
-            if sec > 0:
-                btn.configure(text=f"Anladım ({sec})")
-                dlg.after(1000, countdown, sec - 1)
-            else:
-                btn.configure(
-                    text="Anladım ✓",
-                    state="normal",
-                    fg_color="#27AE60",
-                    hover_color="#229954",
-                    command=dlg.destroy
-                )
-
-        countdown(3)
-
+        ).pack(pady=(0, 10))
+
+        report = ctk.CTkTextbox(dlg, font=("Consolas", 11), wrap="none")
+        report.pack(fill="both", expand=True, padx=20)
+        for r in results:
+            mark = "✔" if r['ok'] else "✘"
+            grand_total = f"{r['grand_total']:,.2f}" if r['grand_total'] is not None else "-"
+            report.insert("end", f"{mark} {r['file_name']}  (G. TOTAL {grand_total})\n")
+            for problem in r['problems'][:10]:
+                report.insert("end", f"     {problem}\n")
+            if len(r['problems']) > 10:
+                report.insert("end", f"     ... {len(r['problems']) - 10} sorun daha\n")
+        report.configure(state="disabled")
+
+        btn_frame = ctk.CTkFrame(dlg, fg_color="transparent")
+        btn_frame.pack(pady=15)
+        ctk.CTkButton(
+            btn_frame, text="📂 Dosyayı Aç", width=160, height=36,
+            command=lambda: (dlg.destroy(), self.open_file())
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(
+            btn_frame, text="Kapat", width=160, height=36,
+            fg_color="#95A5A6", hover_color="#7F8C8D", command=dlg.destroy
+        ).pack(side="left", padx=5)
+
+    # Birleştirme thread'inden çağrılır; ilerleme olaylarıyla aynı kuyruktan
+    # geçtiği için sırası korunur
     def _update_status(self, text, color):
-        self.root.after(0, lambda: self.status_label.configure(text=text, text_color=color))
+        self._progress_queue.put({'phase': 'status', 'text': text, 'color': color})
 
     def _update_progress(self, value):
-        self.root.after(0, lambda: self.progress.set(value))
-
-    def _start_pulse(self):
-        """Progress bar'ı belirsiz (pulse) moduna al"""
-        self._pulsing = True
-        self._pulse_val = 0.0
-        self._pulse_dir = 0.02
-        self._do_pulse()
+        self._progress_queue.put({'phase': 'progress', 'value': value})
 
-    def _do_pulse(self):
-        if not self._pulsing:
-            return
-        self._pulse_val += self._pulse_dir
-        if self._pulse_val >= 1.0 or self._pulse_val <= 0.0:
-            self._pulse_dir *= -1
-        self.progress.set(self._pulse_val)
-        self.root.after(30, self._do_pulse)
+    def _shard_mode(self):
+        """Seçili bölme ölçütü (parçalı çıktı kapalıysa None)"""
+        if not self.shard_output_var.get():
+            return None
+        label = self.shard_by_var.get()
+        return next((mode for mode, text in SHARD_LABELS.items() if text == label), 'rows')
 
-    def _stop_pulse(self, final_value=1.0):
-        """Pulse modunu durdur ve sabit değere ayarla"""
-        self._pulsing = False
-        self.progress.set(final_value)
+    def _sync_engine_options(self):
+        """Arayüzdeki seçenekleri motora aktar"""
+        self.engine.show_header_info = self.show_header_info_var.get()
+        self.engine.reader = 'streaming' if self.streaming_reader_var.get() else 'pandas'
+        self.engine.writer = 'streaming' if self.streaming_writer_var.get() else 'template'
+        self.engine.memory_limit = MEMORY_LIMIT_DEFAULT if self.bounded_memory_var.get() else None
+        self.engine.export_formats = self._export_formats if self.export_items_var.get() else ()
 
     def _lock_ui(self):
         """İşlem sırasında tüm butonları kilitle"""
@@ -701,6 +1004,8 @@ class FinalListMerger:
 
     def _unlock_ui(self):
         """İşlem sonrası butonları aç (merge butonu dosya durumuna göre)"""
+        self.cancel_btn.grid_remove()
+        self.merge_btn.grid()
         for btn in self._all_buttons:
             btn.configure(state="normal")
         if not self.uploaded_files:
@@ -708,360 +1013,6 @@ class FinalListMerger:
         if not (self.output_path and self.output_path.exists()):
             self.open_btn.configure(state="disabled")
 
-    # ── Excel İşlemleri ──────────────────────────────────────
-
-    def _create_merged_file(self):
-        shutil.copy(self.template_path, self.output_path)
-        wb = load_workbook(self.output_path)
-        ws = wb.active
-
-        template_start_row = 10
-        for idx in range(1, 20):
-            cell_value = ws.cell(idx, 1).value
-            if cell_value and str(cell_value).strip().upper() == 'NO':
-                template_start_row = idx + 1
-                break
-
-        current_row = template_start_row
-        headers = ['NO', 'DESCRIPTION', 'CODE', 'QTTY', 'UNIT', 'U.PRICE', 'T.PRICE', 'REMARKS']
-        total_items = 0
-
-        for row in range(template_start_row, min(template_start_row + 1000, ws.max_row + 1)):
-            for col in range(1, 12):
-                cell = ws.cell(row, col)
-                cell.border = self._no_border
-                cell.number_format = 'General'
-                cell.value = None
-
-        # Her siparişin toplam satır referanslarını topla
-        all_total_rows = []
-        all_disc_rows = []
-        all_gtotal_rows = []
-        last_currency_symbol = ''
-
-        for file_path in self.uploaded_files:
-            order_data = self._extract_order_data(file_path)
-            if not order_data:
-                continue
-
-            info = order_data['header_info']
-            info_text = f"Order: {order_data['file_name']}"
-            if 'rfq_ref' in info:
-                info_text += f" | RFQ: {info['rfq_ref']}"
-            if 'qtn_ref' in info:
-                info_text += f" | QTN: {info['qtn_ref']}"
-
-            currency = info.get('currency', '')
-            currency_symbol = CURRENCY_SYMBOLS.get(currency.upper(), currency) if currency else ''
-            if currency:
-                info_text += f" | {currency}"
-
-            # Sipariş bilgileri (A3:B5) sağ üst köşede + info text solda
-            show_cells = self.show_header_info_var.get()
-            header_cells = order_data.get('header_cells', [])
-            has_cells = show_cells and any(l or v for l, v in header_cells)
-
-            if has_cells:
-                info_label_font = Font(bold=True, size=9)
-                info_value_font = Font(size=9)
-                # İlk satıra info text (sol) + ilk header cell (sağ)
-                ws.cell(current_row, 2).value = info_text
-                ws.cell(current_row, 2).font = Font(italic=True, size=9, color='808080')
-                for i, (label, value) in enumerate(header_cells):
-                    r = current_row + i
-                    if label or value:
-                        cell_g = ws.cell(r, 7)
-                        clean_label = label.rstrip(' :')
-                        cell_g.value = f"{clean_label} : " if clean_label else ''
-                        cell_g.font = info_label_font
-                        cell_g.alignment = self._right_align
-                        cell_g.border = self._thin_border
-                        cell_h = ws.cell(r, 8)
-                        cell_h.value = value
-                        cell_h.font = info_value_font
-                        cell_h.border = self._thin_border
-                current_row += len(header_cells)
-            else:
-                ws.cell(current_row, 2).value = info_text
-                ws.cell(current_row, 2).font = Font(italic=True, size=9, color='808080')
-                current_row += 1
-
-            for col_idx, header in enumerate(headers, start=1):
-                ws.cell(current_row, col_idx).value = header
-            self._apply_header_style(ws, current_row)
-            current_row += 1
-
-            item_count = 0
-            data_start_row = current_row
-            price_format = f'"{currency_symbol}"#,##0.00' if currency_symbol else '#,##0.00'
-
-            for data_row in order_data['data_rows']:
-                item_count += 1
-                for col_idx, value in enumerate(data_row, start=1):
-                    cell = ws.cell(current_row, col_idx)
-                    if col_idx == 1:
-                        cell.value = item_count
-                    elif col_idx == 7:
-                        cell.value = f"=D{current_row}*F{current_row}"
-                        cell.number_format = price_format
-                    else:
-                        cell.value = value
-                        if col_idx == 6 and value is not None:
-                            cell.number_format = price_format
-                self._apply_data_row_style(ws, current_row)
-                current_row += 1
-
-            total_items += item_count
-            current_row += 1
-
-            self._apply_total_style(ws, current_row, 'TOTAL:')
-            ws.cell(current_row, 7).value = f"=SUM(G{data_start_row}:G{data_start_row + item_count - 1})"
-            ws.cell(current_row, 7).number_format = price_format
-            total_row = current_row
-            all_total_rows.append(current_row)
-            current_row += 1
-
-            disc_pct = info.get('discount_pct', 10)
-            self._apply_total_style(ws, current_row, f'DISC.({disc_pct}%):')
-            ws.cell(current_row, 7).value = f"=G{total_row}*{disc_pct/100}"
-            ws.cell(current_row, 7).number_format = price_format
-            disc_row = current_row
-            all_disc_rows.append(current_row)
-            current_row += 1
-
-            self._apply_total_style(ws, current_row, 'G. TOTAL:')
-            ws.cell(current_row, 7).value = f"=G{total_row}-G{disc_row}"
-            ws.cell(current_row, 7).number_format = price_format
-            all_gtotal_rows.append(current_row)
-            last_currency_symbol = currency_symbol
-            current_row += 4
-
-        # ── GRAND SUMMARY ──
-        if len(all_gtotal_rows) > 1:
-            summary_format = f'"{last_currency_symbol}"#,##0.00' if last_currency_symbol else '#,##0.00'
-
-            # Ayırıcı çizgi
-            separator_fill = PatternFill(start_color='2C3E50', end_color='2C3E50', fill_type='solid')
-            for col in range(1, 9):
-                cell = ws.cell(current_row, col)
-                cell.fill = separator_fill
-                cell.border = self._thin_border
-            current_row += 1
-
-            # Başlık satırı
-            banner_fill = PatternFill(start_color='1A5276', end_color='1A5276', fill_type='solid')
-            banner_font = Font(bold=True, size=13, color='FFFFFF')
-            ws.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=8)
-            title_cell = ws.cell(current_row, 1)
-            title_cell.value = f'GRAND SUMMARY  —  {len(all_gtotal_rows)} ORDERS'
-            title_cell.font = banner_font
-            title_cell.fill = banner_fill
-            title_cell.alignment = Alignment(horizontal='center', vertical='center')
-            title_cell.border = self._thin_border
-            for col in range(2, 9):
-                ws.cell(current_row, col).fill = banner_fill
-                ws.cell(current_row, col).border = self._thin_border
-            current_row += 1
-
-            # Boş ayırıcı
-            current_row += 1
-
-            # TOTAL formülü
-            total_refs = '+'.join([f'G{r}' for r in all_total_rows])
-            summary_label_font = Font(bold=True, size=12, color='2C3E50')
-            summary_value_font = Font(bold=True, size=12, color='1A5276')
-            summary_border = Border(
-                left=Side(style='medium'), right=Side(style='medium'),
-                top=Side(style='medium'), bottom=Side(style='medium')
-            )
-            label_fill = PatternFill(start_color='EBF5FB', end_color='EBF5FB', fill_type='solid')
-            value_fill = PatternFill(start_color='D4E6F1', end_color='D4E6F1', fill_type='solid')
-
-            # TOTAL
-            ws.merge_cells(start_row=current_row, start_column=4, end_row=current_row, end_column=6)
-            lbl = ws.cell(current_row, 4)
-            lbl.value = 'TOTAL :'
-            lbl.font = summary_label_font
-            lbl.alignment = Alignment(horizontal='right', vertical='center')
-            lbl.fill = label_fill
-            lbl.border = summary_border
-            for c in range(5, 7):
-                ws.cell(current_row, c).fill = label_fill
-                ws.cell(current_row, c).border = summary_border
-            ws.merge_cells(start_row=current_row, start_column=7, end_row=current_row, end_column=8)
-            val = ws.cell(current_row, 7)
-            val.value = f'={total_refs}'
-            val.font = summary_value_font
-            val.number_format = summary_format
-            val.alignment = Alignment(horizontal='center', vertical='center')
-            val.fill = value_fill
-            val.border = summary_border
-            ws.cell(current_row, 8).fill = value_fill
-            ws.cell(current_row, 8).border = summary_border
-            current_row += 1
-
-            # DISCOUNT
-            disc_refs = '+'.join([f'G{r}' for r in all_disc_rows])
-            ws.merge_cells(start_row=current_row, start_column=4, end_row=current_row, end_column=6)
-            lbl = ws.cell(current_row, 4)
-            lbl.value = 'TOTAL DISCOUNT :'
-            lbl.font = summary_label_font
-            lbl.alignment = Alignment(horizontal='right', vertical='center')
-            lbl.fill = label_fill
-            lbl.border = summary_border
-            for c in range(5, 7):
-                ws.cell(current_row, c).fill = label_fill
-                ws.cell(current_row, c).border = summary_border
-            ws.merge_cells(start_row=current_row, start_column=7, end_row=current_row, end_column=8)
-            val = ws.cell(current_row, 7)
-            val.value = f'={disc_refs}'
-            val.font = summary_value_font
-            val.number_format = summary_format
-            val.alignment = Alignment(horizontal='center', vertical='center')
-            val.fill = value_fill
-            val.border = summary_border
-            ws.cell(current_row, 8).fill = value_fill
-            ws.cell(current_row, 8).border = summary_border
-            current_row += 1
-
-            # GRAND TOTAL
-            gtotal_refs = '+'.join([f'G{r}' for r in all_gtotal_rows])
-            grand_fill = PatternFill(start_color='1A5276', end_color='1A5276', fill_type='solid')
-            grand_font = Font(bold=True, size=14, color='FFFFFF')
-            ws.merge_cells(start_row=current_row, start_column=4, end_row=current_row, end_column=6)
-            lbl = ws.cell(current_row, 4)
-            lbl.value = 'GRAND TOTAL :'
-            lbl.font = grand_font
-            lbl.alignment = Alignment(horizontal='right', vertical='center')
-            lbl.fill = grand_fill
-            lbl.border = summary_border
-            for c in range(5, 7):
-                ws.cell(current_row, c).fill = grand_fill
-                ws.cell(current_row, c).border = summary_border
-            ws.merge_cells(start_row=current_row, start_column=7, end_row=current_row, end_column=8)
-            val = ws.cell(current_row, 7)
-            val.value = f'={gtotal_refs}'
-            val.font = grand_font
-            val.number_format = summary_format
-            val.alignment = Alignment(horizontal='center', vertical='center')
-            val.fill = grand_fill
-            val.border = summary_border
-            ws.cell(current_row, 8).fill = grand_fill
-            ws.cell(current_row, 8).border = summary_border
-            current_row += 2
-
-        ws.column_dimensions['A'].width = 8
-        ws.column_dimensions['B'].width = 65
-        ws.column_dimensions['C'].width = 15
-        ws.column_dimensions['D'].width = 10
-        ws.column_dimensions['E'].width = 10
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 12
-        ws.column_dimensions['H'].width = 30
-
-        last_row = current_row - 1
-        ws.print_area = f'A1:H{last_row}'
-        ws.sheet_view.showGridLines = False
-
-        wb.save(self.output_path)
-        return total_items
-
-    def _extract_order_data(self, file_path):
-        try:
-            df = pd.read_excel(file_path, header=None)
-
-            header_info = {}
-            if len(df.columns) < 2:
-                return None
-            for idx in range(min(15, len(df))):
-                first_col = str(df.iloc[idx, 0]).strip() if pd.notna(df.iloc[idx, 0]) else ''
-                second_col = df.iloc[idx, 1] if pd.notna(df.iloc[idx, 1]) else ''
-
-                if 'RFQ REF' in first_col.upper():
-                    header_info['rfq_ref'] = second_col
-                elif 'QTN REF' in first_col.upper():
-                    header_info['qtn_ref'] = second_col
-                elif 'CURRENCY' in first_col.upper():
-                    header_info['currency'] = str(second_col).strip()
-                elif 'DISC' in first_col.upper() and '%' in first_col.upper():
-                    try:
-                        header_info['discount_pct'] = float(second_col)
-                    except (ValueError, TypeError):
-                        header_info['discount_pct'] = 10
-
-            if 'discount_pct' not in header_info:
-                header_info['discount_pct'] = 10
-
-            # A3:B5 hücrelerini çıkar (Tarih, RFQ REF, QTN REF)
-            header_cells = []
-            for row_idx in range(2, 5):  # Excel satır 3,4,5 -> 0-indexed 2,3,4
-                if row_idx < len(df):
-                    label = str(df.iloc[row_idx, 0]).strip() if pd.notna(df.iloc[row_idx, 0]) else ''
-                    value = str(df.iloc[row_idx, 1]).strip() if pd.notna(df.iloc[row_idx, 1]) else ''
-                    header_cells.append((label, value))
-                else:
-                    header_cells.append(('', ''))
-
-            start_row = None
-            for idx in range(len(df)):
-                if df.iloc[idx, 0] == 'NO':
-                    start_row = idx
-                    break
-
-            if start_row is None:
-                return None
-
-            data_rows = []
-            for idx in range(start_row + 1, len(df)):
-                row = df.iloc[idx]
-                first_col_val = row.iloc[0]
-                # TOTAL satırı: A sütunu boş/NaN ve satırda TOTAL geçiyor
-                if pd.isna(first_col_val) or str(first_col_val).strip() == '':
-                    row_str = ' '.join([str(x).upper() for x in row.values if pd.notna(x)])
-                    if 'TOTAL' in row_str:
-                        break
-                    continue
-
-                # Sıra numarası kontrolü: 1, 2, 3 veya 1A, 1B, 2A gibi
-                val_str = str(first_col_val).strip()
-                if val_str and val_str[0].isdigit():
-                    data_rows.append(row.values.tolist())
-                else:
-                    continue
-
-            return {
-                'file_name': Path(file_path).name,
-                'header_info': header_info,
-                'header_cells': header_cells,
-                'data_rows': data_rows,
-            }
-        except Exception:
-            return None
-
-    # ── Stiller ──────────────────────────────────────────────
-
-    def _apply_header_style(self, ws, row_num):
-        for col in range(1, 9):
-            cell = ws.cell(row_num, col)
-            cell.fill = self._header_fill
-            cell.font = self._header_font
-            cell.alignment = self._center_align
-            cell.border = self._thin_border
-
-    def _apply_data_row_style(self, ws, row_num):
-        for col in range(1, 9):
-            cell = ws.cell(row_num, col)
-            cell.border = self._thin_border
-            cell.alignment = self._data_align
-
-    def _apply_total_style(self, ws, row_num, label):
-        for col in range(1, 9):
-            ws.cell(row_num, col).border = self._no_border
-        ws.cell(row_num, 6).value = label
-        ws.cell(row_num, 6).font = self._bold_font
-        ws.cell(row_num, 6).alignment = self._right_align
-        ws.cell(row_num, 7).font = self._bold_font
-
     # ── Dosya Açma ───────────────────────────────────────────
 
     def open_file(self):
@@ -1072,7 +1023,46 @@ class FinalListMerger:
                 pass
 
 
-def main():
+def _import_gui():
+    """customtkinter/tkinter'i yükle ve görünümü ayarla (sadece pencere açılırken)"""
+    global ctk, filedialog, messagebox, ttk, DND_FILES, TkinterDnD, HAS_DND
+    import customtkinter as ctk
+    from tkinter import filedialog, messagebox, ttk
+    try:
+        from tkinterdnd2 import DND_FILES, TkinterDnD
+        HAS_DND = True
+    except ImportError:
+        HAS_DND = False
+
+    ctk.set_appearance_mode("light")
+    ctk.set_default_color_theme("blue")
+
+
+def _startup_report(elapsed, preloaded):
+    """--startup-profile / --startup-budget çıktısı"""
+    lines = [f'Pencere açılış süresi: {elapsed:.3f} s']
+    if preloaded:
+        lines.append(f'Pencereden önce yüklenen ağır modüller: {", ".join(preloaded)}')
+    if _IMPORT_PROFILER is not None:
+        lines.append('')
+        lines.append(_IMPORT_PROFILER.report())
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Final listesi birleştirme aracı')
+    parser.add_argument('--startup-profile', action='store_true',
+                        help='Açılıştaki modül import sürelerini raporla ve çık')
+    parser.add_argument('--startup-budget', nargs='?', type=float, metavar='SANIYE',
+                        const=STARTUP_BUDGET_SECONDS, default=None,
+                        help='Pencere bu sürede açılmazsa ya da ağır kütüphaneler '
+                             f'pencereden önce yüklenirse 1 ile çık (varsayılan {STARTUP_BUDGET_SECONDS:g} s)')
+    args, _ = parser.parse_known_args(argv)
+    check_only = args.startup_profile or args.startup_budget is not None
+
+    _import_gui()
     if HAS_DND:
         class DnDCTk(ctk.CTk, TkinterDnD.DnDWrapper):
             def __init__(self):
@@ -1082,8 +1072,40 @@ def main():
     else:
         root = ctk.CTk()
     FinalListMerger(root)
+
+    result = {'exit_code': 0}
+
+    def on_first_map(event):
+        if event.widget is not root or 'elapsed' in result:
+            return
+        result['elapsed'] = time.perf_counter() - _START_TIME
+        preloaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        if not check_only:
+            # Ağır kütüphaneler pencere açıldıktan sonra arka planda yüklenir
+            threading.Thread(target=warm_up_imports, daemon=True).start()
+            return
+
+        if _IMPORT_PROFILER is not None:
+            _IMPORT_PROFILER.uninstall()
+        report = _startup_report(result['elapsed'], preloaded)
+        if args.startup_budget is not None:
+            over_budget = result['elapsed'] > args.startup_budget
+            report += (f'\nBütçe: {args.startup_budget:g} s - '
+                       f'{"AŞILDI" if over_budget or preloaded else "UYGUN"}')
+            if over_budget or preloaded:
+                result['exit_code'] = 1
+        if sys.stdout is not None:
+            print(report)
+        else:
+            # Konsolsuz (pyinstaller --windowed) derlemede rapor dosyaya yazılır
+            (get_script_dir() / 'startup_profile.txt').write_text(report, encoding='utf-8')
+        root.after(0, root.destroy)
+
+    root.bind('<Map>', on_first_map, add='+')
     root.mainloop()
+    return result['exit_code']
 
 
 if __name__ == '__main__':
-    main()
+    multiprocessing.freeze_support()
+    sys.exit(main())
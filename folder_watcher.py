@@ -0,0 +1,295 @@
+"""
+Klasör izleme: teklif klasörü değiştikçe birleştirilmiş listeyi arka planda yeniler
+
+Klasördeki teklif dosyaları (alt klasörler hariç) os.scandir ile taranır; boyut
+ya da değişiklik zamanı farklı olan, yeni eklenen ve silinen dosyalar değişiklik
+sayılır. Linux'ta klasör inotify ile izlenir ve değişiklik gelince hemen taranır;
+ağ paylaşımlarında başka makinelerden yapılan yazmalar inotify'a düşmeyebildiği
+için yine de RESCAN_SECONDS'ta bir taranır. Diğer sistemlerde her POLL_SECONDS'ta
+bir taranır.
+
+Art arda gelen yazmalar debounce ile birleştirilir: klasör DEBOUNCE_SECONDS
+boyunca değişmeden kalmadıkça ve değişen dosyalardan biri (ya da çıktı) kilitli
+oldukça birleştirme yapılmaz. Sonra çıktıya MergeEngine.append_merged_file ile
+eklenir; yalnızca yeni ve değişen dosyalar ayrıştırılır. Klasörden dosya
+silindiyse ya da çıktının manifest'i yoksa liste baştan birleştirilir.
+
+Olaylar on_event({'phase', ...}) ile izleme thread'inden bildirilir (bkz.
+describe_event); arayüz güncellemesini Tk thread'ine aktarmak çağıranın işidir.
+Yalnızca standart kütüphane kullanır.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from merger_engine import MergeError, is_file_locked, is_quote_file, supported_extensions
+
+WATCH_OUTPUT_NAME = 'MERGED_FINAL_LIST_LIVE.xlsx'  # çıktı verilmezse izlenen klasöre yazılır
+DEBOUNCE_SECONDS = 3.0  # son değişiklikten sonra birleştirmeden önce beklenen süre
+POLL_SECONDS = 2.0      # inotify yoksa tarama aralığı; kilitli dosya beklerken de kullanılır
+RESCAN_SECONDS = 30.0   # inotify varken kaçan değişiklikler için tarama aralığı
+
+# inotify olay maskeleri (sys/inotify.h)
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+                  | _IN_CREATE | _IN_DELETE)
+
+
+def describe_event(event):
+    """İzleme olayının tek satırlık açıklaması (komut satırı ve arayüz için)"""
+    phase = event['phase']
+    if phase == 'waiting':
+        return f"{event['file_name']} kullanımda, kapanması bekleniyor"
+    if phase == 'merging':
+        return f"{event['changed']} dosya değişti, {event['file_count']} dosya birleştiriliyor..."
+    if phase == 'error':
+        return f"Birleştirilemedi: {event['message']}"
+    stats = event['stats']
+    text = (f"{event['time']:%H:%M:%S} güncellendi: {Path(event['output']).name} "
+            f"({stats['orders']} sipariş, {stats['total_items']} item")
+    append = stats.get('append')
+    if append and not append['rebuild_reason']:
+        text += f"; {append['reused']} sipariş korundu, {append['rewritten']} sipariş yazıldı"
+    text += ')'
+    if stats['skipped']:
+        text += f" - {len(stats['skipped'])} dosya okunamadı"
+    if event['failed']:
+        text += f" - {len(event['failed'])} toplam kontrolü başarısız"
+    return text
+
+
+class _PollWaiter:
+    """Sadece zaman aşımıyla bekler; durdurma isteği beklemeyi keser"""
+
+    native = False
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def wait(self, timeout):
+        self._event.wait(timeout)
+        self._event.clear()
+
+    def wake(self):
+        self._event.set()
+
+    def close(self):
+        pass
+
+
+class _InotifyWaiter:
+    """Klasörde olay, durdurma isteği ya da zaman aşımı gelene kadar bekler"""
+
+    native = True
+
+    def __init__(self, fd):
+        self._fd = fd
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+
+    @classmethod
+    def open(cls, folder):
+        """Linux'ta klasör için inotify kur; kurulamazsa None"""
+        if not sys.platform.startswith('linux'):
+            return None
+        try:
+            import ctypes
+            import ctypes.util
+
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(str(folder)), _IN_WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+        return cls(fd)
+
+    def wait(self, timeout):
+        import select
+
+        ready, _, _ = select.select([self._fd, self._wake_read], [], [], timeout)
+        # Olayların içeriği gerekmez, klasör zaten yeniden taranır
+        for fd in ready:
+            try:
+                while os.read(fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def wake(self):
+        try:
+            os.write(self._wake_write, b'\0')
+        except OSError:
+            pass  # izleme zaten bitti
+
+    def close(self):
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            os.close(fd)
+
+
+class FolderWatcher:
+    """Klasördeki teklif dosyalarını izleyip birleştirilmiş listeyi güncel tutar"""
+
+    def __init__(self, engine, folder, output_path=None, on_event=None,
+                 debounce=DEBOUNCE_SECONDS, poll=POLL_SECONDS, rescan=RESCAN_SECONDS):
+        self.engine = engine
+        self.folder = Path(folder).resolve()
+        self.output_path = Path(output_path).resolve() if output_path else self.folder / WATCH_OUTPUT_NAME
+        self.on_event = on_event
+        self.debounce = debounce
+        self.poll = poll
+        self.rescan = rescan
+        self._extensions = supported_extensions()
+        self._merged = None  # son birleştirmedeki {dosya: (boyut, mtime_ns)}
+        self._waiting_for = None  # kapanması beklenen dosya (aynı olay tekrarlanmasın)
+        self._scan_failed = False
+        self._retry_at = 0.0  # birleştirme hata verdiyse klasör değişmedikçe bu ana kadar beklenir
+        self._stop = threading.Event()
+        self._waiter = None
+        self._thread = None
+
+    def start(self):
+        """İzlemeyi arka plan thread'inde başlat"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """İzlemeyi durdur; süren birleştirme bitince thread çıkar"""
+        self._stop.set()
+        waiter = self._waiter
+        if waiter is not None:
+            waiter.wake()
+
+    def run(self):
+        """stop() çağrılana kadar izle (komut satırında doğrudan çağrılır)"""
+        self._waiter = _InotifyWaiter.open(self.folder) or _PollWaiter()
+        try:
+            last_scan = None
+            changed_at = 0.0
+            while not self._stop.is_set():
+                snapshot = self._scan()
+                now = time.monotonic()
+                if snapshot != last_scan:
+                    last_scan = snapshot
+                    changed_at = now
+                    self._retry_at = 0.0
+                timeout = self.rescan if self._waiter.native else self.poll
+                if snapshot != self._merged:
+                    quiet = now - changed_at
+                    if quiet < self.debounce:
+                        timeout = min(timeout, self.debounce - quiet)
+                    elif now < self._retry_at:
+                        timeout = min(timeout, self._retry_at - now)
+                    elif not self._ready(snapshot):
+                        timeout = self.poll
+                    elif not self._merge(snapshot):
+                        self._retry_at = now + self.rescan
+                self._waiter.wait(timeout)
+        finally:
+            waiter, self._waiter = self._waiter, None
+            waiter.close()
+
+    # ── Tarama ───────────────────────────────────────────────
+
+    def _scan(self):
+        """Klasördeki teklif dosyaları: {çözümlenmiş yol: (boyut, mtime_ns)}"""
+        snapshot = {}
+        output = str(self.output_path)
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not is_quote_file(entry.name, self._extensions):
+                        continue
+                    path = os.path.join(self.folder, entry.name)
+                    try:
+                        if path != output and entry.is_file():
+                            stat = entry.stat()
+                            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        pass  # tarama sırasında silinen dosya
+        except OSError as e:
+            if not self._scan_failed:
+                self._emit({'phase': 'error', 'message': f'{self.folder} okunamıyor ({e})'})
+            self._scan_failed = True
+            return self._merged
+        self._scan_failed = False
+        return snapshot
+
+    def _ready(self, snapshot):
+        """Değişen dosyalar ve çıktı yazan programlarca bırakıldı mı"""
+        previous = self._merged or {}
+        changed = [path for path, key in snapshot.items() if previous.get(path) != key]
+        for path in changed + [self.output_path]:
+            if is_file_locked(path):
+                if path != self._waiting_for:
+                    self._waiting_for = path
+                    self._emit({'phase': 'waiting', 'file_name': Path(path).name})
+                return False
+        self._waiting_for = None
+        return True
+
+    # ── Birleştirme ──────────────────────────────────────────
+
+    def _merge(self, snapshot):
+        """Listeyi klasörün şimdiki haliyle güncelle; başarılıysa True"""
+        engine = self.engine
+        if not snapshot:
+            self._merged = snapshot
+            return True
+        try:
+            manifest = engine.load_manifest(self.output_path)
+        except MergeError:
+            manifest = None
+        # Önceki sıra korunur, yeni dosyalar ad sırasıyla sona eklenir
+        merged = [entry['path'] for entry in manifest['files']] if manifest else []
+        known = set(merged)
+        files = [path for path in merged if path in snapshot]
+        files += [path for path in sorted(snapshot) if path not in known]
+        previous = self._merged or {}
+        changed = sum(1 for path, key in snapshot.items() if previous.get(path) != key)
+        changed += sum(1 for path in previous if path not in snapshot)
+        self._emit({'phase': 'merging', 'file_count': len(files), 'changed': changed})
+
+        trace = engine.new_trace(files)
+        try:
+            with trace.phase('template'):
+                engine.compiled_template()
+            engine.check_output_dir(self.output_path.parent)
+            if manifest is not None and all(path in snapshot for path in merged):
+                stats = engine.append_merged_file(files, self.output_path, trace)
+            else:
+                # Klasörden dosya silinmiş ya da liste ilk kez oluşturuluyor
+                stats = engine.create_merged_file(files, self.output_path, trace)
+            engine.parse_cache.flush()
+            results = engine.verify_merged_file(self.output_path, stats)
+        except Exception as e:
+            self._emit({'phase': 'error', 'message': str(e)})
+            return False
+        failed = [r for r in results if not r['ok']]
+        trace.finish(
+            output=str(self.output_path), orders=stats['orders'], items=stats['total_items'],
+            output_bytes=self.output_path.stat().st_size, verified=not failed, watch=True,
+        )
+        trace.save()
+        self._merged = snapshot
+        self._emit({'phase': 'merged', 'output': self.output_path, 'stats': stats,
+                    'failed': failed, 'time': datetime.now()})
+        return True
+
+    def _emit(self, event):
+        if self.on_event is not None:
+            self.on_event(event)
@@ -0,0 +1,240 @@
+"""
+Performans ölçümü: sentetik tekliflerle tarama, ayrıştırma, birleştirme ve kaydetme
+
+Her dosya sayısı için (varsayılan 10, 100, 1000) quote_generator ile veri
+kümesi üretilir (aynı ayarlarla ikinci çalıştırmada yeniden kullanılır).
+Okuma ve birleştirme ayrı süreçlerde ölçülür: birleştirme süreci okumanın
+doldurduğu ayrıştırma önbelleğini diskten yükler, böylece en yüksek bellek
+(peak_memory) sadece birleştirmenin kendisidir; okumanınki parse_memory'dir.
+Aşamalar:
+
+- scan: listeye eklemedeki hızlı item sayımı (count_order_items)
+- parse: tüm dosyaların önbelleksiz tam ayrıştırılması
+- merge: ayrıştırılmış verinin şablona yazılması (kaydetme hariç)
+- save: kaydetme ve kayıtlı toplam değerlerinin yazılması
+
+--memory-limit ile birleştirme düşük bellek modunda (MergeEngine.memory_limit)
+ölçülür; dosya sayısı arttıkça peak_memory'nin sabit kaldığı buradan görülür.
+
+Sonuçlar taban (baseline) JSON'uyla karşılaştırılır; bir aşama tolerans ve
+gürültü eşiğinden fazla yavaşladıysa ya da bellek arttıysa regresyon sayılır.
+"""
+
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from merger_engine import (
+    READERS, WRITERS, MergeEngine, ParseCache, get_script_dir, peak_memory_bytes, warm_up_imports
+)
+
+BENCHMARK_VERSION = 2
+BASELINE_FILE = get_script_dir() / '.merger_benchmark.json'
+DEFAULT_SIZES = (10, 100, 1000)
+TIME_METRICS = ('scan', 'parse', 'merge', 'save')
+MEMORY_METRICS = ('parse_memory', 'peak_memory')
+TIME_NOISE_SECONDS = 0.05        # bundan küçük süre farkları regresyon sayılmaz
+MEMORY_NOISE_BYTES = 16 * 1024 * 1024
+
+
+def dataset(size, items, seed, bloat, root=None):
+    """Ayarlara göre üretilmiş (ya da önceden üretilmiş) veri kümesinin dosyaları"""
+    from quote_generator import generate_quotes
+
+    root = Path(root) if root else Path(tempfile.gettempdir()) / 'final_list_benchmark'
+    folder = root / f'{size}x{items}_seed{seed}_bloat{bloat:g}'
+    marker = folder / 'dataset.json'
+    if marker.exists():
+        return [folder / name for name in json.loads(marker.read_text(encoding='utf-8'))['files']]
+    files = [path for path, _ in generate_quotes(folder, size, items, seed, bloat)]
+    marker.write_text(json.dumps({'files': [p.name for p in files]}), encoding='utf-8')
+    return files
+
+
+def measure_parse(files, cache_path, reader='pandas'):
+    """Tarama ve ayrıştırma sürelerini ölç; ayrıştırılan veriyi cache_path'e yaz"""
+    warm_up_imports()  # kütüphanelerin yüklenme süresi ilk aşamaya yazılmasın
+    cache = ParseCache(path=cache_path, max_bytes=float('inf'))
+    engine = MergeEngine(reader=reader, parse_cache=cache)
+    result = {'files': len(files)}
+
+    started = time.perf_counter()
+    for path in files:
+        MergeEngine.count_order_items(path)
+    result['scan'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result['items'] = sum(len(data['data_rows']) for data in map(engine.extract_order_data, files) if data)
+    result['parse'] = time.perf_counter() - started
+    result['parse_memory'] = peak_memory_bytes()
+    cache.flush()
+    return result
+
+
+def measure_merge(files, cache_path, template=None, reader='pandas', writer='template', memory_limit=None):
+    """Önbellekteki veriyle birleştirme ve kaydetme sürelerini, en yüksek belleği ölç"""
+    warm_up_imports()
+    engine = MergeEngine(template_path=template, reader=reader, writer=writer,
+                         parse_cache=ParseCache(path=cache_path, max_bytes=float('inf')),
+                         memory_limit=memory_limit)
+    engine.compiled_template()
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / 'MERGED_FINAL_LIST_BENCHMARK.xlsx'
+        started = time.perf_counter()
+        stats = engine.create_merged_file(files, output_path, engine.new_trace(files))
+        elapsed = time.perf_counter() - started
+        phases = stats['trace'].phases
+        result['save'] = phases.get('save', 0.0) + phases.get('cached_values', 0.0)
+        result['merge'] = elapsed - result['save']
+        result['output_bytes'] = output_path.stat().st_size
+    result['peak_memory'] = peak_memory_bytes()
+    return result
+
+
+def measure(files, template=None, reader='pandas', writer='template', memory_limit=None, context=None):
+    """Okumayı ve birleştirmeyi ayrı süreçlerde ölç; sonuçları birleştir"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / 'parse_cache'
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(measure_parse, files, cache_path, reader).result()
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result.update(pool.submit(measure_merge, files, cache_path, template, reader, writer,
+                                      memory_limit).result())
+    return result
+
+
+def run(sizes=DEFAULT_SIZES, items=25, seed=0, bloat=0.0, repeat=1, template=None,
+        reader='pandas', writer='template', data_dir=None, progress=None, memory_limit=None):
+    """Her boyutu ayrı süreçlerde repeat kez ölç; sürelerin en iyisini, belleğin en yükseğini tut"""
+    import multiprocessing
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for size in sizes:
+        files = dataset(size, items, seed, bloat, data_dir)
+        best = None
+        for _ in range(repeat):
+            current = measure(files, template, reader, writer, memory_limit, context)
+            if best is None:
+                best = current
+            else:
+                for key in TIME_METRICS:
+                    best[key] = min(best[key], current[key])
+                for key in MEMORY_METRICS:
+                    if current[key] is not None:
+                        best[key] = max(best[key] or 0, current[key])
+        results[str(size)] = best
+        if progress is not None:
+            progress(size, best)
+    return {
+        'version': BENCHMARK_VERSION,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'cpus': os.cpu_count()},
+        'settings': {'items': items, 'seed': seed, 'bloat': bloat, 'reader': reader, 'writer': writer,
+                     'memory_limit': memory_limit},
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """Tabana göre regresyonlar: [(boyut, ölçüm, taban, şimdiki)]
+
+    Ayarları farklı ölçülmüş taban karşılaştırılmaz (boş liste).
+    """
+    if baseline.get('version') != BENCHMARK_VERSION or baseline.get('settings') != current['settings']:
+        return []
+    regressions = []
+    for size, result in current['results'].items():
+        base = baseline['results'].get(size)
+        if base is None:
+            continue
+        for key in TIME_METRICS + MEMORY_METRICS:
+            old, new = base.get(key), result.get(key)
+            if old is None or new is None:
+                continue
+            noise = MEMORY_NOISE_BYTES if key in MEMORY_METRICS else TIME_NOISE_SECONDS
+            if new > old * (1 + tolerance) and new - old > noise:
+                regressions.append((size, key, old, new))
+    return regressions
+
+
+def format_value(key, value):
+    if value is None:
+        return '-'
+    return f'{value / (1024 * 1024):.0f} MB' if key in MEMORY_METRICS else f'{value:.3f} s'
+
+
+def format_result(size, result):
+    return (f"{size:>6} {result['items']:>8}" + ''.join(f'{result[key]:10.3f}' for key in TIME_METRICS)
+            + ''.join(f'  {format_value(key, result[key]):>11}' for key in MEMORY_METRICS))
+
+
+def format_header():
+    return (f"{'Dosya':>6} {'Item':>8}" + ''.join(f'{key:>10}' for key in TIME_METRICS)
+            + f"  {'Okuma':>11}  {'Birleştirme':>11}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='merge_benchmark',
+        description='Sentetik tekliflerle tarama/ayrıştırma/birleştirme/kaydetme sürelerini ve belleği ölçer.'
+    )
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), metavar='N',
+                        help=f'dosya sayıları (varsayılan: {" ".join(map(str, DEFAULT_SIZES))})')
+    parser.add_argument('--items', type=int, default=25, help='dosya başına ortalama item (varsayılan: 25)')
+    parser.add_argument('--bloat', type=float, default=0.0, metavar='ORAN', help='şişkin sayfalı dosya oranı, 0-1')
+    parser.add_argument('--seed', type=int, default=0, help='veri kümesi tohumu (varsayılan: 0)')
+    parser.add_argument('--repeat', type=int, default=1, help='her boyutun ölçülme sayısı; en iyi süre alınır')
+    parser.add_argument('--reader', choices=READERS, default='pandas', help='okuyucu (varsayılan: pandas)')
+    parser.add_argument('--writer', choices=WRITERS, default='template', help='çıktı motoru (varsayılan: template)')
+    parser.add_argument('--memory-limit', type=int, metavar='MB',
+                        help='birleştirmeyi bu bellek sınırıyla düşük bellek modunda ölç')
+    parser.add_argument('-t', '--template', help='şablon dosyası (varsayılan: program klasöründeki)')
+    parser.add_argument('--data-dir', help='veri kümelerinin klasörü (varsayılan: geçici klasör)')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE),
+                        help=f'taban sonuç dosyası (varsayılan: {BASELINE_FILE.name})')
+    parser.add_argument('--save-baseline', action='store_true', help='sonuçları taban olarak kaydet')
+    parser.add_argument('--tolerance', type=float, default=20, metavar='YUZDE',
+                        help='regresyon sayılacak yavaşlama/artış, yüzde (varsayılan: 20)')
+    parser.add_argument('--json', metavar='DOSYA', help='sonuçları ayrıca bu dosyaya yaz')
+    args = parser.parse_args(argv)
+
+    print(format_header(), flush=True)
+    current = run(args.sizes, args.items, args.seed, args.bloat, max(1, args.repeat), args.template,
+                  args.reader, args.writer, args.data_dir,
+                  progress=lambda size, result: print(format_result(size, result), flush=True),
+                  memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None)
+    if args.json:
+        Path(args.json).write_text(json.dumps(current, indent=2), encoding='utf-8')
+
+    baseline_path = Path(args.baseline)
+    regressions = []
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(current, indent=2), encoding='utf-8')
+        print(f'Taban kaydedildi: {baseline_path}')
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        if baseline.get('version') != BENCHMARK_VERSION or baseline.get('settings') != current['settings']:
+            print('Taban farklı ayarlarla ölçülmüş, karşılaştırılmadı', file=sys.stderr)
+            return 0
+        regressions = compare(current, baseline, args.tolerance / 100)
+        for size, key, old, new in regressions:
+            print(f'REGRESYON {size} dosya {key}: {format_value(key, old)} -> {format_value(key, new)} '
+                  f'({(new / old - 1) * 100:+.0f}%)', file=sys.stderr)
+        if not regressions:
+            print(f'Tabana göre regresyon yok ({baseline_path.name}, {baseline.get("time")})')
+    return 5 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2732 @@
+#!/usr/bin/env python3
+"""
+Final Listesi Birleştirme Motoru
+Arayüz olmadan teklif dosyalarını ayrıştırır ve şablonla birleştirir.
+Masaüstü uygulaması (final_list_merger.py) bu motoru kullanır; komut satırından
+da çalıştırılabilir:
+
+    python -m merger_engine teklifler/ ek/*.xlsx -o MERGED.xlsx
+
+Çıkış kodları: 0 başarılı, 1 hata, 2 hatalı kullanım, 3 bazı dosyalar okunamadı,
+4 toplam doğrulaması başarısız.
+"""
+
+import glob
+from pathlib import Path
+import threading
+import sys
+from datetime import datetime
+import os
+import hashlib
+import json
+import math
+import time
+import pickle
+import re
+import zipfile
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from copy import copy
+from functools import lru_cache
+from decimal import Decimal, InvalidOperation
+from io import BytesIO
+
+# pandas/numpy/openpyxl ağır kütüphaneler; arayüzün açılışını geciktirmemek için
+# kullanıldıkları fonksiyonların içinde import edilir (bkz. warm_up_imports)
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl')
+STARTUP_BUDGET_SECONDS = 3.0  # pencerenin açılması için hedef süre
+
+CURRENCY_SYMBOLS = {
+    'EUR': '€', 'USD': '$', 'GBP': '£', 'TRY': '₺', 'JPY': '¥', 'CNY': '¥',
+}
+
+
+def get_script_dir():
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).parent
+    return Path(__file__).parent
+
+
+TEMPLATE_NAME = 'Final_List_Template.xlsx'
+PARSE_CACHE_FILE = get_script_dir() / '.merger_parse_cache'
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+TRACE_LOG_FILE = get_script_dir() / '.merger_trace.jsonl'
+TRACE_LOG_MAX_BYTES = 10 * 1024 * 1024  # aşılınca .1 uzantısıyla saklanıp yenisi açılır
+# Ayrıştırma mantığı değişince artırılır; eski önbellek kayıtları geçersiz olur
+PARSE_CACHE_VERSION = 3  # 2: bloated_dimension, okuma bütçesi; 3: bütçe sadece şişkin sayfada, truncated
+MANIFEST_VERSION = 2  # 2: T.PRICE formülü her item satırında (6 sütunlu kaynaklar)
+READERS = ('pandas', 'streaming', 'calamine', 'auto')
+# Okuyucu arka uçları: ad -> {uzantı: gereken modül}. 'auto' bu sırayla ilk
+# kurulu olanı seçer; seçilen okuyucu uzantıyı desteklemiyorsa da bu sıra izlenir.
+READER_BACKENDS = {
+    'calamine': {'.xlsx': 'python_calamine', '.xlsm': 'python_calamine',
+                 '.xls': 'python_calamine', '.ods': 'python_calamine'},
+    'streaming': {'.xlsx': 'openpyxl', '.xlsm': 'openpyxl'},
+    'pandas': {'.xlsx': 'openpyxl', '.xlsm': 'openpyxl', '.xls': 'xlrd', '.ods': 'odf'},
+}
+WRITERS = ('template', 'streaming')
+# Şişkin sayfa koruması: bildirilen boyut (<dimension>, ör. A1:XFD1048576) bu
+# sınırları ya da okuma bütçesini aşarsa gerçek veri alanı önce XML'den bulunur
+# ve okuma oraya kadar yapılır (bkz. MergeEngine.sheet_extent)
+DIMENSION_ROW_LIMIT = 20000
+DIMENSION_COL_LIMIT = 64
+READ_ROW_BUDGET = 100000                 # bir dosyadan okunacak en fazla satır
+READ_MEMORY_BUDGET = 256 * 1024 * 1024   # bir dosyanın okunmasında hedeflenen en fazla bellek
+_CELL_MEMORY_ESTIMATE = 100              # okunan hücre başına yaklaşık bellek (bayt)
+# Düşük bellek modu (MergeEngine.memory_limit): birleştirmenin hedeflediği en
+# yüksek bellek; arayüzdeki seçenek bu değeri kullanır
+MEMORY_LIMIT_DEFAULT = 512 * 1024 * 1024
+_CACHED_VALUE_MEMORY_ESTIMATE = 200      # bellekte tutulan kayıtlı değer başına yaklaşık bellek (bayt)
+SHEET_CHUNK_BYTES = 1024 * 1024          # sayfa XML'inin parça parça işlenme boyutu
+_DIMENSION_RE = re.compile(r'<(?:\w+:)?dimension ref="([A-Z]*[0-9]*(?::[A-Z]+[0-9]+)?)"')
+_CELL_ERROR = object()  # XML'den okunan hata hücresi (#N/A, #REF! ...)
+EXPORT_FORMATS = ('csv', 'jsonl', 'parquet')
+# Dışa aktarılan item sütunları ve tipleri (string, int, float, decimal)
+EXPORT_COLUMNS = (
+    ('order_file', 'string'), ('rfq_ref', 'string'), ('qtn_ref', 'string'),
+    ('currency', 'string'), ('discount_pct', 'float'), ('no', 'int'),
+    ('description', 'string'), ('code', 'string'), ('qtty', 'decimal'),
+    ('unit', 'string'), ('u_price', 'decimal'), ('t_price', 'decimal'),
+)
+EXPORT_PARQUET_BATCH = 10000  # Parquet'e tek seferde yazılan satır sayısı
+# openpyxl'in yazdığı formül hücresi: <c r="G15" s="52"><f>D15*F15</f><v />
+_FORMULA_CELL_RE = re.compile(r'(<c r="([A-Z]+[0-9]+)"[^>]*><f>[^<]*</f>)(?:<v\s*/>|<v></v>)')
+_ROW_SHIFT_RE = re.compile(r'<row r="([0-9]+)"|<c r="([A-Z]+)([0-9]+)"|<f>([^<]*)</f>')
+_CELL_REF_RE = re.compile(r'([A-Z]+)([0-9]+)')
+_MERGE_REF_RE = re.compile(r'<mergeCell ref="[A-Z]+[0-9]+:[A-Z]+([0-9]+)"\s*/>')
+# Şemada mergeCells'ten sonra gelebilen ilk öğeler (mergeCells yoksa araya eklenir)
+_AFTER_MERGES_RE = re.compile(
+    r'<(?:phoneticPr|conditionalFormatting|dataValidations|hyperlinks|printOptions|pageMargins'
+    r'|pageSetup|headerFooter|rowBreaks|colBreaks|customProperties|cellWatches|ignoredErrors'
+    r'|smartTags|drawing|legacyDrawing|legacyDrawingHF|picture|oleObjects|controls'
+    r'|webPublishItems|tableParts|extLst)\b|</worksheet>'
+)
+_SHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+# Çıktıya kaydedilen adlandırılmış stillerin ön eki (Excel'in Hücre Stilleri listesinde görünür)
+NAMED_STYLE_PREFIX = 'FinalList '
+MERGED_COLUMN_WIDTHS = {
+    'A': 8, 'B': 65, 'C': 15, 'D': 10, 'E': 10, 'F': 12, 'G': 12, 'H': 30,
+}
+# pandas.read_excel'in varsayılan olarak NaN saydığı metinler (streaming okuyucu için)
+PANDAS_NA_STRINGS = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+    '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+
+def warm_up_imports():
+    """Ağır kütüphaneleri önceden yükle (arayüz açıldıktan sonra arka planda çağrılır)"""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    from openpyxl import Workbook, load_workbook  # noqa: F401
+    from openpyxl.styles import Font  # noqa: F401
+
+
+class MergeError(Exception):
+    """Kullanıcıya olduğu gibi gösterilebilecek birleştirme hatası"""
+
+
+class MergeCancelled(MergeError):
+    """Birleştirme kullanıcı tarafından iptal edildi"""
+
+    def __init__(self, message='Birleştirme iptal edildi'):
+        super().__init__(message)
+
+
+class _RebuildNeeded(Exception):
+    """Eklemeli birleştirme yapılamıyor, liste baştan birleştirilmeli (mesaj: sebep)"""
+
+
+def check_write_permission(dir_path):
+    """Klasöre yazma izni olup olmadığını kontrol et"""
+    try:
+        test_file = Path(dir_path) / '.write_test_tmp'
+        test_file.touch()
+        test_file.unlink()
+        return True
+    except Exception:
+        return False
+
+
+def is_file_locked(file_path):
+    """Dosyanın başka bir program tarafından kilitli olup olmadığını kontrol et"""
+    file_path = Path(file_path)
+    if not file_path.exists():
+        return False
+    try:
+        with open(file_path, 'r+b'):
+            return False
+    except (IOError, PermissionError):
+        return True
+
+
+def manifest_path(output_path):
+    """Birleştirilmiş çıktının manifest dosyası (MERGED_...manifest.json)"""
+    return Path(output_path).with_suffix('.manifest.json')
+
+
+def source_fingerprint(file_path, previous=None):
+    """Kaynak dosyanın [boyut, mtime_ns, içerik hash'i]; okunamazsa None.
+
+    previous'un boyutu ve mtime'ı tutuyorsa dosya okunmaz, önceki hash kullanılır.
+    """
+    try:
+        stat = os.stat(file_path)
+        if previous and previous[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return list(previous)
+        return [stat.st_size, stat.st_mtime_ns, ParseCache._content_hash(file_path)]
+    except OSError:
+        return None
+
+
+def _first_sheet_path(archive):
+    """xlsx arşivindeki ilk çalışma sayfasının XML yolu"""
+    import posixpath
+    import xml.etree.ElementTree as ET
+
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    sheet = workbook.find(f'{{{_SHEET_NS}}}sheets/{{{_SHEET_NS}}}sheet')
+    rel_id = sheet.get(f'{{{_REL_NS}}}id')
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels:
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise MergeError('Çıktı dosyasında çalışma sayfası bulunamadı')
+
+
+def _column_index(letters):
+    """Sütun harfini numaraya çevir (A -> 1, XFD -> 16384)"""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - 64
+    return index
+
+
+def peak_memory_bytes():
+    """Sürecin şimdiye kadarki en yüksek bellek kullanımı (ölçülemiyorsa None)"""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # Linux'ta KB
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+    return None
+
+
+class MergeTrace:
+    """Bir birleştirmenin aşama süreleri ve dosya bazında ayrıntıları.
+
+    Aşamalar: template, styles, parse, write, splice, save, cached_values, export,
+    manifest, verify; parçalı çıktıda shards ve index (bkz. output_shards).
+    finish() sonrası save() ile TRACE_LOG_FILE'a JSON satırı olarak eklenir.
+    """
+
+    def __init__(self, **info):
+        self.info = info
+        self.phases = {}
+        self.files = []  # {'file', 'parse', 'write', 'rows'}
+        self.total = None
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_file(self, name, parse, write, rows):
+        """rows=None: dosya okunamadı"""
+        self.files.append({'file': name, 'parse': parse, 'write': write, 'rows': rows})
+        self.add('parse', parse)
+        self.add('write', write)
+
+    def finish(self, **info):
+        self.total = time.perf_counter() - self._started
+        self.info.update(info)
+        self.info['peak_memory'] = peak_memory_bytes()
+        return self
+
+    def to_dict(self):
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            **self.info,
+            'total': round(self.total if self.total is not None else time.perf_counter() - self._started, 4),
+            'phases': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            'files': [
+                {**f, 'parse': round(f['parse'], 4), 'write': round(f['write'], 4)} for f in self.files
+            ],
+        }
+
+    def save(self, path=TRACE_LOG_FILE):
+        """Kaydı JSON satırı olarak ekle; log yazılamazsa birleştirme etkilenmez"""
+        path = Path(path)
+        try:
+            if path.exists() and path.stat().st_size > TRACE_LOG_MAX_BYTES:
+                os.replace(path, path.with_name(path.name + '.1'))
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(self.to_dict(), ensure_ascii=False) + '\n')
+        except OSError:
+            pass
+
+    def format(self, top=10):
+        """Okunabilir süre dökümü: aşamalar ve en yavaş dosyalar"""
+        record = self.to_dict()
+        lines = [f"Toplam: {record['total']:.2f} s"]
+        for name, seconds in sorted(record['phases'].items(), key=lambda kv: -kv[1]):
+            lines.append(f'  {name:<14}{seconds:8.3f} s')
+        peak = record.get('peak_memory')
+        if peak:
+            lines.append(f'  {"bellek (tepe)":<14}{peak / 1024 / 1024:8.1f} MB')
+        slowest = sorted(self.files, key=lambda f: -(f['parse'] + f['write']))[:top]
+        if slowest:
+            lines.append('')
+            lines.append('En yavaş dosyalar (okuma + yazma):')
+            for f in slowest:
+                rows = f"{f['rows']} item" if f['rows'] is not None else 'okunamadı'
+                lines.append(f"  {f['parse']:7.3f} + {f['write']:7.3f} s  {f['file']} ({rows})")
+        return '\n'.join(lines)
+
+
+def available_export_formats():
+    """Bu ortamda yazılabilen dışa aktarma formatları (Parquet pyarrow ister).
+
+    pyarrow açılışı yavaşlatmasın diye import edilmeden aranır.
+    """
+    from importlib.util import find_spec
+
+    if find_spec('pyarrow') is None:
+        return EXPORT_FORMATS[:2]
+    return EXPORT_FORMATS
+
+
+@lru_cache(maxsize=None)
+def _module_available(name):
+    from importlib.util import find_spec
+
+    return find_spec(name) is not None
+
+
+def _backend_supports(backend, suffix):
+    module = READER_BACKENDS[backend].get(suffix)
+    return module is not None and _module_available(module)
+
+
+def supported_extensions():
+    """Kurulu okuyucularla açılabilen dosya uzantıları"""
+    return tuple(sorted({
+        suffix for backend in READER_BACKENDS for suffix in READER_BACKENDS[backend]
+        if _backend_supports(backend, suffix)
+    }))
+
+
+def resolve_reader(reader, file_path):
+    """Dosya için kullanılacak okuyucu arka ucu.
+
+    İstenen okuyucu uzantıyı destekliyorsa (ve kuruluysa) o, değilse
+    READER_BACKENDS sırasındaki ilk uygun olan seçilir. Hiçbiri yoksa
+    istenen okuyucu döner; ayrıştırma okunamadı olarak sonuçlanır.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if reader in READER_BACKENDS and _backend_supports(reader, suffix):
+        return reader
+    for backend in READER_BACKENDS:
+        if _backend_supports(backend, suffix):
+            return backend
+    return reader if reader in READER_BACKENDS else 'pandas'
+
+
+class ItemExport:
+    """Birleştirilen item satırlarını çıktının yanına sütunlu formatlarda yazar.
+
+    Satırlar birleştirme sırasında ayrıştırılmış data_rows'tan eklenir; xlsx
+    yeniden okunmaz. Dosyalar çıktıyla aynı adı taşır (MERGED_...csv/.jsonl/
+    .parquet). Sayısal sütunlar sayı olarak yazılır; boş ya da sayıya
+    çevrilemeyen değer boş (null) kalır. Satırlar akış halinde yazılır.
+    """
+
+    def __init__(self, output_path, formats):
+        unknown = set(formats) - set(available_export_formats())
+        if unknown:
+            raise MergeError(f"Desteklenmeyen dışa aktarma formatı: {', '.join(sorted(unknown))}"
+                             " (Parquet için pyarrow gerekir)")
+        output_path = Path(output_path)
+        self.paths = [output_path.with_suffix(f'.{fmt}') for fmt in EXPORT_FORMATS if fmt in formats]
+        self.rows = 0
+        self._csv_file = self._csv = self._jsonl = None
+        self._parquet = self._batch = None
+        try:
+            for path in self.paths:
+                if path.suffix == '.csv':
+                    import csv
+                    # Excel'in de doğru açması için BOM'lu UTF-8
+                    self._csv_file = open(path, 'w', encoding='utf-8-sig', newline='')
+                    self._csv = csv.writer(self._csv_file)
+                    self._csv.writerow([name for name, _ in EXPORT_COLUMNS])
+                elif path.suffix == '.jsonl':
+                    self._jsonl = open(path, 'w', encoding='utf-8')
+                else:
+                    self._parquet = self._open_parquet(path)
+                    self._batch = []
+        except BaseException:
+            self.abort()
+            raise
+
+    @staticmethod
+    def _open_parquet(path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'decimal': pa.float64()}
+        schema = pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+        return pq.ParquetWriter(str(path), schema)
+
+    @staticmethod
+    def _text(value):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        text = str(value).strip()
+        return text or None
+
+    @staticmethod
+    def _number(value):
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        if isinstance(value, float):
+            # En kısa gösterim (744.18); _to_decimal'in 16 basamağı 744.1799999999999 yazar
+            value = Decimal(repr(value))
+        else:
+            value = MergeEngine._to_decimal(value)
+        # Sondaki sıfırlar atılır: 3.0 -> 3, 253.710 -> 253.71
+        return value.normalize() if value is not None else None
+
+    def add(self, order_data, no, data_row, line_total):
+        """Tek item satırını ekle (line_total: Excel'in T.PRICE sonucu; None ise #VALUE!, boş yazılır)"""
+        def col(idx):
+            return data_row[idx] if idx < len(data_row) else None
+
+        info = order_data['header_info']
+        text, number = self._text, self._number
+        qty, price = number(col(3)), number(col(5))
+        if line_total is not None:
+            # Excel'in çarpımı (line_total) yerine dosyada görünen değerlerin çarpımı:
+            # 744.18 * 37 = 27534.66 (27534.6599999999963 değil)
+            line_total = ((qty or Decimal(0)) * (price or Decimal(0))).normalize()
+        row = (
+            order_data['file_name'], text(info.get('rfq_ref')), text(info.get('qtn_ref')),
+            text(info.get('currency')), number(info.get('discount_pct', 10)), no,
+            text(col(1)), text(col(2)), qty, text(col(4)), price, line_total,
+        )
+        self.rows += 1
+        if self._csv is not None:
+            self._csv.writerow(['' if v is None else f'{v:f}' if isinstance(v, Decimal) else v for v in row])
+        if self._jsonl is not None or self._batch is not None:
+            typed = [float(v) if isinstance(v, Decimal) else v for v in row]
+            if self._jsonl is not None:
+                record = {name: value for (name, _), value in zip(EXPORT_COLUMNS, typed)}
+                self._jsonl.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if self._batch is not None:
+                self._batch.append(typed)
+                if len(self._batch) >= EXPORT_PARQUET_BATCH:
+                    self._write_batch()
+
+    def _write_batch(self):
+        import pyarrow as pa
+
+        if self._batch:
+            columns = list(zip(*self._batch))
+            self._parquet.write_table(pa.Table.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, self._parquet.schema)],
+                schema=self._parquet.schema,
+            ))
+            self._batch = []
+
+    def close(self):
+        if self._parquet is not None:
+            self._write_batch()
+            self._parquet.close()
+            self._parquet = None
+        for attr in ('_csv_file', '_jsonl'):
+            handle = getattr(self, attr)
+            if handle is not None:
+                handle.close()
+                setattr(self, attr, None)
+
+    def abort(self):
+        """Yazımı bırak ve yarım kalan dosyaları sil"""
+        try:
+            self.close()
+        except Exception:
+            pass
+        for path in self.paths:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class CachedValues:
+    """Formül hücrelerinin Decimal ile hesaplanmış kayıtlı değerleri: {'G15': değer}.
+
+    Değerler artan satır sırasıyla eklenir. max_rows verilirse ilk max_rows
+    kayıttan sonrası geçici dosyaya yazılır; o zaman get() sayfa XML'inin
+    okunduğu gibi artan satır sırasıyla çağrılmalıdır (taşan kayıtlar tek
+    geçişte, ileri doğru okunur).
+    """
+
+    def __init__(self, max_rows=None):
+        self.max_rows = max_rows
+        self._values = {}
+        self._spill = None   # taşan kayıtlar: 'G15\t12.50' satırları
+        self._reader = None
+        self._next = None    # geçici dosyada sıradaki kayıt [ref, değer]
+
+    def __setitem__(self, ref, value):
+        if self._spill is None and (self.max_rows is None or len(self._values) < self.max_rows):
+            self._values[ref] = value
+            return
+        if self._spill is None:
+            import tempfile
+            self._spill = tempfile.TemporaryFile('w+', encoding='ascii')
+        self._spill.write(f'{ref}\t{value}\n')
+
+    def __bool__(self):
+        return bool(self._values) or self._spill is not None
+
+    def get(self, ref):
+        value = self._values.get(ref)
+        if value is not None or self._spill is None:
+            return value
+        if self._reader is None:
+            self._spill.seek(0)
+            self._reader = (line.rstrip('\n').split('\t') for line in self._spill)
+            self._next = next(self._reader, None)
+        row = int(ref.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+        while self._next is not None and int(self._next[0].lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ')) < row:
+            self._next = next(self._reader, None)
+        if self._next is not None and self._next[0] == ref:
+            return Decimal(self._next[1])
+        return None
+
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class ParseCache:
+    """Ayrıştırılmış sipariş verisi için kalıcı önbellek.
+
+    Kayıtlar dosya içeriğinin hash'i ile tutulur; (yol, boyut, mtime) üçlüsü
+    bu hash'e hızlı erişim indeksidir. İndeks tutmazsa (dosya kopyalanmış ya da
+    sadece mtime değişmiş) içerik hash'i ile tekrar aranır. Kayıtlar sıkıştırılmış
+    pickle olarak saklanır ve toplam boyut sınırı aşılınca en eski kullanılan atılır.
+    """
+    MISS = object()
+
+    def __init__(self, path=PARSE_CACHE_FILE, max_bytes=PARSE_CACHE_MAX_BYTES):
+        # path=None: sadece bellekte tut, diske yazma
+        self.path = Path(path) if path is not None else None
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # içerik hash -> sıkıştırılmış blob
+        self._index = {}               # (yol, boyut, mtime_ns) -> içerik hash
+        self._size = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    # ── Disk ──
+
+    def _load(self):
+        try:
+            if self.path is None or not self.path.exists():
+                return
+            with open(self.path, 'rb') as f:
+                stored = pickle.load(f)
+            if stored.get('version') != PARSE_CACHE_VERSION:
+                return
+            self._entries = OrderedDict(stored['entries'])
+            self._index = dict(stored['index'])
+            self._size = sum(len(b) for b in self._entries.values())
+            self._evict()
+        except Exception:
+            self._entries, self._index, self._size = OrderedDict(), {}, 0
+
+    def flush(self):
+        """Değişiklik varsa önbelleği diske yaz (atomik)"""
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return
+            stored = {
+                'version': PARSE_CACHE_VERSION,
+                'entries': list(self._entries.items()),
+                'index': list(self._index.items()),
+            }
+            self._dirty = False
+        try:
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+
+    # ── Anahtarlar ──
+
+    @staticmethod
+    def _stat_key(file_path):
+        st = os.stat(file_path)
+        return (str(Path(file_path).resolve()), st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _content_hash(file_path):
+        h = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    # ── Erişim ──
+
+    def get_or_parse(self, file_path, parse_func, variant=''):
+        """Önbellekte varsa döndür, yoksa parse_func(file_path) ile ayrıştırıp sakla"""
+        result, keys = self.lookup(file_path, variant)
+        if result is self.MISS:
+            result = parse_func(file_path)
+            self.store(keys, result)
+        return result
+
+    def lookup(self, file_path, variant=''):
+        """(sonuç, anahtarlar) döndür; kayıt yoksa sonuç ParseCache.MISS olur.
+
+        Anahtarlar ayrıştırmadan önce alınır ve store()'a aynen verilir, böylece
+        ayrıştırma sırasında değişen bir dosya yanlış anahtarla saklanmaz.
+        """
+        try:
+            stat_key = self._stat_key(file_path) + (variant,)
+        except OSError:
+            return self.MISS, None
+
+        with self._lock:
+            result = self._lookup(self._index.get(stat_key))
+        if result is not self.MISS:
+            return self._with_name(result, file_path), None
+
+        try:
+            content_hash = self._content_hash(file_path) + variant
+        except OSError:
+            return self.MISS, None
+
+        with self._lock:
+            result = self._lookup(content_hash)
+            if result is not self.MISS:
+                self._index[stat_key] = content_hash
+                self._dirty = True
+        if result is not self.MISS:
+            return self._with_name(result, file_path), None
+        return self.MISS, (stat_key, content_hash)
+
+    def _lookup(self, content_hash):
+        if content_hash is None or content_hash not in self._entries:
+            return self.MISS
+        self._entries.move_to_end(content_hash)
+        try:
+            return pickle.loads(zlib.decompress(self._entries[content_hash]))
+        except Exception:
+            return self.MISS
+
+    @staticmethod
+    def _with_name(result, file_path):
+        # Aynı içerik farklı isimle gelmiş olabilir
+        if result is not None:
+            result = dict(result, file_name=Path(file_path).name)
+        return result
+
+    def store(self, keys, result):
+        """lookup() ile alınan anahtarlarla sonucu sakla"""
+        if keys is None:
+            return
+        stat_key, content_hash = keys
+        try:
+            blob = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return
+        if len(blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(content_hash, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[content_hash] = blob
+            self._size += len(blob)
+            self._index[stat_key] = content_hash
+            self._dirty = True
+            self._evict()
+
+    # ── Süreçler Arası ──
+
+    def snapshot(self, keys):
+        """[(dosya, variant)] kayıtlarını başka bir süreçteki önbelleğe taşımak için ver.
+
+        Kayıtlar sıkıştırılmış halleriyle döner; bulunmayanlar atlanır (o süreçte
+        yeniden ayrıştırılır). Karşı tarafta load_snapshot() ile eklenir.
+        """
+        entries = []
+        for file_path, variant in keys:
+            try:
+                stat_key = self._stat_key(file_path) + (variant,)
+            except OSError:
+                continue
+            with self._lock:
+                content_hash = self._index.get(stat_key)
+                blob = self._entries.get(content_hash)
+            if blob is not None:
+                entries.append((stat_key, content_hash, blob))
+        return entries
+
+    def load_snapshot(self, entries):
+        """snapshot() ile alınan kayıtları ekle"""
+        with self._lock:
+            for stat_key, content_hash, blob in entries:
+                if content_hash not in self._entries:
+                    self._entries[content_hash] = blob
+                    self._size += len(blob)
+                    self._dirty = True
+                self._index[stat_key] = content_hash
+            self._evict()
+
+    def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        while self._size > self.max_bytes and self._entries:
+            _, blob = self._entries.popitem(last=False)
+            self._size -= len(blob)
+        live = set(self._entries)
+        self._index = {k: h for k, h in self._index.items() if h in live}
+        self._dirty = True
+
+
+class CompiledTemplate:
+    """Şablonun bir kez okunup birleştirmeye hazırlanmış, bellekteki hali.
+
+    Başlangıç satırı bulunur, veri alanı temizlenir ve sonuç bayt olarak tutulur;
+    write-only motor için başlık hücreleri, sütun ve sayfa ayarları ayrıca saklanır.
+    Şablonun boyutu ya da mtime'ı değişince MergeEngine yeniden derler.
+    """
+
+    def __init__(self, template_path):
+        from openpyxl import load_workbook
+
+        self.path = Path(template_path)
+        self.stat_key = self.stat_key_for(self.path)
+        wb = load_workbook(BytesIO(self.path.read_bytes()))
+        ws = wb.active
+        self.title = ws.title
+        self.start_row = self._find_start_row(ws)
+
+        # Write-only motorun kopyalayacağı kısım: başlık bloğu ve sayfa ayarları
+        self.default_font = copy(wb._fonts[0])
+        self.default_border = copy(wb._borders[0])
+        self.column_dimensions = []
+        for letter, dim in ws.column_dimensions.items():
+            styles = None
+            if dim.has_style:
+                styles = (copy(dim.font), copy(dim.fill), copy(dim.border),
+                          copy(dim.alignment), dim.number_format)
+            self.column_dimensions.append((letter, dim.min, dim.max, dim.width, styles))
+        self.page_setup = copy(ws.page_setup)
+        self.print_options = copy(ws.print_options)
+        self.page_margins = copy(ws.page_margins)
+        self.images = list(ws._images)
+        self.header_rows = []  # (satır no, yükseklik, [(değer, stiller ya da None)])
+        for row_num in range(1, self.start_row):
+            dim = ws.row_dimensions.get(row_num)
+            cells = []
+            for src in ws[row_num] if row_num <= ws.max_row else ():
+                styles = None
+                if src.has_style:
+                    styles = (copy(src.font), copy(src.fill), copy(src.border),
+                              copy(src.alignment), copy(src.protection), src.number_format)
+                cells.append((src.value, styles))
+            self.header_rows.append((row_num, dim.height if dim is not None else None, cells))
+        self.header_merges = [m.coord for m in ws.merged_cells.ranges if m.max_row < self.start_row]
+
+        # Şablon motoru: veri alanı temizlenmiş çalışma kitabı, her birleştirmede
+        # bu baytlardan açılır (diske dokunmadan, tarama ve temizlik tekrarlanmadan)
+        self._clear_data_area(ws)
+        # Veri alanında kalan şablon hücreleri sipariş bloklarıyla birlikte
+        # kaydırılamaz; eklemeli birleştirme bu durumda listeyi baştan yazar
+        self.data_area_empty = not any(row >= self.start_row for row, _ in ws._cells)
+        buffer = BytesIO()
+        wb.save(buffer)
+        self.data = buffer.getvalue()
+
+    @staticmethod
+    def stat_key_for(template_path):
+        stat = Path(template_path).stat()
+        return (stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _find_start_row(ws):
+        """Şablonda NO başlığının altındaki ilk satırı bul (yoksa 10)"""
+        for idx in range(1, 20):
+            # ws.cell() olmayan hücreyi oluşturur; sadece var olanlara bak
+            cell = ws._cells.get((idx, 1))
+            if cell is not None and cell.value and str(cell.value).strip().upper() == 'NO':
+                return idx + 1
+        return 10
+
+    def _clear_data_area(self, ws):
+        """Başlangıç satırından sonraki 1000 satırı (A:K) temizle.
+
+        Sadece şablonda var olan hücrelere dokunulur. Kenarlık, format ve değer
+        dışında stili olmayan hücreler tamamen silinir; yazı tipi, dolgu gibi
+        stili olanların kenarlığı ve formatı sıfırlanır.
+        """
+        from openpyxl.styles import Border
+
+        no_border = Border()
+        end_row = self.start_row + 1000
+        for (row, col), cell in list(ws._cells.items()):
+            if not (self.start_row <= row < end_row and col <= 11):
+                continue
+            style = cell._style
+            if not (style.fontId or style.fillId or style.alignmentId or style.protectionId):
+                del ws._cells[row, col]
+                continue
+            cell.border = no_border
+            cell.number_format = 'General'
+            cell.value = None
+
+    def open_workbook(self):
+        """Derlenmiş şablondan yeni, düzenlenebilir bir çalışma kitabı aç"""
+        from openpyxl import load_workbook
+        return load_workbook(BytesIO(self.data))
+
+
+class MergeEngine:
+    """Ayrıştırma ve birleştirme hattı; Tk'ye bağımlı değildir.
+
+    Seçenekler nitelik olarak tutulur, arayüz her işlemden önce günceller.
+    """
+
+    def __init__(self, template_path=None, show_header_info=True, reader='pandas',
+                 writer='template', parse_cache=None, export_formats=(), read_budget=None,
+                 memory_limit=None):
+        self.template_path = Path(template_path) if template_path else get_script_dir() / TEMPLATE_NAME
+        self.show_header_info = show_header_info
+        self.reader = reader
+        self.writer = writer
+        self.export_formats = tuple(export_formats)
+        self.read_budget = read_budget  # (satır, bayt); None: READ_ROW_BUDGET, READ_MEMORY_BUDGET
+        self.memory_limit = memory_limit  # bayt; None: sınırsız (bkz. output_writer)
+        self.parse_cache = parse_cache if parse_cache is not None else ParseCache()
+        self._cell_styles = None  # ilk yazımda oluşturulur
+        self._compiled_template = None
+        self._template_lock = threading.Lock()
+
+    # ── Kontroller ───────────────────────────────────────────
+
+    def check_template(self):
+        """Şablon yolunu döndür; yoksa ya da kilitliyse MergeError"""
+        if not self.template_path.exists():
+            raise MergeError(
+                f"Template bulunamadı!\n\nLütfen {TEMPLATE_NAME} dosyasını\n"
+                f"script ile aynı klasöre koy.\n\n{self.template_path.parent}"
+            )
+        # Template erişim kontrolü
+        if is_file_locked(self.template_path):
+            raise MergeError("Template dosyası kilitli!\nExcel'de açıksa kapatıp tekrar deneyin.")
+        return self.template_path
+
+    def compiled_template(self):
+        """Derlenmiş şablonu döndür; şablon değişmişse (ya da ilk çağrıda) yeniden derle.
+
+        Şablon değişmediyse dosya açılmaz, sadece stat bilgisine bakılır.
+        """
+        with self._template_lock:
+            compiled = self._compiled_template
+            try:
+                current = CompiledTemplate.stat_key_for(self.template_path)
+            except OSError:
+                current = None
+            if (compiled is not None and compiled.path == self.template_path
+                    and compiled.stat_key == current):
+                return compiled
+            self._compiled_template = None
+            self.check_template()
+            compiled = CompiledTemplate(self.template_path)
+            self._compiled_template = compiled
+            return compiled
+
+    @staticmethod
+    def check_output_dir(output_dir):
+        """Çıktı klasörü yazma izni kontrolü"""
+        if not check_write_permission(output_dir):
+            raise MergeError(f"Çıktı klasörüne yazılamıyor!\n{output_dir}")
+
+    @staticmethod
+    def default_output_path(output_dir):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return Path(output_dir) / f'MERGED_FINAL_LIST_{timestamp}.xlsx'
+
+    # ── Excel İşlemleri ──────────────────────────────────────
+
+    def output_writer(self):
+        """Birleştirmede kullanılacak çıktı motoru.
+
+        Şablon motoru tüm hücreleri kayda kadar bellekte tutar; bellek sınırı
+        verildiyse (düşük bellek modu) satırları hemen diske yazan akış motoru
+        kullanılır, böylece bellek kullanımı dosya sayısından bağımsız kalır.
+        """
+        return 'streaming' if self.memory_limit is not None else self.writer
+
+    def _cached_values(self):
+        """Birleştirmenin kayıtlı değer deposu; bellek sınırının sekizde biri aşılınca diske taşar"""
+        if self.memory_limit is None:
+            return CachedValues()
+        return CachedValues(max(1, self.memory_limit // 8 // _CACHED_VALUE_MEMORY_ESTIMATE))
+
+    def new_trace(self, files):
+        """Bu motorun seçenekleriyle yeni bir MergeTrace"""
+        return MergeTrace(reader=self.reader, writer=self.output_writer(), files_count=len(files),
+                          memory_limit=self.memory_limit)
+
+    def create_merged_file(self, files, output_path, trace=None, progress=None, cancel=None):
+        """Dosyaları şablonla birleştirip output_path'e yaz.
+
+        {'orders', 'total_items', 'skipped', 'bloated', 'order_rows', 'summary_rows', 'trace',
+        'exports'} sözlüğü döndürür; skipped okunamayan dosyaların adları, bloated
+        şişkin sayfalı dosyaların (ad, bildirilen boyut) çiftleri, order_rows ve
+        summary_rows doğrulamanın okuyacağı satır numaraları (bkz. verify_merged_file),
+        trace aşama sürelerini tutan MergeTrace'tir (verilmezse yenisi açılır),
+        exports export_formats seçildiyse yazılan item dosyalarıdır (bkz. ItemExport).
+        Çıktının yanına eklemeli birleştirme için manifest yazılır (bkz. append_merged_file).
+
+        progress verilirse her aşamada {'phase', 'file_index', 'file_count',
+        'file_name', 'rows'} sözlüğüyle çağrılır (birleştirme thread'inden).
+        cancel (threading.Event) işaretlenirse bir sonraki dosya sınırında
+        MergeCancelled fırlatılır; yarım kalan çıktı silinir.
+        """
+        if trace is None:
+            trace = self.new_trace(files)
+        stats = {'orders': 0, 'total_items': 0, 'skipped': [], 'bloated': [], 'order_rows': [],
+                 'summary_rows': [], 'trace': trace, 'exports': []}
+        cached_values = self._cached_values()
+        run = {'progress': progress, 'cancel': cancel, 'file_count': len(files), 'saving': False,
+               'export': ItemExport(output_path, self.export_formats) if self.export_formats else None,
+               'entries': []}
+        try:
+            if self.output_writer() == 'streaming':
+                sheet_path = self._create_merged_file_streaming(files, output_path, stats, cached_values, run)
+            else:
+                sheet_path = self._create_merged_file_template(files, output_path, stats, cached_values, run)
+            self._check_progress(run, 'cached_values')
+            with trace.phase('cached_values'):
+                sheet_hash = self._write_cached_values(output_path, sheet_path, cached_values)
+            if run['export'] is not None:
+                with trace.phase('export'):
+                    run['export'].close()
+                stats['exports'] = run['export'].paths
+            with trace.phase('manifest'):
+                self._save_manifest(output_path, sheet_hash, run['entries'])
+        except BaseException:
+            if run['export'] is not None:
+                run['export'].abort()
+            # Kayda başlandıysa dosya yarım kalmıştır; eski bir dosyanın üzerine
+            # yazılmadıysa zaten diskte bir şey yoktur
+            if run['saving']:
+                for path in (Path(output_path), Path(f'{output_path}.tmp')):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+            raise
+        finally:
+            cached_values.close()
+        return stats
+
+    @staticmethod
+    def _check_progress(run, phase, file_index=None, file_name=None, rows=None):
+        """İptal istendiyse MergeCancelled fırlat, değilse ilerleme bildir"""
+        cancel = run['cancel']
+        if cancel is not None and cancel.is_set():
+            raise MergeCancelled()
+        if run['progress'] is not None:
+            run['progress']({
+                'phase': phase, 'file_index': file_index, 'file_count': run['file_count'],
+                'file_name': file_name, 'rows': rows,
+            })
+
+    def _create_merged_file_template(self, files, output_path, stats, cached_values, run):
+        """Derlenmiş şablonun kopyasına yaz; çalışma sayfasının arşivdeki yolunu döndür"""
+        trace = stats['trace']
+        with trace.phase('template'):
+            template = self.compiled_template()
+            wb = template.open_workbook()
+        ws = wb.active
+        template_start_row = template.start_row
+        with trace.phase('styles'):
+            self._register_named_styles(wb)
+
+        last_row = template_start_row - 1
+        for row_num, cells, merges in self._merged_rows(files, template_start_row, stats, cached_values, run):
+            self._place_row(ws, row_num, cells, merges)
+            last_row = row_num
+
+        for letter, width in MERGED_COLUMN_WIDTHS.items():
+            ws.column_dimensions[letter].width = width
+        ws.print_area = f'A1:H{last_row}'
+        ws.sheet_view.showGridLines = False
+
+        self._check_progress(run, 'save')
+        run['saving'] = True
+        with trace.phase('save'):
+            wb.save(output_path)
+        return ws.path
+
+    def _create_merged_file_streaming(self, files, output_path, stats, cached_values, run):
+        """Write-only çalışma kitabıyla satırları akıtarak yaz.
+
+        Şablon sadece okunur: NO satırının üstündeki başlık bloğu (değer, stil,
+        satır yükseklikleri, birleştirmeler, görseller), sütun genişlikleri ve
+        sayfa ayarları kopyalanır; sipariş blokları ve GRAND SUMMARY ardından
+        satır satır eklenir. Yazılan satırlar bellekte tutulmaz. Çalışma sayfasının
+        arşivdeki yolunu döndürür.
+        """
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.worksheet.cell_range import CellRange
+        from openpyxl.utils.indexed_list import IndexedList
+
+        trace = stats['trace']
+        with trace.phase('template'):
+            template = self.compiled_template()
+        template_start_row = template.start_row
+
+        wb = Workbook(write_only=True)
+        # Stilsiz hücreler şablondaki gibi görünsün (varsayılan yazı tipi ve kenarlık)
+        wb._fonts = IndexedList([copy(template.default_font)])
+        wb._borders = IndexedList([copy(template.default_border)])
+        with trace.phase('styles'):
+            self._register_named_styles(wb)
+        ws = wb.create_sheet(template.title)
+
+        # Sütun ve sayfa ayarları ilk satır yazılmadan önce yapılmalı
+        # (stil nesneleri değiştirilmez, atama yeni çalışma kitabına kaydeder)
+        for letter, min_col, max_col, width, styles in template.column_dimensions:
+            dim = ws.column_dimensions[letter]
+            dim.min, dim.max = min_col, max_col
+            dim.width = width
+            if styles:
+                dim.font, dim.fill, dim.border, dim.alignment, dim.number_format = styles
+        for letter, width in MERGED_COLUMN_WIDTHS.items():
+            ws.column_dimensions[letter].width = width
+        ws.page_setup = copy(template.page_setup)
+        ws.print_options = copy(template.print_options)
+        ws.page_margins = copy(template.page_margins)
+        ws.sheet_view.showGridLines = False
+        for image in template.images:
+            ws.add_image(image)
+
+        # Şablon başlık bloğu
+        for row_num, height, cells in template.header_rows:
+            if height:
+                ws.row_dimensions[row_num].height = height
+            row = []
+            for value, styles in cells:
+                cell = WriteOnlyCell(ws, value=value)
+                if styles:
+                    (cell.font, cell.fill, cell.border, cell.alignment,
+                     cell.protection, cell.number_format) = styles
+                row.append(cell)
+            ws.append(row)
+        for coord in template.header_merges:
+            ws.merged_cells.add(coord)
+
+        style_arrays = {}
+        last_row = template_start_row - 1
+        for row_num, cells, merges in self._merged_rows(files, template_start_row, stats, cached_values, run):
+            for first_col, last_col in merges:
+                ws.merged_cells.add(CellRange(
+                    min_col=first_col, min_row=row_num, max_col=last_col, max_row=row_num
+                ))
+            ws.append(self._stream_row(ws, cells, style_arrays))
+            last_row = row_num
+
+        ws.print_area = f'A1:H{last_row}'
+        self._check_progress(run, 'save')
+        run['saving'] = True
+        with trace.phase('save'):
+            wb.save(output_path)
+        # write-only sayfanın yolu kayıt sırasında belirlenir
+        return ws.path
+
+    def _place_row(self, ws, row_num, cells, merges):
+        """Satırı düzenlenebilir sayfaya yaz (şablon motoru)"""
+        for first_col, last_col in merges:
+            ws.merge_cells(start_row=row_num, start_column=first_col, end_row=row_num, end_column=last_col)
+        for col, spec in cells.items():
+            self._write_cell(ws.cell(row_num, col), spec)
+
+    def _stream_row(self, ws, cells, style_arrays):
+        """Satırın write-only hücre listesi (boş sütunlar None).
+
+        Tüm hücreler yeni olduğundan her (stil, format) çifti bir kez çözülür,
+        sonraki hücrelere style_arrays'teki hazır stil dizisi kopyalanır.
+        """
+        from openpyxl.cell import WriteOnlyCell
+
+        row = [None] * max(cells, default=0)
+        for col, (value, style, number_format) in cells.items():
+            cell = WriteOnlyCell(ws, value=value)
+            if style or number_format:
+                style_array = style_arrays.get((style, number_format))
+                if style_array is None:
+                    self._write_cell(cell, (None, style, number_format))
+                    style_arrays[style, number_format] = copy(cell._style)
+                else:
+                    cell._style = copy(style_array)
+            row[col - 1] = cell
+        return row
+
+    def _merged_rows(self, files, start_row, stats, cached_values, run):
+        """Birleştirilmiş listenin satırlarını sırayla üret.
+
+        Her eleman (satır no, {sütun: (değer, stil, sayı formatı)}, [(ilk sütun, son sütun)])
+        şeklindedir; boş satırlar da üretilir. Her iki çıktı motoru da bu düzeni yazar.
+        stats sözlüğü sipariş/item sayıları ve okunamayan dosyalarla güncellenir.
+        cached_values formül hücrelerinin Decimal ile hesaplanmış sonuçlarıyla
+        ({'G15': Decimal}) doldurulur; Excel'de hata verecek formüller eklenmez.
+        Her dosyanın başında iptal kontrol edilir ve ilerleme bildirilir (run);
+        dışa aktarma açıksa item satırları run['export']'a da eklenir. Dosyaların
+        parmak izi ve sipariş blokları manifest için run['entries']'e eklenir.
+        """
+        current_row = start_row
+        trace = stats['trace']
+        for file_index, file_path in enumerate(files):
+            self._check_progress(run, 'parse', file_index, Path(file_path).name, current_row - start_row)
+            # Yazma süresi üretecin bu siparişte geçirdiği süredir: çıktı motoru
+            # satırları yield'ler arasında yazar
+            parse_started = time.perf_counter()
+            fingerprint = source_fingerprint(file_path)
+            order_data = self.extract_order_data(file_path)
+            write_started = time.perf_counter()
+            block = None
+            if order_data:
+                block = yield from self._order_rows(file_path, order_data, current_row, stats,
+                                                    cached_values, run['export'])
+                current_row = block['end_row']
+            else:
+                stats['skipped'].append(Path(file_path).name)
+            run['entries'].append({'path': str(Path(file_path).resolve()), 'fingerprint': fingerprint,
+                                   'block': block})
+            trace.add_file(Path(file_path).name, write_started - parse_started,
+                           time.perf_counter() - write_started, block and block['item_count'])
+
+        if len(stats['order_rows']) > 1:
+            self._check_progress(run, 'summary', len(files), None, current_row - start_row)
+        yield from self._summary_rows(stats['order_rows'], current_row, stats, cached_values)
+
+    def _order_rows(self, file_path, order_data, current_row, stats, cached_values, export):
+        """Tek siparişin bloğunu (bilgi, başlık, item, toplam ve 3 boş satır) üret.
+
+        Bloğun satır numaralarını ve toplamlarını tutan sözlüğü stats['order_rows']'a
+        ekleyip döndürür (yield from ile); blok current_row'dan end_row'a kadardır.
+        """
+        headers = ['NO', 'DESCRIPTION', 'CODE', 'QTTY', 'UNIT', 'U.PRICE', 'T.PRICE', 'REMARKS']
+        start_row = current_row
+        stats['orders'] += 1
+        if order_data.get('bloated_dimension'):
+            stats['bloated'].append((order_data['file_name'], order_data['bloated_dimension']))
+
+        info = order_data['header_info']
+        info_text = f"Order: {order_data['file_name']}"
+        if 'rfq_ref' in info:
+            info_text += f" | RFQ: {info['rfq_ref']}"
+        if 'qtn_ref' in info:
+            info_text += f" | QTN: {info['qtn_ref']}"
+
+        currency = info.get('currency', '')
+        currency_symbol = CURRENCY_SYMBOLS.get(currency.upper(), currency) if currency else ''
+        if currency:
+            info_text += f" | {currency}"
+
+        # Sipariş bilgileri (A3:B5) sağ üst köşede + info text solda
+        header_cells = order_data.get('header_cells', [])
+        has_cells = self.show_header_info and any(l or v for l, v in header_cells)
+
+        if has_cells:
+            # İlk satıra info text (sol) + ilk header cell (sağ)
+            for i, (label, value) in enumerate(header_cells):
+                cells = {}
+                if i == 0:
+                    cells[2] = (info_text, 'info_text', None)
+                if label or value:
+                    clean_label = label.rstrip(' :')
+                    cells[7] = (f"{clean_label} : " if clean_label else '', 'info_label', None)
+                    cells[8] = (value, 'info_value', None)
+                yield current_row, cells, []
+                current_row += 1
+        else:
+            yield current_row, {2: (info_text, 'info_text', None)}, []
+            current_row += 1
+
+        yield current_row, {col: (header, 'header', None) for col, header in enumerate(headers, start=1)}, []
+        current_row += 1
+
+        item_count = 0
+        data_start_row = current_row
+        price_format = f'"{currency_symbol}"#,##0.00' if currency_symbol else '#,##0.00'
+
+        line_totals = []
+        for data_row in order_data['data_rows']:
+            item_count += 1
+            line_total = self._line_total(data_row)
+            line_totals.append(line_total)
+            if line_total is not None:
+                cached_values[f'G{current_row}'] = line_total
+            if export is not None:
+                export.add(order_data, item_count, data_row, line_total)
+            cells = {col: (None, 'data', None) for col in range(1, 9)}
+            for col_idx, value in enumerate(data_row, start=1):
+                style = 'data' if col_idx <= 8 else None
+                if col_idx == 1:
+                    cells[col_idx] = (item_count, style, None)
+                elif col_idx != 7:
+                    number_format = price_format if col_idx == 6 and value is not None else None
+                    cells[col_idx] = (value, style, number_format)
+            # T.PRICE kaynakta sütun olmasa da (NO..U.PRICE) formüldür: TOTAL'in SUM'ı
+            # ve G hücresinin kayıtlı değeri buna dayanır
+            cells[7] = (f"=D{current_row}*F{current_row}", 'data', price_format)
+            yield current_row, cells, []
+            current_row += 1
+
+        stats['total_items'] += item_count
+        yield current_row, {}, []
+        current_row += 1
+
+        total_row = current_row
+        order_total = None if None in line_totals else sum(line_totals, Decimal(0))
+        yield current_row, self._total_row_cells(
+            'TOTAL:', f"=SUM(G{data_start_row}:G{data_start_row + item_count - 1})", price_format
+        ), []
+        current_row += 1
+
+        disc_pct = info.get('discount_pct', 10)
+        disc_row = current_row
+        # Formüldeki çarpanla aynı metinden: Excel'in hesapladığı değerle birebir
+        disc_rate = Decimal(f'{disc_pct / 100}')
+        order_disc = order_total * disc_rate if order_total is not None else None
+        yield current_row, self._total_row_cells(
+            f'DISC.({disc_pct}%):', f"=G{total_row}*{disc_pct/100}", price_format
+        ), []
+        current_row += 1
+
+        gtotal_row = current_row
+        order_gtotal = order_total - order_disc if order_total is not None else None
+        yield current_row, self._total_row_cells(
+            'G. TOTAL:', f"=G{total_row}-G{disc_row}", price_format
+        ), []
+        if order_total is not None:
+            cached_values[f'G{total_row}'] = order_total
+            cached_values[f'G{disc_row}'] = order_disc
+            cached_values[f'G{gtotal_row}'] = order_gtotal
+        current_row += 1
+        for _ in range(3):
+            yield current_row, {}, []
+            current_row += 1
+
+        block = {
+            'file_path': Path(file_path), 'file_name': order_data['file_name'],
+            'first_row': data_start_row, 'item_count': item_count,
+            'total_row': total_row, 'disc_row': disc_row, 'gtotal_row': gtotal_row,
+            'start_row': start_row, 'end_row': current_row, 'currency_symbol': currency_symbol,
+            'totals': (order_total, order_disc, order_gtotal),
+            'bloated_dimension': order_data.get('bloated_dimension'),
+        }
+        stats['order_rows'].append(block)
+        return block
+
+    def _summary_rows(self, orders, current_row, stats, cached_values):
+        """Birden fazla sipariş varsa GRAND SUMMARY satırlarını üret (orders: blok sözlükleri)"""
+        if len(orders) <= 1:
+            return
+        trace = stats['trace']
+        summary_started = time.perf_counter()
+        last_currency_symbol = orders[-1]['currency_symbol']
+        summary_format = f'"{last_currency_symbol}"#,##0.00' if last_currency_symbol else '#,##0.00'
+
+        # Ayırıcı çizgi
+        yield current_row, {col: (None, 'separator', None) for col in range(1, 9)}, []
+        current_row += 1
+
+        # Başlık satırı
+        cells = {col: (None, 'banner_fill', None) for col in range(2, 9)}
+        cells[1] = (f'GRAND SUMMARY  —  {len(orders)} ORDERS', 'banner', None)
+        yield current_row, cells, [(1, 8)]
+        current_row += 1
+
+        # Boş ayırıcı
+        yield current_row, {}, []
+        current_row += 1
+
+        summary_lines = [
+            ('TOTAL :', 'total_row', 'summary'),
+            ('TOTAL DISCOUNT :', 'disc_row', 'summary'),
+            ('GRAND TOTAL :', 'gtotal_row', 'grand'),
+        ]
+        for index, (label, key, style) in enumerate(summary_lines):
+            refs = '+'.join([f'G{order[key]}' for order in orders])
+            parts = [order['totals'][index] for order in orders]
+            if None not in parts:
+                cached_values[f'G{current_row}'] = sum(parts, Decimal(0))
+            cells = {
+                4: (label, f'{style}_label', None),
+                5: (None, f'{style}_label_fill', None),
+                6: (None, f'{style}_label_fill', None),
+                7: (f'={refs}', f'{style}_value', summary_format),
+                8: (None, f'{style}_value_fill', None),
+            }
+            yield current_row, cells, [(4, 6), (7, 8)]
+            stats['summary_rows'].append(current_row)
+            current_row += 1
+
+        yield current_row, {}, []
+        trace.add('write', time.perf_counter() - summary_started)
+
+    @staticmethod
+    def _line_total(data_row):
+        """Satır tutarı (QTTY * U.PRICE); Excel'de #VALUE! verecekse None"""
+        qty = MergeEngine._to_decimal(data_row[3]) if len(data_row) > 3 else Decimal(0)
+        price = MergeEngine._to_decimal(data_row[5]) if len(data_row) > 5 else Decimal(0)
+        return qty * price if qty is not None and price is not None else None
+
+    @staticmethod
+    def _to_decimal(value):
+        """Hücre değerini Excel'in çarpmada yorumladığı gibi Decimal'e çevir.
+
+        Boş hücre 0'dır; sayıya çevrilemeyen metin #VALUE! verir, None döner.
+        """
+        if value is None or isinstance(value, bool):
+            return Decimal(int(value or 0))
+        if isinstance(value, int):
+            return Decimal(value)
+        if isinstance(value, float):
+            # openpyxl sayıları 16 anlamlı basamakla yazar (84.57 -> 84.56999999999999);
+            # hesap dosyadaki değerle yapılır ki Excel'in sonucuyla aynı olsun
+            return Decimal(0) if math.isnan(value) else Decimal('%.16g' % value)
+        try:
+            return Decimal(str(value).strip())
+        except InvalidOperation:
+            return None
+
+    @classmethod
+    def _write_cached_values(cls, output_path, sheet_path, cached_values):
+        """Kaydedilmiş dosyadaki formül hücrelerine hesaplanmış sonuçları ekle.
+
+        openpyxl formülleri boş <v/> ile yazar; yeniden hesaplamayan görüntüleyiciler
+        de doğru değeri göstersin diye sayfa XML'i bir kez daha yazılır. Sayfa
+        SHEET_CHUNK_BYTES'lık parçalarla işlenir, tamamı belleğe alınmaz. Sayfanın
+        son halinin hash'ini (manifest için) döndürür.
+        """
+        sheet_path = sheet_path.lstrip('/')
+        digest = hashlib.blake2b(digest_size=20)
+        if not cached_values:
+            with zipfile.ZipFile(output_path) as archive, archive.open(sheet_path) as source:
+                for chunk in iter(lambda: source.read(SHEET_CHUNK_BYTES), b''):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        with zipfile.ZipFile(output_path) as zin, \
+                zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+            for item in zin.infolist():
+                if item.filename != sheet_path:
+                    zout.writestr(item, zin.read(item.filename))
+                    continue
+                with zin.open(item) as source, zout.open(item, 'w') as target:
+                    for chunk in cls._fill_cached_chunks(source, cached_values):
+                        digest.update(chunk)
+                        target.write(chunk)
+        os.replace(tmp_path, output_path)
+        return digest.hexdigest()
+
+    @classmethod
+    def _fill_cached_chunks(cls, source, cached_values):
+        """Sayfa XML'ini parça parça oku, kayıtlı değerleri ekleyip parça parça ver.
+
+        Parçalar son </row>'dan bölünür; formül hücresi hiçbir zaman iki parçaya
+        düşmez ve hücreler satır sırasıyla işlenir (bkz. CachedValues).
+        """
+        pending = b''
+        for chunk in iter(lambda: source.read(SHEET_CHUNK_BYTES), b''):
+            pending += chunk
+            split = pending.rfind(b'</row>')
+            if split < 0:
+                continue
+            split += len(b'</row>')
+            yield cls._fill_cached_values(pending[:split].decode('utf-8'), cached_values).encode('utf-8')
+            pending = pending[split:]
+        if pending:
+            yield cls._fill_cached_values(pending.decode('utf-8'), cached_values).encode('utf-8')
+
+    @staticmethod
+    def _fill_cached_values(sheet_xml, cached_values):
+        """Sayfa XML'indeki değersiz formül hücrelerine cached_values'taki sonuçları yaz"""
+        def fill(match):
+            value = cached_values.get(match.group(2))
+            if value is None:
+                return match.group(0)
+            return f'{match.group(1)}<v>{value:f}</v>'
+
+        return _FORMULA_CELL_RE.sub(fill, sheet_xml)
+
+    @staticmethod
+    def _total_row_cells(label, formula, price_format):
+        cells = {col: (None, 'total_blank', None) for col in range(1, 9)}
+        cells[6] = (label, 'total_label', None)
+        cells[7] = (formula, 'total_value', price_format)
+        return cells
+
+    # ── Eklemeli Birleştirme ─────────────────────────────────
+
+    def _manifest_options(self):
+        """Çıktının içeriğini etkileyen seçenekler (manifest'te saklanır)"""
+        return {
+            'show_header_info': self.show_header_info, 'reader': self.reader, 'writer': self.output_writer(),
+            'read_budget': list(self.read_budget) if self.read_budget else None,
+        }
+
+    def _save_manifest(self, output_path, sheet_hash, entries):
+        """Çıktının yanına manifest yaz: dosya parmak izleri, sipariş blokları ve sayfa hash'i.
+
+        Manifest yazılamazsa birleştirme etkilenmez; sadece o çıktıya ekleme yapılamaz.
+        """
+        template = self.compiled_template()
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'options': self._manifest_options(),
+            'template': list(template.stat_key),
+            'start_row': template.start_row,
+            'sheet_hash': sheet_hash,
+            'files': [
+                {'path': entry['path'], 'fingerprint': entry['fingerprint'],
+                 'block': self._block_to_json(entry['block'])}
+                for entry in entries
+            ],
+        }
+        path = manifest_path(output_path)
+        try:
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def load_manifest(self, output_path):
+        """Çıktının manifest'ini oku; yoksa ya da okunamıyorsa MergeError"""
+        path = manifest_path(output_path)
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(manifest.get('version'))
+            for entry in manifest['files']:
+                entry['block'] = self._block_from_json(entry['block'])
+        except (OSError, ValueError, KeyError, TypeError):
+            raise MergeError(
+                f"Birleştirme bilgisi bulunamadı:\n{path.name}\n\n"
+                "Bu dosyaya ekleme yapılamaz, dosyaları yeniden birleştirin."
+            ) from None
+        return manifest
+
+    @staticmethod
+    def _block_to_json(block):
+        if block is None:
+            return None
+        return {**block, 'file_path': str(block['file_path']),
+                'totals': [None if total is None else str(total) for total in block['totals']]}
+
+    @staticmethod
+    def _block_from_json(block):
+        if block is None:
+            return None
+        return {**block, 'file_path': Path(block['file_path']),
+                'totals': tuple(None if total is None else Decimal(total) for total in block['totals'])}
+
+    def append_merged_file(self, files, output_path, trace=None, progress=None, cancel=None):
+        """Mevcut birleştirilmiş çıktıya yeni dosyaları ekle, değişen siparişleri güncelle.
+
+        Manifest'teki dosyalar (aynı sırayla) ve files içinde olup manifest'te
+        olmayanlar (sona) birleştirilir; sonuç bu listenin tam birleştirmesiyle
+        aynıdır. Sadece yeni ya da değişmiş dosyalar ayrıştırılıp yazılır;
+        değişmeyen sipariş blokları sayfa XML'inden kopyalanır (gerekirse satır
+        numaraları kaydırılır), GRAND SUMMARY yeniden kurulur ve çıktı atomik
+        olarak değiştirilir. Çıktı birleştirmeden sonra değiştirilmişse, seçenekler
+        ya da şablon farklıysa liste baştan birleştirilir.
+
+        create_merged_file ile aynı sözlüğü döndürür; ek olarak 'append' anahtarı
+        {'reused', 'rewritten', 'rebuild_reason'} tutar (rebuild_reason: baştan
+        birleştirildiyse sebebi). Manifest yoksa ya da çıktı açıksa MergeError;
+        iptal ya da hata durumunda eski çıktı olduğu gibi kalır.
+        """
+        output_path = Path(output_path)
+        manifest = self.load_manifest(output_path)
+        if is_file_locked(output_path):
+            raise MergeError("Çıktı dosyası kilitli!\nExcel'de açıksa kapatıp tekrar deneyin.")
+
+        known = {entry['path'] for entry in manifest['files']}
+        new_files = []
+        for file_path in files:
+            path = str(Path(file_path).resolve())
+            if path not in known:
+                known.add(path)
+                new_files.append(path)
+        all_files = [Path(entry['path']) for entry in manifest['files']] + [Path(p) for p in new_files]
+        if trace is None:
+            trace = self.new_trace(all_files)
+
+        try:
+            return self._append_merged_file(manifest, new_files, output_path, trace, progress, cancel)
+        except _RebuildNeeded as e:
+            reason = str(e)
+        # Baştan birleştirme iptal edilir ya da hata verirse eski liste geri konur
+        backup_path = output_path.with_name(output_path.name + '.bak')
+        os.replace(output_path, backup_path)
+        try:
+            stats = self.create_merged_file(all_files, output_path, trace, progress, cancel)
+        except BaseException:
+            os.replace(backup_path, output_path)
+            raise
+        backup_path.unlink()
+        stats['append'] = {'reused': 0, 'rewritten': stats['orders'], 'rebuild_reason': reason}
+        return stats
+
+    def _append_merged_file(self, manifest, new_files, output_path, trace, progress, cancel):
+        """append_merged_file'ın sayfa XML'ini parça parça yeniden kuran kısmı.
+
+        Eklemenin yapılamadığı her durumda çıktıya dokunmadan _RebuildNeeded fırlatır.
+        """
+        from openpyxl import Workbook
+        from openpyxl.styles.stylesheet import apply_stylesheet, write_stylesheet
+        from openpyxl.xml.functions import tostring
+
+        if manifest['options'] != self._manifest_options():
+            raise _RebuildNeeded('birleştirme seçenekleri değişmiş')
+        with trace.phase('template'):
+            template = self.compiled_template()
+        if manifest['template'] != list(template.stat_key) or manifest['start_row'] != template.start_row:
+            raise _RebuildNeeded('şablon değişmiş')
+        if self.output_writer() != 'streaming' and not template.data_area_empty:
+            raise _RebuildNeeded('şablonun veri alanında hücre var')
+        start_row = template.start_row
+
+        # Çıktının stil tablosu: yeni satırlar mevcut stil numaralarıyla yazılır
+        with trace.phase('styles'):
+            with zipfile.ZipFile(output_path) as archive:
+                sheet_path = _first_sheet_path(archive)
+                sheet_data = archive.read(sheet_path)
+                workbook_xml = archive.read('xl/workbook.xml').decode('utf-8')
+                wb = Workbook()
+                apply_stylesheet(archive, wb)
+            if hashlib.blake2b(sheet_data, digest_size=20).hexdigest() != manifest['sheet_hash']:
+                raise _RebuildNeeded('çıktı birleştirmeden sonra değiştirilmiş')
+            # openpyxl tekrarlanan kayıtlardan sonrakilerin numarasını kaydırarak
+            # indeksler; her değer ilk göründüğü numarayla eşlensin (kayıtlar aynı kalır)
+            for table in (wb._fonts, wb._fills, wb._borders, wb._number_formats, wb._cell_styles,
+                          wb._alignments, wb._protections):
+                table._dict = {}
+                for index, value in enumerate(table):
+                    table._dict.setdefault(value, index)
+                table.clean = True
+            self._register_named_styles(wb)
+            table_sizes = self._style_table_sizes(wb)
+
+        # Eski sipariş bloklarının sayfa XML'indeki yerleri
+        sheet_xml = sheet_data.decode('utf-8')
+        data_end = sheet_xml.find('</sheetData>')
+        if data_end < 0:
+            raise _RebuildNeeded('çıktı manifest ile uyuşmuyor')
+        slots = []  # [manifest kaydı ya da None, eski blok XML'i ya da None, dosya yolu]
+        head_end = data_end
+        previous = None  # (son bloğun slot'u, XML'deki başlangıcı)
+        position = 0
+        for entry in manifest['files']:
+            slot = [entry, None, entry['path']]
+            slots.append(slot)
+            block = entry['block']
+            if block is None:
+                continue
+            position = sheet_xml.find(f'<row r="{block["start_row"]}"', position, data_end)
+            if position < 0:
+                raise _RebuildNeeded('çıktı manifest ile uyuşmuyor')
+            if previous is None:
+                head_end = position
+            else:
+                previous[0][1] = sheet_xml[previous[1]:position]
+            previous = (slot, position)
+        if previous is not None:
+            # Son bloğun ardından GRAND SUMMARY (varsa) gelir
+            summary_start = sheet_xml.find(f'<row r="{previous[0][0]["block"]["end_row"]}"',
+                                           previous[1], data_end)
+            previous[0][1] = sheet_xml[previous[1]:summary_start if summary_start >= 0 else data_end]
+        slots.extend([None, None, path] for path in new_files)
+
+        stats = {'orders': 0, 'total_items': 0, 'skipped': [], 'bloated': [], 'order_rows': [],
+                 'summary_rows': [], 'trace': trace, 'exports': [], 'append': None}
+        run = {'progress': progress, 'cancel': cancel, 'file_count': len(slots), 'saving': False,
+               'export': None, 'entries': []}
+        style_arrays = {}
+        reused = rewritten = 0
+        tmp_path = output_path.with_name(output_path.name + '.tmp')
+        try:
+            export = run['export'] = (ItemExport(output_path, self.export_formats)
+                                      if self.export_formats else None)
+            body = []
+            current_row = start_row
+            for file_index, (entry, segment, path) in enumerate(slots):
+                file_path = Path(path)
+                old_fingerprint = entry['fingerprint'] if entry else None
+                fingerprint = source_fingerprint(file_path, old_fingerprint)
+                if segment is not None and fingerprint and fingerprint[2] == old_fingerprint[2]:
+                    # Değişmemiş sipariş: bloğu kopyala, yeri değiştiyse satırları kaydır
+                    splice_started = time.perf_counter()
+                    block = entry['block']
+                    delta = current_row - block['start_row']
+                    if delta:
+                        segment = self._shift_block(segment, block, delta)
+                        block = self._shifted_block(block, delta)
+                    body.append(segment)
+                    self._reuse_block(file_path, block, stats, export)
+                    current_row = block['end_row']
+                    reused += 1
+                    trace.add('splice', time.perf_counter() - splice_started)
+                else:
+                    self._check_progress(run, 'parse', file_index, file_path.name, current_row - start_row)
+                    parse_started = time.perf_counter()
+                    order_data = self.extract_order_data(file_path)
+                    write_started = time.perf_counter()
+                    block = None
+                    if order_data:
+                        segment, _, _ = self._render_filled(
+                            lambda values: self._order_rows(file_path, order_data, current_row, stats,
+                                                            values, export), wb, style_arrays)
+                        body.append(segment)
+                        block = stats['order_rows'][-1]
+                        current_row = block['end_row']
+                        rewritten += 1
+                    else:
+                        stats['skipped'].append(file_path.name)
+                    trace.add_file(file_path.name, write_started - parse_started,
+                                   time.perf_counter() - write_started, block and block['item_count'])
+                run['entries'].append({'path': path, 'fingerprint': fingerprint, 'block': block})
+
+            orders = stats['order_rows']
+            if len(orders) > 1:
+                self._check_progress(run, 'summary', len(slots), None, current_row - start_row)
+            summary, merges, last_row = self._render_filled(
+                lambda values: self._summary_rows(orders, current_row, stats, values), wb, style_arrays)
+            body.append(summary)
+            if last_row is None:
+                last_row = current_row - 1
+
+            with trace.phase('splice'):
+                head = sheet_xml[:head_end]
+                last_written = self._last_row_number(body)
+                if last_written is not None:
+                    head = re.sub(r'(<dimension ref="[A-Z]+[0-9]+:[A-Z]+)[0-9]+"',
+                                  rf'\g<1>{last_written}"', head, count=1)
+                tail = self._replace_summary_merges(sheet_xml[data_end:], merges, start_row)
+                new_sheet = ''.join([head, *body, tail]).encode('utf-8')
+                replaced = {
+                    sheet_path: new_sheet,
+                    'xl/workbook.xml': re.sub(
+                        r'(<definedName name="_xlnm\.Print_Area"[^>]*>[^<]*\$)[0-9]+(</definedName>)',
+                        rf'\g<1>{last_row}\g<2>', workbook_xml, count=1).encode('utf-8'),
+                }
+                if self._style_table_sizes(wb) != table_sizes:
+                    replaced['xl/styles.xml'] = tostring(write_stylesheet(wb))
+
+            self._check_progress(run, 'save', rows=last_row - start_row + 1)
+            run['saving'] = True
+            with trace.phase('save'):
+                with zipfile.ZipFile(output_path) as zin, \
+                        zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zout:
+                    for item in zin.infolist():
+                        data = replaced.get(item.filename)
+                        zout.writestr(item, data if data is not None else zin.read(item.filename))
+                os.replace(tmp_path, output_path)
+            if export is not None:
+                with trace.phase('export'):
+                    export.close()
+                stats['exports'] = export.paths
+        except BaseException:
+            if run['export'] is not None:
+                run['export'].abort()
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            raise
+        with trace.phase('manifest'):
+            self._save_manifest(output_path, hashlib.blake2b(new_sheet, digest_size=20).hexdigest(),
+                                run['entries'])
+        stats['append'] = {'reused': reused, 'rewritten': rewritten, 'rebuild_reason': None}
+        return stats
+
+    def _reuse_block(self, file_path, block, stats, export):
+        """Kopyalanan bloğu sayımlara ekle; dışa aktarma açıksa item'larını da yaz"""
+        stats['orders'] += 1
+        stats['total_items'] += block['item_count']
+        if block['bloated_dimension']:
+            stats['bloated'].append((block['file_name'], block['bloated_dimension']))
+        stats['order_rows'].append(block)
+        if export is not None:
+            order_data = self.extract_order_data(file_path)
+            if not order_data:
+                raise _RebuildNeeded(f'{file_path.name} okunamadı')
+            for number, data_row in enumerate(order_data['data_rows'], start=1):
+                export.add(order_data, number, data_row, self._line_total(data_row))
+
+    def _render_filled(self, make_rows, wb, style_arrays):
+        """make_rows(cached_values) satırlarını _render_rows ile yaz ve kayıtlı değerleri ekle.
+
+        Her blok kendi deposunu kullanır (bkz. _cached_values): değerler önce
+        eklenip sonra artan satır sırasıyla okunur, bellek sınırında diske taşar.
+        """
+        cached_values = self._cached_values()
+        try:
+            xml, merges, last_row = self._render_rows(make_rows(cached_values), wb, style_arrays)
+            return self._fill_cached_values(xml, cached_values), merges, last_row
+        finally:
+            cached_values.close()
+
+    def _render_rows(self, rows, wb, style_arrays):
+        """Satırları çıktının stil tablosuyla sayfa XML'ine çevir (eklemeli birleştirme).
+
+        Satırlar çıktıyı yazan motorun yazacağı gibi yazılır: şablon motoru boş
+        satırları atlar ve birleştirilmiş hücreleri biçimlendirir, write-only motor
+        her satırı yazar. (xml, birleştirilen aralıklar, son satır no) döndürür.
+        """
+        from itertools import groupby
+        from openpyxl.cell._writer import write_cell
+        from openpyxl.utils import get_column_letter
+        from openpyxl.xml.functions import xmlfile
+
+        ws = wb.create_sheet()
+        merges = []
+        last_row = None
+        buffer = BytesIO()
+        try:
+            with xmlfile(buffer) as xf:
+                with xf.element('sheetData'):
+                    for row_num, cells, row_merges in rows:
+                        merges.extend(f'{get_column_letter(first)}{row_num}:{get_column_letter(last)}{row_num}'
+                                      for first, last in row_merges)
+                        last_row = row_num
+                        if self.output_writer() != 'streaming':
+                            self._place_row(ws, row_num, cells, row_merges)
+                            continue
+                        with xf.element('row', {'r': f'{row_num}'}):
+                            for col, cell in enumerate(self._stream_row(ws, cells, style_arrays), start=1):
+                                if cell is None or (cell._value is None and not cell.has_style):
+                                    continue
+                                cell.row, cell.column = row_num, col
+                                write_cell(xf, ws, cell, cell.has_style)
+                    for row_num, row_cells in groupby(sorted(ws._cells.items()), key=lambda item: item[0][0]):
+                        with xf.element('row', {'r': f'{row_num}'}):
+                            for _, cell in row_cells:
+                                if cell._value is None and not cell.has_style:
+                                    continue
+                                write_cell(xf, ws, cell, cell.has_style)
+        finally:
+            wb.remove(ws)
+        xml = buffer.getvalue().decode('utf-8')
+        return xml[xml.index('>') + 1:xml.rindex('<')], merges, last_row
+
+    @staticmethod
+    def _shift_block(segment, block, delta):
+        """Kopyalanan bloğun satır numaralarını delta kadar kaydır.
+
+        Formüllerden sadece motorun yazdığı G sütunu formülleri (item ve toplam
+        satırları) kaydırılır; kaynaktan '=' ile başlayan metin olduğu gibi kalır.
+        """
+        items = range(block['first_row'], block['first_row'] + block['item_count'])
+        totals = (block['total_row'], block['disc_row'], block['gtotal_row'])
+        cell = ['', 0]  # içinde bulunulan hücrenin (sütun, satır)
+
+        def shift_ref(match):
+            return f'{match.group(1)}{int(match.group(2)) + delta}'
+
+        def shift(match):
+            row, col, cell_row, formula = match.groups()
+            if row is not None:
+                return f'<row r="{int(row) + delta}"'
+            if col is not None:
+                cell[:] = col, int(cell_row)
+                return f'<c r="{col}{int(cell_row) + delta}"'
+            if cell[0] == 'G' and (cell[1] in items or cell[1] in totals):
+                formula = _CELL_REF_RE.sub(shift_ref, formula)
+            return f'<f>{formula}</f>'
+
+        return _ROW_SHIFT_RE.sub(shift, segment)
+
+    @staticmethod
+    def _shifted_block(block, delta):
+        keys = ('first_row', 'total_row', 'disc_row', 'gtotal_row', 'start_row', 'end_row')
+        return {**block, **{key: block[key] + delta for key in keys}}
+
+    @staticmethod
+    def _last_row_number(segments):
+        """Parçalardaki son <row> öğesinin satır numarası (yoksa None)"""
+        for segment in reversed(segments):
+            position = segment.rfind('<row r="')
+            if position >= 0:
+                start = position + len('<row r="')
+                return int(segment[start:segment.index('"', start)])
+        return None
+
+    @staticmethod
+    def _replace_summary_merges(tail, merges, start_row):
+        """Sayfanın </sheetData> sonrası kısmında veri alanındaki birleştirmeleri yenileriyle değiştir"""
+        match = re.search(r'<mergeCells[^>]*>(.*?)</mergeCells>|<mergeCells[^>]*/>', tail, re.S)
+        kept = []
+        if match:
+            kept = [m.group(0) for m in _MERGE_REF_RE.finditer(match.group(1) or '')
+                    if int(m.group(1)) < start_row]
+        cells = kept + [f'<mergeCell ref="{ref}"/>' for ref in merges]
+        element = f'<mergeCells count="{len(cells)}">{"".join(cells)}</mergeCells>' if cells else ''
+        if match:
+            return tail[:match.start()] + element + tail[match.end():]
+        position = _AFTER_MERGES_RE.search(tail).start()
+        return tail[:position] + element + tail[position:]
+
+    @staticmethod
+    def _style_table_sizes(wb):
+        return tuple(len(table) for table in (
+            wb._fonts, wb._fills, wb._borders, wb._number_formats, wb._cell_styles,
+            wb._alignments, wb._protections, wb._named_styles,
+        ))
+
+    # ── Doğrulama ────────────────────────────────────────────
+
+    def verify_merged_file(self, output_path, stats):
+        """Kaydedilmiş çıktıdaki toplamları kaynak dosyalarla karşılaştır.
+
+        Çıktı sayfası akış halinde bir kez okunur; her siparişin satır tutarları,
+        TOTAL, DISC ve G. TOTAL değerleri kaynak data_rows ve discount_pct'den
+        yeniden hesaplanıp hem formüllerle hem kayıtlı değerlerle karşılaştırılır.
+        [{'file_name', 'ok', 'total', 'discount', 'grand_total', 'problems'}] listesi
+        döndürür; GRAND SUMMARY kontrolü 'GRAND SUMMARY' adlı son kayıttır.
+        """
+        trace = stats.get('trace')
+        started = time.perf_counter()
+        results = self._verify_merged_file(output_path, stats)
+        if trace is not None:
+            trace.add('verify', time.perf_counter() - started)
+        return results
+
+    def _verify_merged_file(self, output_path, stats):
+        # Sadece kontrol edilen siparişin hücreleri bellekte tutulur
+        output_rows = self._iter_output_rows(output_path, columns=('D', 'F', 'G'))
+        pending = [next(output_rows, None)]
+
+        def window(last_row):
+            """Sıradaki hücreler, last_row dahil"""
+            cells = {}
+            while pending[0] is not None and pending[0][0] <= last_row:
+                cells.update(pending[0][1])
+                pending[0] = next(output_rows, None)
+            return cells
+
+        results = []
+        expected_sums = [Decimal(0), Decimal(0), Decimal(0)]
+        for rows in stats['order_rows']:
+            order_data = self.extract_order_data(rows['file_path'])
+            problems = []
+            if not order_data:
+                problems.append('Kaynak dosya okunamadı')
+                results.append({'file_name': rows['file_name'], 'ok': False, 'total': None,
+                                 'discount': None, 'grand_total': None, 'problems': problems})
+                expected_sums = None
+                continue
+
+            if order_data.get('truncated'):
+                problems.append(f"Kaynak sayfa okuma bütçesinde kesildi ({order_data['truncated']} satır "
+                                "okundu); sonraki item'lar çıktıda yok")
+            check = self._make_cell_check(window(rows['gtotal_row']), problems)
+            first_row, item_count = rows['first_row'], rows['item_count']
+            data_rows = order_data['data_rows']
+            if len(data_rows) != item_count:
+                problems.append(f'{len(data_rows)} item bekleniyordu, çıktıda {item_count}')
+
+            total = Decimal(0)
+            for offset, data_row in enumerate(data_rows[:item_count]):
+                row = first_row + offset
+                qty = self._to_decimal(data_row[3]) if len(data_row) > 3 else Decimal(0)
+                price = self._to_decimal(data_row[5]) if len(data_row) > 5 else Decimal(0)
+                check(f'D{row}', None, qty, compare_formula=False)
+                check(f'F{row}', None, price, compare_formula=False)
+                line = qty * price if qty is not None and price is not None else None
+                check(f'G{row}', f'D{row}*F{row}', line)
+                total = total + line if total is not None and line is not None else None
+
+            disc_pct = order_data['header_info'].get('discount_pct', 10)
+            discount = total * Decimal(f'{disc_pct / 100}') if total is not None else None
+            grand_total = total - discount if total is not None else None
+            total_row, disc_row = rows['total_row'], rows['disc_row']
+            check(f'G{total_row}', f'SUM(G{first_row}:G{first_row + item_count - 1})', total)
+            check(f'G{disc_row}', f'G{total_row}*{disc_pct / 100}', discount)
+            check(f"G{rows['gtotal_row']}", f'G{total_row}-G{disc_row}', grand_total)
+
+            if expected_sums is not None and total is not None:
+                expected_sums = [a + b for a, b in zip(expected_sums, (total, discount, grand_total))]
+            else:
+                expected_sums = None
+            results.append({'file_name': rows['file_name'], 'ok': not problems, 'total': total,
+                            'discount': discount, 'grand_total': grand_total, 'problems': problems})
+
+        if stats['summary_rows']:
+            problems = []
+            check = self._make_cell_check(window(max(stats['summary_rows'])), problems)
+            for idx, row in enumerate(stats['summary_rows']):
+                key = ('total_row', 'disc_row', 'gtotal_row')[idx]
+                refs = '+'.join(f'G{rows[key]}' for rows in stats['order_rows'])
+                check(f'G{row}', refs, expected_sums[idx] if expected_sums else None)
+            results.append({'file_name': 'GRAND SUMMARY', 'ok': not problems,
+                            'total': expected_sums[0] if expected_sums else None,
+                            'discount': expected_sums[1] if expected_sums else None,
+                            'grand_total': expected_sums[2] if expected_sums else None,
+                            'problems': problems})
+        return results
+
+    def _make_cell_check(self, cells, problems):
+        """Tek hücrenin formülünü ve değerini beklenenle karşılaştıran fonksiyon"""
+        def check(coord, formula, expected, compare_formula=True):
+            found_formula, found_value = cells.get(coord, (None, None))
+            if compare_formula and found_formula != formula:
+                problems.append(f'{coord}: formül ={formula} bekleniyordu, dosyada ={found_formula}')
+            if compare_formula and expected is None:
+                # Excel'de hata verecek formül: kayıtlı değer olmamalı
+                if found_value is not None:
+                    problems.append(f'{coord}: değer hesaplanamaz, dosyada {found_value}')
+            elif compare_formula and found_value is None:
+                problems.append(f'{coord}: {expected} bekleniyordu, kayıtlı değer yok')
+            elif self._to_decimal(found_value) != expected:
+                problems.append(f'{coord}: {expected} bekleniyordu, dosyada {found_value}')
+        return check
+
+    @staticmethod
+    def _iter_output_rows(output_path, columns):
+        """Çıktının ilk sayfasını akış halinde okuyup (satır no, {'G15': (formül, değer)}) ver.
+
+        Sadece istenen sütunlar tutulur; değer sayı ise metin, satır içi metinse
+        metnin kendisidir. openpyxl'in okuyucusundan ~4 kat hızlıdır ve formülle
+        kayıtlı değeri tek geçişte verir. Okunan satırlar ağaçtan atılır; bellek
+        kullanımı sayfanın boyutuna bağlı değildir.
+        """
+        import xml.etree.ElementTree as ET
+
+        cell_tag, row_tag = f'{{{_SHEET_NS}}}c', f'{{{_SHEET_NS}}}row'
+        data_tag = f'{{{_SHEET_NS}}}sheetData'
+        formula_tag, value_tag = f'{{{_SHEET_NS}}}f', f'{{{_SHEET_NS}}}v'
+        text_tag = f'{{{_SHEET_NS}}}is/{{{_SHEET_NS}}}t'
+        sheet_data = None
+        with zipfile.ZipFile(output_path) as archive:
+            with archive.open(_first_sheet_path(archive)) as sheet:
+                for event, element in ET.iterparse(sheet, events=('start', 'end')):
+                    if event == 'start':
+                        if element.tag == data_tag:
+                            sheet_data = element
+                        continue
+                    if element.tag != row_tag:
+                        continue
+                    cells = {}
+                    for cell in element.iter(cell_tag):
+                        coord = cell.get('r')
+                        if coord.rstrip('0123456789') in columns:
+                            formula = cell.findtext(formula_tag)
+                            if cell.get('t') == 'inlineStr':
+                                value = cell.findtext(text_tag)
+                            else:
+                                value = cell.findtext(value_tag) or None
+                            cells[coord] = (formula, value)
+                    if sheet_data is not None:
+                        sheet_data.clear()
+                    yield int(element.get('r')), cells
+
+    # ── Ayrıştırma ───────────────────────────────────────────
+
+    def extract_order_data(self, file_path):
+        """Sipariş verisini önbellekten ya da dosyayı ayrıştırarak getir"""
+        reader, variant = self.cache_variant(file_path)
+        return self.parse_cache.get_or_parse(
+            file_path, lambda p: self.parse_order_file(p, reader, self.read_budget), variant=variant
+        )
+
+    def cache_variant(self, file_path):
+        """(okuyucu, önbellek varyantı): farklı okuyucu ya da okuma bütçesiyle okunan sonuçlar ayrı tutulur"""
+        reader = resolve_reader(self.reader, file_path)
+        budget = self.read_budget
+        return reader, (reader if budget is None else f'{reader}@{budget[0]}/{budget[1]}')
+
+    def order_block_height(self, order_data):
+        """Siparişin çıktıda kaplayacağı satır sayısı (bkz. _order_rows)"""
+        header_cells = order_data.get('header_cells', [])
+        has_cells = self.show_header_info and any(l or v for l, v in header_cells)
+        # bilgi satırları + NO başlığı + item'lar + boş satır + TOTAL/DISC/G. TOTAL + 3 boş satır
+        return (len(header_cells) if has_cells else 1) + 1 + len(order_data['data_rows']) + 1 + 3 + 3
+
+    @staticmethod
+    def parse_order_file(file_path, reader='pandas', budget=None):
+        """Dosyayı önbelleğe bakmadan ayrıştır (süreç havuzunda da çağrılır).
+
+        reader bir arka uç adıdır (bkz. resolve_reader); budget (satır, bayt)
+        okuma bütçesidir. Şişkin sayfalarda sonuçta 'bloated_dimension' de bulunur;
+        bütçe item alanını kestiyse 'truncated' okunan satır sayısıdır.
+        """
+        if reader == 'streaming':
+            return MergeEngine._parse_order_file_streaming(file_path, budget)
+        if reader == 'calamine':
+            return MergeEngine._parse_order_file_pandas(file_path, 'calamine', budget)
+        return MergeEngine._parse_order_file_pandas(file_path, budget=budget)
+
+    @staticmethod
+    def _read_limits(file_path, budget=None):
+        """Okunacak en fazla satır (None: sınırsız) ve şişkin sayfanın gerçek alanı (değilse None).
+
+        Okuma bütçesi sadece şişkin sayfalara uygulanır; diğer sayfalar sonuna
+        kadar okunur. Bütçe item alanını kesiyorsa extent['truncated'] okunan
+        satır sayısıdır (değilse None).
+        """
+        row_budget, memory_budget = budget or (READ_ROW_BUDGET, READ_MEMORY_BUDGET)
+        extent = MergeEngine.sheet_extent(file_path, budget)
+        if extent is None:
+            return None, None
+        cols = max(extent['cols'], 1)
+        rows = max(min(extent['rows'], row_budget, memory_budget // (cols * _CELL_MEMORY_ESTIMATE)), 1)
+        extent['truncated'] = rows if extent['truncated'] or rows < extent['rows'] else None
+        return rows, extent
+
+    @staticmethod
+    def sheet_extent(file_path, budget=None):
+        """Şişkin boyutlu sayfanın gerçek veri alanı: {'dimension', 'rows', 'cols'} ya da None.
+
+        Önce sadece sayfanın başındaki <dimension> okunur; bildirilen boyut
+        DIMENSION_*_LIMIT'i ya da okuma bütçesini aşmıyorsa None döner. Aşıyorsa
+        sayfa, NO'dan sonraki ilk TOTAL satırına kadar (en fazla bütçe kadar satır)
+        taranır: rows son dolu satırın, cols değer içeren en sağdaki sütunun
+        numarasıdır; truncated, bütçe item alanı kapanmadan (TOTAL'den önce)
+        dolduysa True'dur. xlsx olmayan ya da okunamayan dosyalarda None döner.
+        """
+        row_budget, memory_budget = budget or (READ_ROW_BUDGET, READ_MEMORY_BUDGET)
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                with archive.open(_first_sheet_path(archive)) as sheet:
+                    head = sheet.read(4096).decode('utf-8', 'ignore')
+                match = _DIMENSION_RE.search(head)
+                if not match:
+                    return None
+                dimension = match.group(1)
+                last = dimension.split(':')[-1]
+                declared_rows = int(last.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ') or 0)
+                declared_cols = _column_index(last.rstrip('0123456789'))
+                if (declared_rows <= min(DIMENSION_ROW_LIMIT, row_budget)
+                        and declared_cols <= DIMENSION_COL_LIMIT
+                        and declared_rows * declared_cols * _CELL_MEMORY_ESTIMATE <= memory_budget):
+                    return None
+
+                rows = cols = 0
+                start_found = truncated = False
+                for row_number, row in MergeEngine._iter_sheet_rows(archive):
+                    if row_number > row_budget:
+                        truncated = start_found
+                        break
+                    if row:
+                        rows = row_number
+                        cols = max(cols, max(_column_index(col) for col in row))
+                    first_val = row.get('A')
+                    if not start_found:
+                        start_found = first_val == 'NO'
+                    elif MergeEngine._is_total_row(first_val, row.values()):
+                        break
+                return {'dimension': dimension, 'rows': rows, 'cols': cols, 'truncated': truncated}
+        except Exception:
+            return None
+
+    @staticmethod
+    def _parse_header(head_rows):
+        """İlk satırların (A, B) değerlerinden header_info ve header_cells çıkar (boş hücre None)"""
+        header_info = {}
+        for first_val, second_val in head_rows[:15]:
+            first_col = str(first_val).strip() if first_val is not None else ''
+            second_col = second_val if second_val is not None else ''
+
+            if 'RFQ REF' in first_col.upper():
+                header_info['rfq_ref'] = second_col
+            elif 'QTN REF' in first_col.upper():
+                header_info['qtn_ref'] = second_col
+            elif 'CURRENCY' in first_col.upper():
+                header_info['currency'] = str(second_col).strip()
+            elif 'DISC' in first_col.upper() and '%' in first_col.upper():
+                try:
+                    header_info['discount_pct'] = float(second_col)
+                except (ValueError, TypeError):
+                    header_info['discount_pct'] = 10
+
+        if 'discount_pct' not in header_info:
+            header_info['discount_pct'] = 10
+
+        # A3:B5 hücrelerini çıkar (Tarih, RFQ REF, QTN REF)
+        header_cells = []
+        for row_idx in range(2, 5):  # Excel satır 3,4,5 -> 0-indexed 2,3,4
+            if row_idx < len(head_rows):
+                label, value = head_rows[row_idx]
+                label = str(label).strip() if label is not None else ''
+                value = str(value).strip() if value is not None else ''
+                header_cells.append((label, value))
+            else:
+                header_cells.append(('', ''))
+        return header_info, header_cells
+
+    @staticmethod
+    def _parse_order_file_pandas(file_path, engine=None, budget=None):
+        """pandas.read_excel ile oku; engine verilmezse uzantıya göre seçilir (.xls: xlrd, .ods: odf)"""
+        import numpy as np
+        import pandas as pd
+
+        try:
+            max_rows, extent = MergeEngine._read_limits(file_path, budget)
+            df = pd.read_excel(
+                file_path, header=None, engine=engine, nrows=max_rows,
+                usecols=list(range(extent['cols'])) if extent else None,
+            )
+
+            if len(df.columns) < 2:
+                return None
+            head_rows = [
+                tuple(v if pd.notna(v) else None for v in (df.iloc[idx, 0], df.iloc[idx, 1]))
+                for idx in range(min(15, len(df)))
+            ]
+            header_info, header_cells = MergeEngine._parse_header(head_rows)
+
+            # Satırları sütun bazında sınıflandır (satır satır iloc yerine)
+            first_col = df.iloc[:, 0]
+            is_no = first_col.eq('NO').to_numpy(dtype=bool)
+            if not is_no.any():
+                return None
+            start_row = int(is_no.argmax())
+
+            block = df.iloc[start_row + 1:].to_numpy(dtype=object)
+            block_na = pd.isna(block)
+            first_vals = np.char.strip(block[:, 0].astype(str))
+            blank = block_na[:, 0] | (first_vals == '')
+
+            # TOTAL satırı: A sütunu boş/NaN ve satırın herhangi bir hücresinde TOTAL geçiyor
+            blank_idx = np.flatnonzero(blank)
+            cell_text = np.char.upper(np.where(block_na[blank_idx], '', block[blank_idx]).astype(str))
+            total_hits = blank_idx[(np.char.find(cell_text, 'TOTAL') >= 0).any(axis=1)]
+            end = int(total_hits[0]) if len(total_hits) else len(block)
+
+            # Sıra numarası kontrolü: 1, 2, 3 veya 1A, 1B, 2A gibi (ilk karakter rakam)
+            is_item = ~blank[:end] & np.char.isdigit(first_vals[:end].astype('U1'))
+            data_rows = block[:end][is_item].tolist()
+
+            return MergeEngine._order_result(file_path, header_info, header_cells, data_rows, extent)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _order_result(file_path, header_info, header_cells, data_rows, extent):
+        result = {
+            'file_name': Path(file_path).name,
+            'header_info': header_info,
+            'header_cells': header_cells,
+            'data_rows': data_rows,
+        }
+        if extent is not None:
+            result['bloated_dimension'] = extent['dimension']
+            if extent['truncated']:
+                result['truncated'] = extent['truncated']
+        return result
+
+    @staticmethod
+    def count_order_items(file_path, max_rows=READ_ROW_BUDGET):
+        """Item sayısını xlsx XML'inden doğrudan say (liste görünümü için hızlı yol).
+
+        Sadece A sütunu, NO işareti ve TOTAL satırı için gereken hücreler
+        çözülür; ayrıştırıcılarla aynı kuralları uygular. Beklenmeyen bir
+        durumda (hata hücresi, eksik parça, NO/TOTAL bulunamaması, max_rows'u
+        aşan sayfa) None döner ve çağıran tam okuyucuya düşer.
+        """
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                start_found = False
+                wide = False
+                count = 0
+                for row_number, row in MergeEngine._iter_sheet_rows(archive):
+                    if row_number > max_rows or _CELL_ERROR in row.values():
+                        return None
+                    first_val = row.pop('A', None)
+                    wide = wide or bool(row)
+
+                    if not start_found:
+                        start_found = first_val == 'NO'
+                        continue
+                    if MergeEngine._is_total_row(first_val, row.values()):
+                        break
+                    # Sıra numarası kontrolü: 1, 2, 3 veya 1A, 1B, 2A gibi
+                    if first_val is not None and str(first_val).strip()[:1].isdigit():
+                        count += 1
+            if not (start_found and wide):
+                return None
+            return count
+        except Exception:
+            return None
+
+    @staticmethod
+    def _is_total_row(first_val, values):
+        """TOTAL satırı: A sütunu boş ve satırda TOTAL geçiyor"""
+        if first_val is not None and str(first_val).strip() != '':
+            return False
+        return any('TOTAL' in str(v).upper() for v in values)
+
+    @staticmethod
+    def _iter_sheet_rows(archive):
+        """İlk sayfanın satırlarını XML'den sırayla üret: (satır no, {sütun harfi: değer}).
+
+        Sadece değeri olan hücreler yer alır; değerler okuyucuların vereceği
+        gibidir, hata hücreleri _CELL_ERROR'dır.
+        """
+        import xml.etree.ElementTree as ET
+
+        cell_tag, row_tag = f'{{{_SHEET_NS}}}c', f'{{{_SHEET_NS}}}row'
+        value_tag = f'{{{_SHEET_NS}}}v'
+        text_tag = f'{{{_SHEET_NS}}}is/{{{_SHEET_NS}}}t'
+        shared = MergeEngine._read_shared_strings(archive)
+        row_number = 0
+        row = {}
+        with archive.open(_first_sheet_path(archive)) as sheet:
+            for _, element in ET.iterparse(sheet):
+                if element.tag == cell_tag:
+                    cell_type = element.get('t')
+                    if cell_type == 'inlineStr':
+                        raw = element.findtext(text_tag)
+                    else:
+                        raw = element.findtext(value_tag)
+                    if raw:
+                        if cell_type == 'e':
+                            value = _CELL_ERROR
+                        else:
+                            value = MergeEngine._raw_cell(raw, cell_type, shared)
+                        if value is not None:
+                            row[element.get('r').rstrip('0123456789')] = value
+                elif element.tag == row_tag:
+                    number = element.get('r')
+                    row_number = int(number) if number else row_number + 1
+                    element.clear()
+                    yield row_number, row
+                    row = {}
+
+    @staticmethod
+    def _read_shared_strings(archive):
+        """Paylaşılan metin tablosu (yoksa boş liste)"""
+        import xml.etree.ElementTree as ET
+
+        if 'xl/sharedStrings.xml' not in archive.namelist():
+            return []
+        si_tag, t_tag = f'{{{_SHEET_NS}}}si', f'{{{_SHEET_NS}}}t'
+        run_text = f'{{{_SHEET_NS}}}r/{{{_SHEET_NS}}}t'
+        strings = []
+        with archive.open('xl/sharedStrings.xml') as source:
+            for _, element in ET.iterparse(source):
+                if element.tag == si_tag:
+                    text = element.findtext(t_tag)
+                    if text is None:  # zengin metin: parçaları birleştir (fonetik kısım hariç)
+                        text = ''.join(t.text or '' for t in element.iterfind(run_text))
+                    strings.append(text)
+                    element.clear()
+        return strings
+
+    @staticmethod
+    def _raw_cell(raw, cell_type, shared):
+        """XML hücre değerini okuyucuların vereceği değere çevir (boş -> None)"""
+        if cell_type == 's':
+            value = shared[int(raw)]
+        elif cell_type in ('str', 'inlineStr', 'd'):
+            value = raw
+        elif cell_type == 'b':
+            return raw == '1'
+        else:
+            return MergeEngine._stream_cell(float(raw))
+        return MergeEngine._stream_cell(value)
+
+    @staticmethod
+    def _stream_cell(value):
+        """openpyxl değerini pandas.read_excel'in vereceği değere çevir (boş -> None)"""
+        if value is None:
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str) and value in PANDAS_NA_STRINGS:
+            return None
+        return value
+
+    @staticmethod
+    def _parse_order_file_streaming(file_path, budget=None):
+        """openpyxl read-only ile satır satır oku; ilk TOTAL satırından sonrasına hiç bakma.
+
+        pandas okuyucusu ile aynı sözlüğü üretir. Tek fark, ham satırların
+        sütun sayısının TOTAL'e kadar görülen en geniş satıra göre belirlenmesidir
+        (pandas tüm sayfaya bakar); fazladan kalan sütunlar zaten boştur.
+        """
+        from openpyxl import load_workbook
+
+        wb = None
+        try:
+            max_rows, extent = MergeEngine._read_limits(file_path, budget)
+            wb = load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+            ws = wb.worksheets[0]
+            # Bildirilen boyuta göre satırları doldurma (XFD'ye kadar biçimli sayfalar)
+            ws.reset_dimensions()
+
+            head_rows = []
+            width = 0
+            start_row = None
+            data_rows = []
+            total_found = False
+            rows = ws.iter_rows(max_row=max_rows, max_col=extent['cols'] if extent else None, values_only=True)
+            for idx, raw in enumerate(rows):
+                row = [MergeEngine._stream_cell(v) for v in raw]
+                while row and row[-1] is None:
+                    row.pop()
+                width = max(width, len(row))
+                first_val = row[0] if row else None
+
+                if idx < 15:
+                    head_rows.append((first_val, row[1] if len(row) > 1 else None))
+                elif total_found:
+                    break
+                if total_found:
+                    continue
+
+                if start_row is None:
+                    if first_val == 'NO':
+                        start_row = idx
+                    continue
+
+                # TOTAL satırı: A sütunu boş ve satırda TOTAL geçiyor
+                if first_val is None or str(first_val).strip() == '':
+                    row_str = ' '.join(str(x).upper() for x in row if x is not None)
+                    if 'TOTAL' in row_str:
+                        total_found = True
+                    continue
+
+                # Sıra numarası kontrolü: 1, 2, 3 veya 1A, 1B, 2A gibi
+                val_str = str(first_val).strip()
+                if val_str and val_str[0].isdigit():
+                    data_rows.append(row)
+
+            if width < 2 or start_row is None:
+                return None
+            # pandas çıktısıyla aynı şekil: boş hücreler NaN, satırlar eşit uzunlukta
+            nan = float('nan')
+            data_rows = [
+                [nan if v is None else v for v in row] + [nan] * (width - len(row))
+                for row in data_rows
+            ]
+            header_info, header_cells = MergeEngine._parse_header(head_rows)
+            return MergeEngine._order_result(file_path, header_info, header_cells, data_rows, extent)
+        except Exception:
+            return None
+        finally:
+            if wb is not None:
+                wb.close()
+
+    # ── Stiller ──────────────────────────────────────────────
+
+    def _build_cell_styles(self):
+        """Satır düzenindeki stil anahtarlarının öznitelikleri (adlandırılmış stillere dönüşür)"""
+        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+
+        # Openpyxl stil objeleri (her satırda yeniden oluşturmamak için)
+        thin_border = Border(
+            left=Side(style='thin'), right=Side(style='thin'),
+            top=Side(style='thin'), bottom=Side(style='thin')
+        )
+        no_border = Border()
+        header_fill = PatternFill(start_color='3498DB', end_color='3498DB', fill_type='solid')
+        header_font = Font(bold=True, size=11, color='FFFFFF')
+        center_align = Alignment(horizontal='center', vertical='center')
+        data_align = Alignment(vertical='center', wrap_text=True)
+        bold_font = Font(bold=True, size=11)
+        right_align = Alignment(horizontal='right', vertical='center')
+
+        info_label_font = Font(bold=True, size=9)
+        info_value_font = Font(size=9)
+        info_text_font = Font(italic=True, size=9, color='808080')
+
+        separator_fill = PatternFill(start_color='2C3E50', end_color='2C3E50', fill_type='solid')
+        banner_fill = PatternFill(start_color='1A5276', end_color='1A5276', fill_type='solid')
+        banner_font = Font(bold=True, size=13, color='FFFFFF')
+
+        summary_label_font = Font(bold=True, size=12, color='2C3E50')
+        summary_value_font = Font(bold=True, size=12, color='1A5276')
+        summary_border = Border(
+            left=Side(style='medium'), right=Side(style='medium'),
+            top=Side(style='medium'), bottom=Side(style='medium')
+        )
+        label_fill = PatternFill(start_color='EBF5FB', end_color='EBF5FB', fill_type='solid')
+        value_fill = PatternFill(start_color='D4E6F1', end_color='D4E6F1', fill_type='solid')
+        grand_fill = PatternFill(start_color='1A5276', end_color='1A5276', fill_type='solid')
+        grand_font = Font(bold=True, size=14, color='FFFFFF')
+
+        return {
+            'info_text': {'font': info_text_font},
+            'info_label': {'font': info_label_font, 'alignment': right_align, 'border': thin_border},
+            'info_value': {'font': info_value_font, 'border': thin_border},
+            'header': {
+                'fill': header_fill, 'font': header_font,
+                'alignment': center_align, 'border': thin_border,
+            },
+            'data': {'border': thin_border, 'alignment': data_align},
+            'total_blank': {'border': no_border},
+            'total_label': {'border': no_border, 'font': bold_font, 'alignment': right_align},
+            'total_value': {'border': no_border, 'font': bold_font},
+            'separator': {'fill': separator_fill, 'border': thin_border},
+            'banner': {
+                'font': banner_font, 'fill': banner_fill,
+                'alignment': center_align, 'border': thin_border,
+            },
+            'banner_fill': {'fill': banner_fill, 'border': thin_border},
+            'summary_label': {
+                'font': summary_label_font, 'alignment': right_align,
+                'fill': label_fill, 'border': summary_border,
+            },
+            'summary_label_fill': {'fill': label_fill, 'border': summary_border},
+            'summary_value': {
+                'font': summary_value_font, 'alignment': center_align,
+                'fill': value_fill, 'border': summary_border,
+            },
+            'summary_value_fill': {'fill': value_fill, 'border': summary_border},
+            'grand_label': {
+                'font': grand_font, 'alignment': right_align,
+                'fill': grand_fill, 'border': summary_border,
+            },
+            'grand_label_fill': {'fill': grand_fill, 'border': summary_border},
+            'grand_value': {
+                'font': grand_font, 'alignment': center_align,
+                'fill': grand_fill, 'border': summary_border,
+            },
+            'grand_value_fill': {'fill': grand_fill, 'border': summary_border},
+        }
+
+    def _register_named_styles(self, wb):
+        """Stil tablosunu çalışma kitabına adlandırılmış stil olarak kaydet.
+
+        Belirtilmeyen yazı tipi ve kenarlık çalışma kitabının varsayılanından alınır;
+        böylece hücreler tek tek öznitelik atamasıyla aynı görünür.
+        """
+        from openpyxl.styles import NamedStyle
+
+        if self._cell_styles is None:
+            self._cell_styles = self._build_cell_styles()
+        existing = set(wb.named_styles)
+        for key, attrs in self._cell_styles.items():
+            name = NAMED_STYLE_PREFIX + key
+            if name in existing:
+                continue
+            named_style = NamedStyle(name=name, font=copy(wb._fonts[0]), border=copy(wb._borders[0]))
+            for attr, style_obj in attrs.items():
+                setattr(named_style, attr, copy(style_obj))
+            wb.add_named_style(named_style)
+
+    def _write_cell(self, cell, spec):
+        """Değeri, adlandırılmış stili ve (varsa) sayı formatını yaz"""
+        value, style, number_format = spec
+        if value is not None:
+            cell.value = value
+        if style:
+            cell.style = NAMED_STYLE_PREFIX + style
+        if number_format:
+            cell.number_format = number_format
+
+
+# ── Okuyucu Karşılaştırması ──────────────────────────────────
+
+def benchmark_readers(files, repeat=3):
+    """Her dosyayı onu açabilen tüm okuyucularla (önbelleksiz) ayrıştırıp süre ölç.
+
+    {uzantı: {'files': n, 'times': {okuyucu: en iyi toplam süre},
+    'differs': {okuyucu: ilk okuyucudan farklı sonuç veren dosya sayısı}}} döndürür.
+    Süre, her dosyanın repeat denemesinden en kısasının toplamıdır.
+    """
+    results = {}
+    for file_path in files:
+        suffix = Path(file_path).suffix.lower()
+        backends = [b for b in READER_BACKENDS if _backend_supports(b, suffix)]
+        if not backends:
+            continue
+        entry = results.setdefault(suffix, {'files': 0, 'times': {}, 'differs': {}})
+        entry['files'] += 1
+        reference = None
+        for backend in backends:
+            best = None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                data = MergeEngine.parse_order_file(file_path, backend)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            entry['times'][backend] = entry['times'].get(backend, 0.0) + best
+            summary = None if not data else (len(data['data_rows']), data['header_info'])
+            if reference is None:
+                reference = (backend, summary)
+            elif summary != reference[1]:
+                entry['differs'][backend] = entry['differs'].get(backend, 0) + 1
+    return results
+
+
+def format_benchmark(results):
+    lines = []
+    for suffix, entry in sorted(results.items()):
+        lines.append(f"{suffix} ({entry['files']} dosya)")
+        ranked = sorted(entry['times'].items(), key=lambda kv: kv[1])
+        for rank, (backend, seconds) in enumerate(ranked):
+            note = '  en hızlı' if rank == 0 and len(ranked) > 1 else ''
+            differs = entry['differs'].get(backend)
+            if differs:
+                note += f'  ({differs} dosyada farklı sonuç)'
+            lines.append(f'  {backend:<10}{seconds:8.3f} s{note}')
+    if not lines:
+        lines.append('Kurulu okuyucuların açabildiği dosya bulunamadı')
+    return '\n'.join(lines)
+
+
+# ── Komut Satırı ─────────────────────────────────────────────
+
+def is_quote_file(name, extensions=None):
+    """Klasör taramasında birleştirilecek dosya mı: okunabilir uzantı; Excel'in
+    geçici dosyası (~$) ya da önceki birleştirme çıktısı (MERGED_FINAL_LIST_*) değil"""
+    if extensions is None:
+        extensions = supported_extensions()
+    return (os.path.splitext(name)[1].lower() in extensions and not name.startswith('~$')
+            and not name.startswith('MERGED_FINAL_LIST_'))
+
+
+def collect_input_files(patterns):
+    """Dosya, klasör ve glob desenlerini sıralı, tekrarsız Excel dosyası listesine çevir.
+
+    Klasör ve glob taramasında Excel'in geçici dosyaları (~$) ve önceki
+    birleştirme çıktıları (MERGED_FINAL_LIST_*) atlanır.
+    """
+    extensions = supported_extensions()
+
+    def wanted(path):
+        return is_quote_file(path.name, extensions)
+
+    files = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            found = sorted(p for p in path.iterdir() if p.is_file() and wanted(p))
+        elif path.is_file():
+            found = [path]
+        else:
+            found = sorted(Path(p) for p in glob.glob(pattern, recursive=True) if wanted(Path(p)))
+        for f in found:
+            if f not in files:
+                files.append(f)
+    return files
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='merger_engine',
+        description='Teklif dosyalarını Final List şablonunda birleştirir (arayüzsüz).'
+    )
+    parser.add_argument('inputs', nargs='*',
+                        help='Excel dosyaları (.xlsx, .xlsm, .xls, .ods), klasörler veya glob desenleri (sıra korunur)')
+    parser.add_argument('-t', '--template', help=f'şablon dosyası (varsayılan: program klasöründeki {TEMPLATE_NAME})')
+    parser.add_argument('-o', '--output', help='çıktı dosyası (varsayılan: ilk dosyanın klasöründe MERGED_FINAL_LIST_<zaman>.xlsx)')
+    parser.add_argument('--no-header-info', action='store_true', help='sipariş bilgilerini (Tarih, RFQ, QTN) yazma')
+    parser.add_argument('--reader', choices=READERS, default='pandas',
+                        help='okuyucu (varsayılan: pandas); desteklemediği uzantılarda kurulu başka okuyucu seçilir')
+    parser.add_argument('--writer', choices=WRITERS, default='template', help='çıktı motoru (varsayılan: template)')
+    parser.add_argument('--no-cache', action='store_true', help='ayrıştırma önbelleğini kullanma')
+    parser.add_argument('--max-rows', type=int, default=READ_ROW_BUDGET,
+                        help=f'bir dosyadan okunacak en fazla satır (varsayılan: {READ_ROW_BUDGET})')
+    parser.add_argument('--max-memory', type=int, default=READ_MEMORY_BUDGET // (1024 * 1024), metavar='MB',
+                        help='bir dosyanın okunmasında hedeflenen en fazla bellek, MB '
+                             f'(varsayılan: {READ_MEMORY_BUDGET // (1024 * 1024)})')
+    parser.add_argument('--memory-limit', type=int, metavar='MB',
+                        help='düşük bellek modu: birleştirmede hedeflenen en fazla bellek, MB '
+                             '(çıktı write-only motorla yazılır, kayıtlı değerler gerekirse diske taşar)')
+    parser.add_argument('--export', action='append', choices=EXPORT_FORMATS, default=[], metavar='FORMAT',
+                        help='item verisini çıktının yanına ayrıca yaz: csv, jsonl, parquet (pyarrow gerekir); '
+                             'birden fazla kez verilebilir')
+    parser.add_argument('--append', metavar='MERGED.xlsx',
+                        help='daha önce oluşturulmuş çıktıya yeni dosyaları ekle, değişen siparişleri güncelle; '
+                             'dosya verilmezse sadece değişenler yenilenir')
+    parser.add_argument('--watch', metavar='KLASOR',
+                        help='klasörü izle, dosyalar değiştikçe çıktıyı yenile (Ctrl+C ile durur; '
+                             'çıktı verilmezse klasöre MERGED_FINAL_LIST_LIVE.xlsx yazılır)')
+    parser.add_argument('--shard-by', choices=('rows', 'orders', 'currency', 'rfq'),
+                        help='çıktıyı paralel yazılan parçalara böl: satır ya da sipariş sınırına, '
+                             'para birimine ya da RFQ referansına göre; -o içindekiler kitabı olur')
+    parser.add_argument('--shard-size', type=int, metavar='N',
+                        help='rows/orders bölmesinde parça başına sınır (varsayılan: 50000 satır / 500 sipariş)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='parçalı çıktıda süreç sayısı (varsayılan: işlemci sayısı)')
+    parser.add_argument('--benchmark-readers', action='store_true',
+                        help='birleştirme yapmadan dosyaları kurulu tüm okuyucularla okuyup hızlarını karşılaştır')
+    parser.add_argument('--trace', action='store_true',
+                        help=f'aşama sürelerini ve en yavaş dosyaları yazdır (her birleştirme {TRACE_LOG_FILE.name} dosyasına kaydedilir)')
+    args = parser.parse_args(argv)
+    if args.shard_by and (args.append or args.watch):
+        parser.error('--shard-by, --append ve --watch ile birlikte kullanılamaz')
+
+    files = collect_input_files(args.inputs)
+    if not files and not (args.append or args.watch):
+        print('Hata: birleştirilecek Excel dosyası bulunamadı', file=sys.stderr)
+        return 1
+    if args.benchmark_readers:
+        print(format_benchmark(benchmark_readers(files)))
+        return 0
+
+    engine = MergeEngine(
+        template_path=args.template,
+        show_header_info=not args.no_header_info,
+        reader=args.reader,
+        writer=args.writer,
+        parse_cache=ParseCache(path=None) if args.no_cache else None,
+        export_formats=args.export,
+        memory_limit=args.memory_limit * 1024 * 1024 if args.memory_limit else None,
+    )
+    budget = (args.max_rows, args.max_memory * 1024 * 1024)
+    if budget != (READ_ROW_BUDGET, READ_MEMORY_BUDGET):
+        engine.read_budget = budget
+    if args.watch:
+        return watch_folder(engine, args.watch, args.output, args.trace)
+    if args.append:
+        output_path = Path(args.append)
+    else:
+        output_path = Path(args.output) if args.output else engine.default_output_path(files[0].parent)
+    trace = engine.new_trace(files)
+    try:
+        with trace.phase('template'):
+            engine.compiled_template()
+        engine.check_output_dir(output_path.parent)
+        if args.shard_by:
+            from output_shards import create_sharded_output
+
+            stats = create_sharded_output(engine, files, output_path, args.shard_by, args.shard_size,
+                                          args.workers, trace)
+        elif args.append:
+            stats = engine.append_merged_file(files, output_path, trace)
+        else:
+            stats = engine.create_merged_file(files, output_path, trace)
+        engine.parse_cache.flush()
+        # Parçalar kendi süreçlerinde doğrulanmıştır
+        results = stats['results'] if args.shard_by else engine.verify_merged_file(output_path, stats)
+        trace.finish(
+            output=str(output_path), orders=stats['orders'], items=stats['total_items'],
+            output_bytes=output_path.stat().st_size, verified=all(r['ok'] for r in results),
+        )
+        trace.save()
+    except MergeError as e:
+        print(f'Hata: {e}', file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f'Birleştirme hatası: {e}', file=sys.stderr)
+        return 1
+
+    for name in stats['skipped']:
+        print(f'Uyarı: okunamadı, atlandı: {name}', file=sys.stderr)
+    for name, dimension in stats['bloated']:
+        print(f'Uyarı: {name} sayfası şişkin ({dimension}), sadece veri alanı okundu', file=sys.stderr)
+    if args.trace:
+        print(trace.format(), file=sys.stderr)
+    for path in stats['exports']:
+        print(f'Dışa aktarıldı: {path}')
+    for shard in stats.get('shards', ()):
+        print(f"Parça: {shard['path'].name} ({shard['orders']} sipariş, {shard['total_items']} item)")
+    if 'append' in stats:
+        append = stats['append']
+        if append['rebuild_reason']:
+            print(f"Liste baştan birleştirildi: {append['rebuild_reason']}")
+        else:
+            print(f"Eklendi: {append['reused']} sipariş korundu, {append['rewritten']} sipariş yazıldı")
+    failed = [r for r in results if not r['ok']]
+    for r in failed:
+        print(f"Doğrulama başarısız: {r['file_name']}", file=sys.stderr)
+        for problem in r['problems']:
+            print(f'  {problem}', file=sys.stderr)
+    print(f"Tamamlandı: {output_path} ({stats['orders']} sipariş, {stats['total_items']} item, "
+          f"{len(results) - len(failed)}/{len(results)} toplam kontrolü geçti)")
+    if failed:
+        return 4
+    return 3 if stats['skipped'] else 0
+
+
+def watch_folder(engine, folder, output=None, show_trace=False):
+    """--watch: klasörü Ctrl+C'ye kadar izle, her olayı bir satır olarak yazdır"""
+    from folder_watcher import FolderWatcher, describe_event
+
+    if not Path(folder).is_dir():
+        print(f'Hata: klasör bulunamadı: {folder}', file=sys.stderr)
+        return 1
+
+    def report(event):
+        stream = sys.stderr if event['phase'] in ('waiting', 'error') else sys.stdout
+        print(describe_event(event), file=stream, flush=True)
+        if show_trace and event['phase'] == 'merged':
+            print(event['stats']['trace'].format(), file=sys.stderr, flush=True)
+
+    watcher = FolderWatcher(engine, folder, output, on_event=report)
+    print(f'İzleniyor: {watcher.folder} -> {watcher.output_path} (durdurmak için Ctrl+C)', flush=True)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    # python -m merger_engine ile bu dosya __main__ olarak yüklenir; output_shards ve
+    # folder_watcher ise merger_engine'i ayrıca import eder. CLI'yi o modülden
+    # çalıştırmak, except MergeError'ın onların fırlattığı hataları da yakalamasını sağlar.
+    from merger_engine import main as _main
+    sys.exit(_main())
@@ -0,0 +1,327 @@
+"""
+Parçalı çıktı: çok büyük birleştirmeleri paralel yazılan birden fazla çalışma kitabına böler
+
+Dosyalar önce süreç havuzunda bir kez ayrıştırılır (önbellekte olanlar
+okunmaz) ve siparişler parçalara ayrılır:
+
+- rows: parça başına en fazla satır (sipariş blokları bölünmez)
+- orders: parça başına en fazla sipariş
+- currency / rfq: header'daki para birimi ya da RFQ referansı aynı olan siparişler
+
+Her parça ayrı bir süreçte MergeEngine.create_merged_file ile kendi GRAND
+SUMMARY'si ve manifest'iyle yazılır ve doğrulanır; ayrıştırılmış veri o
+sürece önbellek kaydı olarak (ParseCache.snapshot) aktarılır, dosyalar tekrar
+okunmaz. Çıktı yolunda küçük bir içindekiler çalışma kitabı oluşturulur:
+parçalara bağlantılar, parça toplamları ve tüm parçaların genel toplamı.
+Parçalar <çıktı adı>_001.xlsx (alana göre bölmede <çıktı adı>_001_EUR.xlsx)
+adıyla çıktının yanına yazılır.
+"""
+
+import multiprocessing
+import os
+import re
+from decimal import Decimal
+from pathlib import Path
+
+from merger_engine import MergeCancelled, MergeEngine, MergeError, ParseCache, manifest_path
+
+SHARD_MODES = ('rows', 'orders', 'currency', 'rfq')
+SHARD_SIZE_DEFAULTS = {'rows': 50000, 'orders': 500}  # rows/orders bölmesinde varsayılan sınır
+SHARD_FIELDS = {'currency': 'currency', 'rfq': 'rfq_ref'}  # alana göre bölmede header_info anahtarı
+PARSE_BATCH = 16          # bir süreç işinde ayrıştırılan dosya sayısı
+CANCEL_POLL_SECONDS = 0.2
+
+
+def describe_shard_mode(mode, size=None):
+    """Bölme ölçütünün okunabilir adı (içindekiler sayfası ve arayüz için)"""
+    if mode == 'rows':
+        return f'parça başına en fazla {size or SHARD_SIZE_DEFAULTS["rows"]} satır'
+    if mode == 'orders':
+        return f'parça başına en fazla {size or SHARD_SIZE_DEFAULTS["orders"]} sipariş'
+    return {'currency': 'para birimine göre', 'rfq': 'RFQ referansına göre'}[mode]
+
+
+# ── Süreç İşleri ─────────────────────────────────────────────
+
+def _parse_files(jobs, budget):
+    """[(dosya, okuyucu)] dosyalarını ayrıştır (süreç havuzunda çalışır)"""
+    return [MergeEngine.parse_order_file(path, reader, budget) for path, reader in jobs]
+
+
+def _merge_shard(options, files, output_path, snapshot):
+    """Tek parçayı yazıp doğrula (süreç havuzunda çalışır); özetini döndür"""
+    engine = MergeEngine(parse_cache=ParseCache(path=None), **options)
+    engine.parse_cache.load_snapshot(snapshot)
+    trace = engine.new_trace(files)
+    stats = engine.create_merged_file(files, output_path, trace)
+    results = engine.verify_merged_file(output_path, stats)
+    totals = [order['totals'] for order in stats['order_rows']]
+    symbols = {order['currency_symbol'] for order in stats['order_rows']}
+    return {
+        'path': Path(output_path), 'orders': stats['orders'], 'total_items': stats['total_items'],
+        'skipped': stats['skipped'], 'bloated': stats['bloated'], 'exports': stats['exports'],
+        'results': results, 'files': trace.files, 'phases': trace.phases,
+        'totals': [None if any(t[i] is None for t in totals) else sum((t[i] for t in totals), Decimal(0))
+                   for i in range(3)],
+        'currency_symbol': symbols.pop() if len(symbols) == 1 else '',
+    }
+
+
+# ── Parçalara Ayırma ─────────────────────────────────────────
+
+def _engine_options(engine):
+    """Parça süreçlerinde aynı çıktıyı üretecek MergeEngine seçenekleri"""
+    return {
+        'template_path': str(engine.template_path), 'show_header_info': engine.show_header_info,
+        'reader': engine.reader, 'writer': engine.writer, 'export_formats': engine.export_formats,
+        'read_budget': engine.read_budget, 'memory_limit': engine.memory_limit,
+    }
+
+
+def _shard_key(order_data, mode):
+    value = order_data['header_info'].get(SHARD_FIELDS[mode])
+    value = str(value).strip() if value is not None else ''
+    return value.upper() if mode == 'currency' else value
+
+
+def _split(orders, mode, size):
+    """[(dosya, anahtar, satır sayısı)] listesini parçalara ayır: [{'key', 'files'}]"""
+    shards = []
+    if mode in SHARD_FIELDS:
+        groups = {}
+        for path, key, _ in orders:
+            groups.setdefault(key, []).append(path)
+        return [{'key': key, 'files': paths} for key, paths in groups.items()]
+    limit = size or SHARD_SIZE_DEFAULTS[mode]
+    used = 0
+    for path, _, height in orders:
+        cost = height if mode == 'rows' else 1
+        if not shards or used + cost > limit:
+            shards.append({'key': None, 'files': []})
+            used = 0
+        shards[-1]['files'].append(path)
+        used += cost
+    return shards
+
+
+def _shard_path(output_path, index, key):
+    """Parçanın dosya yolu: <çıktı adı>_001.xlsx ya da <çıktı adı>_001_EUR.xlsx"""
+    output_path = Path(output_path)
+    name = f'{output_path.stem}_{index:03d}'
+    if key is not None:
+        name += '_' + (re.sub(r'[^0-9A-Za-z_-]+', '-', key).strip('-')[:40] or 'YOK')
+    return output_path.with_name(name + output_path.suffix)
+
+
+# ── Birleştirme ──────────────────────────────────────────────
+
+def create_sharded_output(engine, files, output_path, mode, size=None, workers=None, trace=None,
+                          progress=None, cancel=None):
+    """Dosyaları mode'a göre parçalara bölüp paralel yaz; output_path'e içindekiler yaz.
+
+    create_merged_file'a benzer bir sözlük döndürür; ayrıca 'shards' (parça
+    özetleri: path, key, orders, total_items, totals, results) ve 'results'
+    (tüm parçaların doğrulama sonuçları) vardır, doğrulama parça süreçlerinde
+    yapılmıştır. progress 'plan' (dosya ayrıştırıldı), 'shard' (parça yazıldı) ve
+    'index' olaylarıyla çağrılır. cancel işaretlenirse süren parçalar bitince
+    yazılan tüm parçalar silinir ve MergeCancelled fırlatılır.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # arayüzün açılışını yavaşlatmasın (logging yükler)
+
+    if mode not in SHARD_MODES:
+        raise MergeError(f'Bilinmeyen bölme ölçütü: {mode}')
+    if trace is None:
+        trace = engine.new_trace(files)
+    trace.info.update(shard_by=mode, shard_size=size)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    stats = {'orders': 0, 'total_items': 0, 'skipped': [], 'bloated': [], 'exports': [],
+             'shards': [], 'results': [], 'trace': trace}
+    submitted = {}  # parça işi -> parça yolu
+    context = multiprocessing.get_context('spawn')  # Tk/thread'li süreçte fork güvenli değil
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        try:
+            with trace.phase('parse'):
+                orders = _plan_orders(engine, files, mode, pool, stats, progress, cancel)
+            shards = _split(orders, mode, size)
+            with trace.phase('shards'):
+                _write_shards(engine, shards, output_path, pool, stats, submitted, progress, cancel)
+            _emit(progress, 'index', None, len(shards))
+            with trace.phase('index'):
+                write_index(output_path, stats['shards'], describe_shard_mode(mode, size))
+        except BaseException:
+            # Başlamamış parçalar iptal edilir, başlamış olanlar bitince silinir;
+            # hiç yazılmamış parçanın adındaki eski bir dosyaya dokunulmaz
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future, path in submitted.items():
+                if future.cancelled():
+                    continue
+                stale = [path, manifest_path(path)]
+                if future.exception() is None:
+                    stale += future.result()['exports']
+                for stale_path in stale:
+                    try:
+                        Path(stale_path).unlink()
+                    except OSError:
+                        pass
+            raise
+    return stats
+
+
+def _plan_orders(engine, files, mode, pool, stats, progress, cancel):
+    """Dosyaları (önbellekte yoksa) paralel ayrıştır; [(dosya, anahtar, satır sayısı)] döndür.
+
+    Ayrıştırılan veri önbelleğe yazılır; parçalama için sadece anahtar ve blok
+    yüksekliği tutulur. Okunamayan dosyalar stats['skipped']'e eklenir.
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    cache = engine.parse_cache
+    planned = {}  # dosya -> (anahtar, satır sayısı) ya da None (okunamadı)
+
+    def plan(path, order_data):
+        if order_data:
+            key = _shard_key(order_data, mode) if mode in SHARD_FIELDS else None
+            planned[path] = (key, engine.order_block_height(order_data))
+        else:
+            planned[path] = None
+        _emit(progress, 'plan', len(planned) - 1, len(files), Path(path).name)
+
+    keys, jobs = {}, []
+    for path in files:
+        reader, variant = engine.cache_variant(path)
+        result, keys[path] = cache.lookup(path, variant)
+        if result is cache.MISS:
+            jobs.append((path, reader))
+        else:
+            plan(path, result)
+    pending = {}
+    for start in range(0, len(jobs), PARSE_BATCH):
+        batch = jobs[start:start + PARSE_BATCH]
+        pending[pool.submit(_parse_files, batch, engine.read_budget)] = batch
+    while pending:
+        done, _ = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        _check_cancel(cancel)
+        for future in done:
+            for (path, _), result in zip(pending.pop(future), future.result()):
+                cache.store(keys[path], result)
+                plan(path, result)
+
+    orders = []
+    for path in files:
+        if planned[path] is None:
+            stats['skipped'].append(Path(path).name)
+        else:
+            orders.append((path, *planned[path]))
+    return orders
+
+
+def _write_shards(engine, shards, output_path, pool, stats, submitted, progress, cancel):
+    """Parçaları süreç havuzunda yaz; özetlerini sırayla stats['shards']'a ekle"""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    options = _engine_options(engine)
+    pending = {}
+    for index, shard in enumerate(shards, start=1):
+        path = _shard_path(output_path, index, shard['key'])
+        snapshot = engine.parse_cache.snapshot((f, engine.cache_variant(f)[1]) for f in shard['files'])
+        future = pool.submit(_merge_shard, options, shard['files'], path, snapshot)
+        pending[future] = index - 1
+        submitted[future] = path
+    summaries = [None] * len(shards)
+    while pending:
+        done, _ = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        _check_cancel(cancel)
+        for future in done:
+            index = pending.pop(future)
+            summary = summaries[index] = future.result()
+            summary['key'] = shards[index]['key']
+            _emit(progress, 'shard', len(shards) - len(pending) - 1, len(shards), summary['path'].name)
+
+    trace = stats['trace']
+    for summary in summaries:
+        stats['shards'].append(summary)
+        stats['orders'] += summary['orders']
+        stats['total_items'] += summary['total_items']
+        stats['skipped'].extend(summary['skipped'])
+        stats['bloated'].extend(summary['bloated'])
+        stats['exports'].extend(summary['exports'])
+        trace.files.extend(summary['files'])
+        for result in summary['results']:
+            if result['file_name'] == 'GRAND SUMMARY':
+                result = dict(result, file_name=f"GRAND SUMMARY ({summary['path'].name})")
+            stats['results'].append(result)
+
+
+def _check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise MergeCancelled()
+
+
+def _emit(progress, phase, index, count, name=None):
+    if progress is not None:
+        progress({'phase': phase, 'file_index': index, 'file_count': count, 'file_name': name, 'rows': None})
+
+
+# ── İçindekiler ──────────────────────────────────────────────
+
+def write_index(output_path, shards, description=''):
+    """Parçalara bağlantılar, parça toplamları ve genel toplamla içindekiler kitabını yaz"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Border, Font, PatternFill, Side
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'INDEX'
+    bold = Font(bold=True)
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_fill = PatternFill('solid', fgColor='D9E1F2')
+
+    ws['A1'] = f'FINAL LIST  —  {len(shards)} PARÇA'
+    ws['A1'].font = Font(bold=True, size=14)
+    ws['A2'] = f'Bölme: {description}' if description else None
+    headers = ('PARÇA', 'ANAHTAR', 'SİPARİŞ', 'ITEM', 'TOTAL', 'DISCOUNT', 'GRAND TOTAL')
+    for col, title in enumerate(headers, start=1):
+        cell = ws.cell(4, col, title)
+        cell.font = bold
+        cell.fill = header_fill
+        cell.border = border
+
+    symbols = {shard['currency_symbol'] for shard in shards}
+    first_row = row = 5
+    for shard in shards:
+        price_format = f'"{shard["currency_symbol"]}"#,##0.00' if shard['currency_symbol'] else '#,##0.00'
+        link = ws.cell(row, 1, shard['path'].name)
+        link.hyperlink = shard['path'].name  # içindekilerle aynı klasörde
+        link.style = 'Hyperlink'
+        values = (shard['key'], shard['orders'], shard['total_items'], *shard['totals'])
+        for col, value in enumerate(values, start=2):
+            cell = ws.cell(row, col, float(value) if isinstance(value, Decimal) else value)
+            if col >= 5:
+                cell.number_format = price_format
+        for col in range(1, 8):
+            ws.cell(row, col).border = border
+        row += 1
+
+    # Genel toplam: parça toplamlarının SUM'u; kayıtlı değer birleştirmedeki gibi Decimal ile
+    symbol = symbols.pop() if len(symbols) == 1 else ''
+    total_format = f'"{symbol}"#,##0.00' if symbol else '#,##0.00'
+    cached_values = {}
+    ws.cell(row, 1, 'GENEL TOPLAM').font = bold
+    for col, letter in enumerate('CDEFG', start=3):
+        cell = ws.cell(row, col, f'=SUM({letter}{first_row}:{letter}{row - 1})')
+        cell.font = bold
+        cell.border = border
+        if col >= 5:
+            cell.number_format = total_format
+            parts = [shard['totals'][col - 5] for shard in shards if shard['totals'][col - 5] is not None]
+            cached_values[f'{letter}{row}'] = sum((Decimal(f'{float(v)!r}') for v in parts), Decimal(0))
+        else:
+            key = 'orders' if col == 3 else 'total_items'
+            cached_values[f'{letter}{row}'] = Decimal(sum(shard[key] for shard in shards))
+
+    for letter, width in zip('ABCDEFG', (44, 16, 10, 10, 16, 16, 18)):
+        ws.column_dimensions[letter].width = width
+    ws.freeze_panes = 'A5'
+    wb.save(output_path)
+    MergeEngine._write_cached_values(output_path, ws.path, cached_values)
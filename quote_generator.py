@@ -0,0 +1,160 @@
+"""
+Sentetik teklif dosyası üretici (ölçüm ve deneme için)
+
+Ayrıştırıcının beklediği düzende gerçekçi .xlsx teklifleri yazar: A3:B5 header
+hücreleri (DATE, RFQ REF, QTN REF), CURRENCY ve DISC % etiketleri, NO ile
+başlayan item tablosu (1, 2, 2A, 2B ... sıra numaraları, numarasız açıklama
+satırları), TOTAL / DISC / G.TOTAL satırları ve altta notlar. Tutarlar Excel'in
+kaydettiği dosyalardaki gibi formül yerine değer olarak yazılır.
+
+Aynı seed aynı dosyaları üretir. bloat ile dosyaların bir kısmının kullanılan
+alanı boş biçimli bir hücreyle A1:XFD1048576'ya şişirilir.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+BLOAT_CELL = (1048576, 16384)  # şişkin sayfalarda biçimlenen son hücre (XFD1048576)
+CURRENCIES = ('EUR', 'EUR', 'USD', 'USD', 'GBP', 'TRY')
+DISCOUNTS = (0, 5, 10, 10, 12.5, 15)
+UNITS = ('PCS', 'PCS', 'SET', 'M', 'KG', 'LT')
+PRODUCTS = (
+    'Ball valve', 'Gate valve', 'Check valve', 'Flange', 'Gasket', 'Pressure gauge',
+    'Hydraulic hose', 'Pump impeller', 'Mechanical seal', 'Bearing', 'V-belt', 'Filter element',
+    'Solenoid valve', 'Thermostat', 'Coupling', 'Shaft sleeve', 'O-ring kit', 'Nozzle',
+)
+MATERIALS = ('SS316', 'SS304', 'Brass', 'Bronze', 'Carbon steel', 'PTFE', 'EPDM', 'Cast iron')
+NOTES = ('Delivery: 4-6 weeks after order', 'Validity: 30 days', 'Payment: 30 days net',
+         'Prices are ex-works', 'Packing included')
+
+
+def write_quote(path, items=25, seed=0, bloat=False):
+    """Tek teklif dosyası yaz; item (sıra numaralı satır) sayısını döndür"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+    rng = random.Random(seed)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'QUOTATION'
+    bold = Font(bold=True)
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_fill = PatternFill('solid', fgColor='D9E1F2')
+    price_format = '#,##0.00'
+
+    ws['A1'] = 'QUOTATION'
+    ws['A1'].font = Font(bold=True, size=14)
+    currency = rng.choice(CURRENCIES)
+    discount = rng.choice(DISCOUNTS)
+    for row, (label, value) in enumerate((
+        ('DATE :', f'{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2026'),
+        ('RFQ REF :', f'RFQ-2026-{seed:05d}'),
+        ('QTN REF :', f'QTN-{rng.randint(1000, 9999)}-{seed % 100:02d}'),
+        ('CURRENCY :', currency),
+        ('DISC % :', discount),
+    ), start=3):
+        ws.cell(row, 1, label).font = bold
+        ws.cell(row, 2, value)
+
+    header = ('NO', 'DESCRIPTION', 'CODE', 'QTTY', 'UNIT', 'U.PRICE', 'T.PRICE', 'REMARKS')
+    row = 9
+    for col, title in enumerate(header, start=1):
+        cell = ws.cell(row, col, title)
+        cell.font = bold
+        cell.fill = header_fill
+        cell.border = border
+        cell.alignment = Alignment(horizontal='center')
+
+    count = 0
+    number = 0
+    total = 0.0
+    while count < items:
+        number += 1
+        # Bazı kalemler varyantlara ayrılır: 2A, 2B ...
+        variants = [''] if rng.random() > 0.15 else ['A', 'B', 'C'][:rng.randint(2, 3)]
+        for suffix in variants:
+            if count >= items:
+                break
+            qty = rng.randint(1, 50) if rng.random() > 0.1 else rng.randint(1, 40) / 2
+            price = round(rng.uniform(1, 2500), 2)
+            line_total = round(qty * price, 2)
+            total += line_total
+            row += 1
+            values = (
+                f'{number}{suffix}' if suffix else number,
+                f'{rng.choice(PRODUCTS)} {rng.choice(MATERIALS)} DN{rng.choice((15, 25, 40, 50, 80))}',
+                f'{rng.choice("ABCDEFGH")}{rng.randint(10000, 99999)}',
+                qty, rng.choice(UNITS), price, line_total,
+                rng.choice(('Stock', 'Ex-stock', None, None)),
+            )
+            for col, value in enumerate(values, start=1):
+                cell = ws.cell(row, col, value)
+                cell.border = border
+                if col in (6, 7):
+                    cell.number_format = price_format
+            count += 1
+            if rng.random() < 0.08:
+                # Numarasız açıklama satırı (item sayılmaz)
+                row += 1
+                ws.cell(row, 2, f'Note: {rng.choice(NOTES).lower()}').border = border
+
+    disc_amount = round(total * discount / 100, 2)
+    row += 1
+    for label, value in (('TOTAL', total), (f'DISC {discount}%', disc_amount),
+                         ('G.TOTAL', total - disc_amount)):
+        row += 1
+        ws.cell(row, 6, label).font = bold
+        cell = ws.cell(row, 7, round(value, 2))
+        cell.font = bold
+        cell.number_format = price_format
+    row += 1
+    for note in rng.sample(NOTES, 3):
+        row += 1
+        ws.cell(row, 1, note)
+
+    for col, width in zip('ABCDEFGH', (8, 42, 12, 8, 8, 12, 14, 12)):
+        ws.column_dimensions[col].width = width
+    if bloat:
+        ws.cell(*BLOAT_CELL).number_format = price_format
+    wb.save(path)
+    return count
+
+
+def generate_quotes(folder, files=10, items=25, seed=0, bloat=0.0):
+    """folder'a files adet teklif yaz; [(yol, item sayısı)] döndür.
+
+    Her dosyanın item sayısı items'ın yarısı ile 1,5 katı arasındadır; bloat
+    şişkin sayfalı dosyaların oranıdır (0-1).
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    written = []
+    for index in range(files):
+        path = folder / f'QUOTE_{index + 1:05d}.xlsx'
+        count = rng.randint(max(1, items // 2), max(1, items * 3 // 2))
+        written.append((path, write_quote(path, count, seed * 100003 + index, rng.random() < bloat)))
+    return written
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='quote_generator', description='Sentetik teklif dosyaları üretir.')
+    parser.add_argument('folder', help='dosyaların yazılacağı klasör')
+    parser.add_argument('-n', '--files', type=int, default=10, help='dosya sayısı (varsayılan: 10)')
+    parser.add_argument('--items', type=int, default=25, help='dosya başına ortalama item (varsayılan: 25)')
+    parser.add_argument('--bloat', type=float, default=0.0, metavar='ORAN',
+                        help='kullanılan alanı A1:XFD1048576\'ya şişirilmiş dosya oranı, 0-1 (varsayılan: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='rastgelelik tohumu (varsayılan: 0)')
+    args = parser.parse_args(argv)
+
+    written = generate_quotes(args.folder, args.files, args.items, args.seed, args.bloat)
+    print(f'{len(written)} dosya yazıldı ({sum(count for _, count in written)} item): {args.folder}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Arka plan tarama kuyruğu: listeye eklenen dosyaların item sayısını çıkarır
+
+Tek bir uzun ömürlü zamanlayıcı thread'i vardır. Aynı dosya iki kez kuyruğa
+girmez, listeden kaldırılan dosyalar iptal edilir ve ekranda görünen satırlar
+öne alınır. Her dosya iki aşamada işlenir:
+
+1. Sayım: önbellekte yoksa item sayısı xlsx XML'inden hızlıca sayılır
+   (MergeEngine.count_order_items) ve hemen bildirilir.
+2. Ayrıştırma: tüm sayımlar bittikten sonra dosya, birleştirmede önbellekten
+   gelsin diye tam okuyucuyla ayrıştırılır; aynı anda en fazla `workers`
+   dosya. Hızlı sayım yapılamadıysa sayı bu aşamanın sonucundan bildirilir.
+
+Sonuçlar on_count(path, count, bloated) ile tarama thread'lerinden bildirilir
+(okunamayan dosya için count -1; bloated şişkin sayfanın bildirilen boyutu,
+ör. 'A1:XFD1048576', değilse None); arayüz güncellemesini Tk thread'ine
+aktarmak çağıranın işidir.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from merger_engine import MergeEngine, ParseCache, resolve_reader
+
+
+def _item_count(data):
+    return len(data['data_rows']) if data else -1
+
+
+def _bloated(data):
+    return data.get('bloated_dimension') if data else None
+
+
+class ScanScheduler:
+    """Öncelikli, tekrarsız ve iptal edilebilir dosya tarama kuyruğu"""
+
+    def __init__(self, parse_cache, on_count, workers=1):
+        self.parse_cache = parse_cache
+        self.on_count = on_count
+        self.workers = max(1, workers)
+        self._cond = threading.Condition()
+        self._known = {}       # listedeki dosya -> iş kimliği (tekrar kuyruğa almayı önler)
+        self._pending = {}     # sayılacak dosya -> okuyucu (ekleme sırası korunur)
+        self._parse_queue = {}  # ayrıştırılacak dosya -> (okuyucu, önbellek anahtarları, sayı bildirildi mi)
+        self._futures = {}     # süreç havuzunda bekleyen dosya -> Future
+        self._visible = ()
+        self._in_flight = 0
+        self._dirty = False
+        self._pool = None
+        self._pool_failed = False
+        self._thread = None
+
+    def submit(self, paths, reader):
+        """Daha önce kuyruğa alınmamış dosyaları taramaya ekle (reader: motorun okuyucu seçimi)"""
+        with self._cond:
+            for path in paths:
+                if path not in self._known:
+                    self._known[path] = object()
+                    self._pending[path] = resolve_reader(reader, path)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def discard(self, paths):
+        """Listeden kaldırılan dosyaları iptal et; biten işlerin sonucu bildirilmez"""
+        with self._cond:
+            for path in paths:
+                self._known.pop(path, None)
+                self._pending.pop(path, None)
+                self._parse_queue.pop(path, None)
+                future = self._futures.get(path)
+                if future is not None:
+                    future.cancel()
+
+    def set_visible(self, paths):
+        """Ekranda görünen dosyalar sıradaki işlerden önce taranır"""
+        with self._cond:
+            self._visible = tuple(paths)
+
+    # ── Zamanlayıcı ──────────────────────────────────────────
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not (self._pending or (self._parse_queue and self._in_flight < self.workers)):
+                    if self._dirty and not self._in_flight:
+                        break
+                    self._cond.wait()
+                if self._pending:
+                    path, reader = self._next_count()
+                    job = (self._count, path, reader, self._known[path])
+                elif self._parse_queue:
+                    path = next(iter(self._parse_queue))
+                    reader, keys, reported = self._parse_queue.pop(path)
+                    job = (self._parse, path, reader, keys, reported, self._known[path],
+                           bool(self._parse_queue))
+                    self._in_flight += 1
+                else:
+                    # Kuyruk boşaldı: yeni sonuçları diske yaz
+                    self._dirty = False
+                    job = None
+            if job is None:
+                self.parse_cache.flush()
+            else:
+                job[0](*job[1:])
+
+    def _next_count(self):
+        for path in self._visible:
+            if path in self._pending:
+                return path, self._pending.pop(path)
+        path = next(iter(self._pending))
+        return path, self._pending.pop(path)
+
+    def _count(self, path, reader, token):
+        data, keys = self.parse_cache.lookup(path, reader)
+        if data is not ParseCache.MISS:
+            self._report(path, token, _item_count(data), _bloated(data))
+            return
+        count = MergeEngine.count_order_items(path)
+        if count is not None:
+            extent = MergeEngine.sheet_extent(path)
+            self._report(path, token, count, extent and extent['dimension'])
+        with self._cond:
+            if self._known.get(path) is token:
+                job = (reader, keys, count is not None)
+                if count is None:
+                    # Sayısı henüz gösterilemeyen dosyalar ayrıştırmada öne geçer
+                    self._parse_queue = {path: job, **self._parse_queue}
+                else:
+                    self._parse_queue[path] = job
+
+    def _parse(self, path, reader, keys, reported, token, more_waiting):
+        # Ayrıştırma CPU ağırlıklı; GIL'e takılmamak için ayrı süreçlerde yap.
+        # Tek dosya için havuz kurmaya değmez; havuz kurulamazsa (ör. frozen build)
+        # dosyalar bu thread'de okunur.
+        if (more_waiting or self._pool is not None) and not self._pool_failed:
+            try:
+                if self._pool is None:
+                    # Tk/thread'li süreçte fork güvenli değil: çatallanan süreç, başka bir
+                    # thread'in (ör. warm_up_imports) tuttuğu import kilidiyle kalabilir
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+                future = self._pool.submit(MergeEngine.parse_order_file, path, reader)
+            except Exception:
+                self._disable_pool()
+            else:
+                with self._cond:
+                    self._futures[path] = future
+                future.add_done_callback(
+                    lambda f: self._on_future_done(f, path, reader, keys, reported, token))
+                return
+
+        data = MergeEngine.parse_order_file(path, reader)
+        self._parsed(path, keys, reported, token, data)
+
+    def _on_future_done(self, future, path, reader, keys, reported, token):
+        if not future.cancelled():
+            try:
+                data = future.result()
+            except Exception:
+                # parse_order_file hata fırlatmaz; buraya düşmek havuzun bozulduğunu gösterir
+                self._disable_pool()
+            else:
+                self._parsed(path, keys, reported, token, data)
+                return
+        # İptal edildi ya da havuz kapandı: dosya hâlâ listedeyse yeniden sıraya al
+        with self._cond:
+            self._futures.pop(path, None)
+            self._in_flight -= 1
+            if self._known.get(path) is token:
+                self._parse_queue[path] = (reader, keys, reported)
+            self._cond.notify()
+
+    def _parsed(self, path, keys, reported, token, data):
+        self.parse_cache.store(keys, data)
+        with self._cond:
+            self._futures.pop(path, None)
+            self._in_flight -= 1
+            self._dirty = True
+            self._cond.notify()
+        if not reported:
+            self._report(path, token, _item_count(data), _bloated(data))
+
+    def _report(self, path, token, count, bloated):
+        with self._cond:
+            current = self._known.get(path) is token
+        if current:
+            self.on_count(path, count, bloated)
+
+    def _disable_pool(self):
+        with self._cond:
+            self._pool_failed = True
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
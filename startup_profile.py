@@ -0,0 +1,82 @@
+"""
+Açılış profili: modül import sürelerini ölçer
+
+final_list_merger.py --startup-profile ile çalıştırıldığında arayüz kütüphanelerinden
+önce kurulur; pencere açılana kadar yüklenen her modülün süresini kaydeder.
+Yalnızca standart kütüphane kullanır.
+"""
+
+import builtins
+import sys
+import time
+
+
+class ImportProfiler:
+    """builtins.__import__ sarmalayıcısı: ilk kez yüklenen modüllerin süresini tutar"""
+
+    def __init__(self):
+        self.records = {}  # modül adı -> [toplam süre, kendi süresi]
+        self._stack = []
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        full_name = self._resolve(name, globals, level)
+        if not full_name or full_name in sys.modules or full_name in self.records:
+            return original(name, globals, locals, fromlist, level)
+
+        self.records[full_name] = [0.0, 0.0]
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            self.records[full_name] = [elapsed, max(0.0, elapsed - children)]
+            if self._stack:
+                self._stack[-1] += elapsed
+
+    @staticmethod
+    def _resolve(name, globals, level):
+        """Göreli import adını tam modül adına çevir"""
+        if level == 0:
+            return name
+        package = (globals or {}).get('__package__') or ''
+        parts = package.split('.') if package else []
+        if level > 1:
+            parts = parts[:len(parts) - level + 1]
+        base = '.'.join(parts)
+        if not base:
+            return ''
+        return f'{base}.{name}' if name else base
+
+    def report(self, top=25):
+        """Kendi süresine göre en yavaş modüller ve paket bazında toplamlar"""
+        packages = {}
+        for module, (_, own) in self.records.items():
+            root = module.split('.')[0]
+            packages[root] = packages.get(root, 0.0) + own
+
+        lines = ['Paket bazında import süreleri:']
+        for package, own in sorted(packages.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append(f'  {own * 1000:9.1f} ms  {package}')
+        lines.append('')
+        lines.append('En yavaş modüller (kendi / toplam):')
+        slowest = sorted(self.records.items(), key=lambda kv: -kv[1][1])[:top]
+        for module, (total, own) in slowest:
+            lines.append(f'  {own * 1000:9.1f} ms / {total * 1000:9.1f} ms  {module}')
+        lines.append('')
+        lines.append(f'Toplam import süresi: {sum(packages.values()) * 1000:.1f} ms '
+                     f'({len(self.records)} modül)')
+        return '\n'.join(lines)
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modüller paket değil, depo kökünde duruyor
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ORDER_HEADER = ('NO', 'DESCRIPTION', 'CODE', 'QTTY', 'UNIT', 'U.PRICE', 'T.PRICE', 'REMARKS')
+
+
+@pytest.fixture
+def write_order(tmp_path):
+    """Ayrıştırıcının beklediği düzende küçük teklif yazan fonksiyon.
+
+    write_order(ad, item satırları, currency, discount, columns) dosyanın yolunu
+    döndürür; columns başlığın kaç sütun olduğudur (6: T.PRICE sütunu yok).
+    """
+    def write(name, rows, currency='USD', discount=10, columns=8):
+        from openpyxl import Workbook
+
+        wb = Workbook()
+        ws = wb.active
+        for row, (label, value) in enumerate((
+            ('DATE :', '01.01.2026'), ('RFQ REF :', f'RFQ-{name}'), ('QTN REF :', f'QTN-{name}'),
+            ('CURRENCY :', currency), ('DISC % :', discount),
+        ), start=3):
+            ws.cell(row, 1, label)
+            ws.cell(row, 2, value)
+        for col, title in enumerate(ORDER_HEADER[:columns], start=1):
+            ws.cell(9, col, title)
+        row = 9
+        for values in rows:
+            row += 1
+            for col, value in enumerate(values, start=1):
+                ws.cell(row, col, value)
+        ws.cell(row + 2, min(columns, 6), 'TOTAL')
+        path = tmp_path / name
+        wb.save(path)
+        return path
+    return write
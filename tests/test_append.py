@@ -0,0 +1,89 @@
+import pytest
+
+from merger_engine import WRITERS, CachedValues, MergeEngine, ParseCache
+from quote_generator import generate_quotes, write_quote
+
+
+def _formula_values(output_path):
+    cells = {}
+    for _, row in MergeEngine._iter_output_rows(output_path, columns=('G',)):
+        cells.update(row)
+    return cells
+
+
+def test_append_spills_cached_values_under_memory_limit(tmp_path, write_order, monkeypatch):
+    files = [write_order(f'Q{n}.xlsx', [(no, f'Item {no}', 'C', no, 'PCS', 1.25 * n) for no in range(1, 30)])
+             for n in range(1, 4)]
+    engine = MergeEngine(parse_cache=ParseCache(path=None), memory_limit=8 * 200 * 5)  # bellekte 5 kayıt
+    output = tmp_path / 'MERGED.xlsx'
+    engine.create_merged_file(files[:2], output)
+
+    spilled = []
+    set_item = CachedValues.__setitem__
+
+    def record(store, ref, value):
+        set_item(store, ref, value)
+        if store._spill is not None:
+            spilled.append(ref)
+    monkeypatch.setattr(CachedValues, '__setitem__', record)
+    stats = engine.append_merged_file(files[2:], output)
+
+    assert stats['append'] == {'reused': 2, 'rewritten': 1, 'rebuild_reason': None}
+    assert spilled, 'kayıtlı değerler bellek sınırında diske taşmalı'
+    assert all(r['ok'] for r in engine.verify_merged_file(output, stats))
+
+    full = tmp_path / 'FULL.xlsx'
+    engine.create_merged_file(files, full)
+    assert _formula_values(output) == _formula_values(full)
+
+
+def _sheet_snapshot(output_path):
+    """Çıktı sayfasının hücre hücre karşılaştırılabilir hali: değerler, stiller, birleştirmeler"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(output_path)
+    ws = wb.worksheets[0]
+    cells = {
+        cell.coordinate: (cell.value, cell.number_format, repr(cell.font), repr(cell.fill),
+                          repr(cell.border), repr(cell.alignment))
+        for row in ws.iter_rows() for cell in row if cell.value is not None or cell.has_style
+    }
+    return cells, sorted(str(r) for r in ws.merged_cells.ranges), ws.print_area
+
+
+def _assert_same_as_rebuild(engine, output, files, tmp_path):
+    full = tmp_path / 'FULL.xlsx'
+    engine.create_merged_file(files, full)
+    assert _sheet_snapshot(output) == _sheet_snapshot(full)
+    assert _formula_values(output) == _formula_values(full)
+
+
+@pytest.mark.parametrize('writer', WRITERS)
+def test_append_new_files_matches_full_merge(tmp_path, writer):
+    files = [path for path, _ in generate_quotes(tmp_path / 'quotes', files=4, items=12, seed=3)]
+    engine = MergeEngine(writer=writer, parse_cache=ParseCache(path=None))
+    output = tmp_path / 'MERGED.xlsx'
+    engine.create_merged_file(files[:2], output)
+
+    stats = engine.append_merged_file(files[2:], output)
+
+    assert stats['append'] == {'reused': 2, 'rewritten': 2, 'rebuild_reason': None}
+    assert all(r['ok'] for r in engine.verify_merged_file(output, stats))
+    _assert_same_as_rebuild(engine, output, files, tmp_path)
+
+
+@pytest.mark.parametrize('writer', WRITERS)
+def test_append_changed_middle_file_shifts_later_blocks(tmp_path, writer):
+    files = [path for path, _ in generate_quotes(tmp_path / 'quotes', files=3, items=10, seed=5)]
+    engine = MergeEngine(writer=writer, parse_cache=ParseCache(path=None))
+    output = tmp_path / 'MERGED.xlsx'
+    engine.create_merged_file(files, output)
+    old_starts = [entry['block']['start_row'] for entry in engine.load_manifest(output)['files']]
+
+    write_quote(files[1], items=25, seed=99)  # ortadaki dosya uzar, sonraki blok aşağı kayar
+    stats = engine.append_merged_file([], output)
+
+    assert stats['append'] == {'reused': 2, 'rewritten': 1, 'rebuild_reason': None}
+    assert stats['order_rows'][2]['start_row'] > old_starts[2]
+    assert all(r['ok'] for r in engine.verify_merged_file(output, stats))
+    _assert_same_as_rebuild(engine, output, files, tmp_path)
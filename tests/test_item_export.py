@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from merger_engine import EXPORT_COLUMNS, ItemExport, MergeEngine
+
+ORDER = {'file_name': 'QTN_001.xlsx', 'header_info': {'currency': 'EUR', 'discount_pct': 10.0}}
+ROWS = [
+    [1, 'Ball valve', 'BV-01', 37, 'PCS', 744.18],
+    [2, 'Flange', 'FL-2', 3.0, 'PCS', 84.57],      # pandas tam sayı QTTY'yi float okur
+    [3, 'O-ring', 'OR-3', 7, 'SET', 0.1],
+    [4, 'Hose', 'HS-4', 2.5, 'M', 4.0],
+    [5, 'Gasket', 'G-5', 'abc', 'PCS', 3.5],       # Excel'de #VALUE!
+]
+
+
+def _export(tmp_path, formats):
+    export = ItemExport(tmp_path / 'MERGED.xlsx', formats)
+    for no, row in enumerate(ROWS, start=1):
+        export.add(ORDER, no, row, MergeEngine._line_total(row))
+    export.close()
+    return export
+
+
+def test_csv_numbers_are_written_in_shortest_form(tmp_path):
+    _export(tmp_path, ('csv',))
+
+    text = (tmp_path / 'MERGED.csv').read_text(encoding='utf-8-sig')
+    assert text.splitlines() == [
+        ','.join(name for name, _ in EXPORT_COLUMNS),
+        'QTN_001.xlsx,,,EUR,10,1,Ball valve,BV-01,37,PCS,744.18,27534.66',
+        'QTN_001.xlsx,,,EUR,10,2,Flange,FL-2,3,PCS,84.57,253.71',
+        'QTN_001.xlsx,,,EUR,10,3,O-ring,OR-3,7,SET,0.1,0.7',
+        'QTN_001.xlsx,,,EUR,10,4,Hose,HS-4,2.5,M,4,10',
+        'QTN_001.xlsx,,,EUR,10,5,Gasket,G-5,,PCS,3.5,',
+    ]
+
+
+def test_jsonl_numbers_have_no_float_artifacts(tmp_path):
+    _export(tmp_path, ('jsonl',))
+
+    records = [json.loads(line) for line in
+               (tmp_path / 'MERGED.jsonl').read_text(encoding='utf-8').splitlines()]
+    assert [(r['qtty'], r['u_price'], r['t_price']) for r in records] == [
+        (37, 744.18, 27534.66), (3, 84.57, 253.71), (7, 0.1, 0.7), (2.5, 4, 10), (None, 3.5, None),
+    ]
+    assert records[0]['discount_pct'] == 10 and records[0]['no'] == 1
+
+
+def test_parquet_schema_is_typed(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _export(tmp_path, ('parquet',))
+    table = pq.read_table(tmp_path / 'MERGED.parquet')
+
+    types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'decimal': pa.float64()}
+    assert [(field.name, field.type) for field in table.schema] == \
+        [(name, types[kind]) for name, kind in EXPORT_COLUMNS]
+    rows = table.to_pylist()
+    assert rows[0]['no'] == 1 and rows[0]['u_price'] == 744.18 and rows[0]['t_price'] == 27534.66
+    assert rows[4]['qtty'] is None and rows[4]['t_price'] is None
+
+
+def test_export_matches_merged_workbook_for_narrow_quote(tmp_path, write_order):
+    from merger_engine import ParseCache
+
+    source = write_order('NARROW.xlsx', [(1, 'Flange', 'FL-1', 3, 'PCS', 84.57), (2, 'O-ring', 'OR-2', 7, 'PCS', 0.1)],
+                         columns=6)
+    output = tmp_path / 'MERGED.xlsx'
+    engine = MergeEngine(export_formats=('csv',), parse_cache=ParseCache(path=None))
+    stats = engine.create_merged_file([source], output)
+
+    lines = (tmp_path / 'MERGED.csv').read_text(encoding='utf-8-sig').splitlines()
+    assert [line.rsplit(',', 2)[1:] for line in lines[1:]] == [['84.57', '253.71'], ['0.1', '0.7']]
+    # Çalışma kitabında da her item'ın T.PRICE formülü var
+    assert all(r['ok'] for r in engine.verify_merged_file(output, stats))
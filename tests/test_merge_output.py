@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+import pytest
+
+from merger_engine import WRITERS, MergeEngine, ParseCache
+
+NARROW_ROWS = [(1, 'Ball valve', 'BV-1', 3, 'PCS', 84.57), (2, 'O-ring', 'OR-2', 7, 'PCS', 0.1)]
+
+
+def _output_cells(output_path):
+    cells = {}
+    for _, row in MergeEngine._iter_output_rows(output_path, columns=('G',)):
+        cells.update(row)
+    return cells
+
+
+@pytest.mark.parametrize('writer', WRITERS)
+def test_narrow_quote_gets_t_price_formula(tmp_path, write_order, writer):
+    source = write_order('NARROW.xlsx', NARROW_ROWS, columns=6)
+    output = tmp_path / 'MERGED.xlsx'
+    engine = MergeEngine(writer=writer, parse_cache=ParseCache(path=None))
+    block = engine.create_merged_file([source], output)['order_rows'][0]
+
+    cells = _output_cells(output)
+    first, total_row = block['first_row'], block['total_row']
+    for row in (first, first + 1):
+        assert cells[f'G{row}'][0] == f'D{row}*F{row}'
+    formula, value = cells[f'G{total_row}']
+    assert formula == f'SUM(G{first}:G{first + 1})'
+    assert abs(Decimal(value) - Decimal('254.41')) < Decimal('1e-9')
+    # Item ve toplam satırlarında kayıtlı değer sadece formül hücrelerinde
+    for row in range(first, block['gtotal_row'] + 1):
+        formula, value = cells.get(f'G{row}', (None, None))
+        assert formula or value is None, f'G{row}'
+
+
+@pytest.mark.parametrize('reader', ['pandas', 'streaming'])
+@pytest.mark.parametrize('writer', WRITERS)
+def test_verification_passes_for_narrow_text_and_empty_quotes(tmp_path, write_order, reader, writer):
+    files = [
+        write_order('NARROW.xlsx', NARROW_ROWS, columns=6),
+        write_order('TEXT_QTY.xlsx', [(1, 'Gasket', 'G-1', 'two', 'PCS', 3.5),
+                                      (2, 'Flange', 'F-2', 4, 'PCS', 12.25, 49, 'Stock')], currency='EUR'),
+        write_order('EMPTY.xlsx', [], discount=0),
+        write_order('WIDE.xlsx', [(1, 'Pump', 'P-1', 2.5, 'SET', 1999.99, 4999.98)], discount=12.5),
+    ]
+    output = tmp_path / 'MERGED.xlsx'
+    engine = MergeEngine(reader=reader, writer=writer, parse_cache=ParseCache(path=None))
+    stats = engine.create_merged_file(files, output)
+
+    assert stats['orders'] == 4 and stats['skipped'] == []
+    results = engine.verify_merged_file(output, stats)
+    assert [r['problems'] for r in results if not r['ok']] == []
+    assert [r['file_name'] for r in results][-1] == 'GRAND SUMMARY'
+    assert results[1]['total'] is None  # metin QTTY: Excel'de #VALUE!
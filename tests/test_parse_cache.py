@@ -0,0 +1,108 @@
+import os
+import shutil
+
+import merger_engine
+from merger_engine import ParseCache
+
+
+class CountingParser:
+    """Her çağrıda dosyanın içeriğini döndüren ve çağrıları sayan ayrıştırıcı"""
+
+    def __init__(self, payload=b''):
+        self.calls = []
+        self.payload = payload
+
+    def __call__(self, path):
+        self.calls.append(path.name)
+        return {'file_name': path.name, 'content': path.read_bytes(), 'payload': self.payload}
+
+
+def _write(path, data, mtime_ns=None):
+    path.write_bytes(data)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_unchanged_file_is_parsed_once(tmp_path):
+    cache, parse = ParseCache(path=None), CountingParser()
+    path = _write(tmp_path / 'a.xlsx', b'first')
+    assert cache.get_or_parse(path, parse)['content'] == b'first'
+    assert cache.get_or_parse(path, parse)['content'] == b'first'
+    assert parse.calls == ['a.xlsx']
+
+
+def test_size_or_content_change_invalidates(tmp_path):
+    cache, parse = ParseCache(path=None), CountingParser()
+    path = _write(tmp_path / 'a.xlsx', b'first', mtime_ns=10 ** 18)
+    cache.get_or_parse(path, parse)
+
+    _write(path, b'longer content', mtime_ns=10 ** 18)  # boyut değişti, mtime aynı
+    assert cache.get_or_parse(path, parse)['content'] == b'longer content'
+    _write(path, b'LONGER CONTENT', mtime_ns=2 * 10 ** 18)  # boyut aynı, içerik ve mtime değişti
+    assert cache.get_or_parse(path, parse)['content'] == b'LONGER CONTENT'
+    assert len(parse.calls) == 3
+
+
+def test_mtime_change_with_same_content_hits_by_hash(tmp_path):
+    cache, parse = ParseCache(path=None), CountingParser()
+    path = _write(tmp_path / 'a.xlsx', b'same', mtime_ns=10 ** 18)
+    cache.get_or_parse(path, parse)
+
+    os.utime(path, ns=(2 * 10 ** 18, 2 * 10 ** 18))
+    assert cache.get_or_parse(path, parse)['content'] == b'same'
+    copy = shutil.copy(path, tmp_path / 'copy.xlsx')
+    assert cache.get_or_parse(copy, parse)['file_name'] == 'copy.xlsx'
+    assert parse.calls == ['a.xlsx']
+
+
+def test_variants_are_cached_separately(tmp_path):
+    cache = ParseCache(path=None)
+    path = _write(tmp_path / 'a.xlsx', b'data')
+    pandas, streaming = CountingParser('pandas'), CountingParser('streaming')
+    assert cache.get_or_parse(path, pandas, variant='pandas')['payload'] == 'pandas'
+    assert cache.get_or_parse(path, streaming, variant='streaming')['payload'] == 'streaming'
+    assert cache.get_or_parse(path, pandas, variant='pandas')['payload'] == 'pandas'
+    assert (pandas.calls, streaming.calls) == (['a.xlsx'], ['a.xlsx'])
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    parse = CountingParser(os.urandom(4000))  # sıkışmayan kayıt: ~4 KB
+    cache = ParseCache(path=None, max_bytes=10000)
+    a, b, c = (_write(tmp_path / f'{name}.xlsx', name.encode()) for name in 'abc')
+    cache.get_or_parse(a, parse)
+    cache.get_or_parse(b, parse)
+    cache.get_or_parse(a, parse)  # a en son kullanılan olur
+    cache.get_or_parse(c, parse)  # sınır aşılır, b atılır
+
+    assert parse.calls == ['a.xlsx', 'b.xlsx', 'c.xlsx']
+    assert cache.lookup(a)[0] is not ParseCache.MISS
+    assert cache.lookup(b)[0] is ParseCache.MISS
+    assert cache._size <= cache.max_bytes
+
+
+def test_flushed_cache_is_reloaded_unless_version_changes(tmp_path, monkeypatch):
+    store = tmp_path / '.merger_parse_cache'
+    path = _write(tmp_path / 'a.xlsx', b'data')
+    cache = ParseCache(path=store)
+    cache.get_or_parse(path, CountingParser())
+    cache.flush()
+
+    parse = CountingParser()
+    ParseCache(path=store).get_or_parse(path, parse)
+    assert parse.calls == []
+
+    monkeypatch.setattr(merger_engine, 'PARSE_CACHE_VERSION', merger_engine.PARSE_CACHE_VERSION + 1)
+    ParseCache(path=store).get_or_parse(path, parse)
+    assert parse.calls == ['a.xlsx']
+
+
+def test_engine_variant_separates_readers_and_read_budgets():
+    from merger_engine import MergeEngine
+
+    engine = MergeEngine(reader='streaming', parse_cache=ParseCache(path=None))
+    assert engine.cache_variant('a.xlsx') == ('streaming', 'streaming')
+    engine.read_budget = (500, 1024)
+    assert engine.cache_variant('a.xlsx') == ('streaming', 'streaming@500/1024')
+    engine.reader = 'pandas'
+    assert engine.cache_variant('a.xlsx')[1] == 'pandas@500/1024'
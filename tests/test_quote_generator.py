@@ -0,0 +1,51 @@
+import merge_benchmark
+from merger_engine import MergeEngine
+from quote_generator import generate_quotes
+
+
+def test_generated_quotes_parse_to_their_item_counts(tmp_path):
+    written = generate_quotes(tmp_path / 'a', files=5, items=12, seed=7, bloat=0.4)
+    again = generate_quotes(tmp_path / 'b', files=5, items=12, seed=7, bloat=0.4)
+    assert [count for _, count in written] == [count for _, count in again]
+
+    bloated = 0
+    for path, count in written:
+        assert MergeEngine.count_order_items(path) == count
+        data = MergeEngine.parse_order_file(path)
+        assert len(data['data_rows']) == count
+        assert data['header_info']['rfq_ref'].startswith('RFQ-2026-')
+        extent = MergeEngine.sheet_extent(path)
+        if extent is not None:
+            assert extent['dimension'].endswith(':XFD1048576')
+            bloated += 1
+    assert 0 < bloated < len(written)
+
+
+def test_benchmark_measures_generated_dataset(tmp_path):
+    files = merge_benchmark.dataset(3, 8, seed=1, bloat=0.0, root=tmp_path)
+    assert merge_benchmark.dataset(3, 8, seed=1, bloat=0.0, root=tmp_path) == files  # yeniden kullanılır
+
+    cache_path = tmp_path / 'parse_cache'
+    result = merge_benchmark.measure_parse(files, cache_path)
+    result.update(merge_benchmark.measure_merge(files, cache_path))
+    assert result['files'] == 3
+    assert result['items'] == sum(len(MergeEngine.parse_order_file(p)['data_rows']) for p in files)
+    assert all(result[key] >= 0 for key in merge_benchmark.TIME_METRICS)
+    assert result['output_bytes'] > 0
+
+
+def test_compare_reports_only_regressions_beyond_tolerance_and_noise():
+    settings = {'items': 25}
+
+    def report(parse, peak):
+        return {'version': merge_benchmark.BENCHMARK_VERSION, 'settings': settings,
+                'results': {'100': {'scan': 0.1, 'parse': parse, 'merge': 1.0, 'save': 0.5,
+                                    'parse_memory': None, 'peak_memory': peak}}}
+
+    baseline = report(2.0, 100 * 1024 * 1024)
+    assert merge_benchmark.compare(report(2.3, 110 * 1024 * 1024), baseline) == []
+    assert merge_benchmark.compare(report(3.0, 200 * 1024 * 1024), baseline) == [
+        ('100', 'parse', 2.0, 3.0), ('100', 'peak_memory', 100 * 1024 * 1024, 200 * 1024 * 1024),
+    ]
+    other = dict(baseline, settings={'items': 50})
+    assert merge_benchmark.compare(report(3.0, 200 * 1024 * 1024), other) == []
@@ -0,0 +1,107 @@
+import math
+import re
+import zipfile
+
+import pytest
+
+from merger_engine import MergeEngine, ParseCache
+from quote_generator import generate_quotes
+
+READERS = ['pandas', 'streaming']
+
+
+def _items(count):
+    return [(no, f'Item {no}', f'C-{no}', 1, 'PCS', 2.5) for no in range(1, count + 1)]
+
+
+def _drop_dimension(path):
+    """Sayfanın <dimension> öğesini sil (boyutu bilinmeyen sayfa: şişkin sayılmaz)"""
+    with zipfile.ZipFile(path) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+    sheet = 'xl/worksheets/sheet1.xml'
+    parts[sheet] = re.sub(rb'<dimension [^>]*/>', b'', parts[sheet])
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_row_budget_does_not_cap_sheets_that_are_not_bloated(write_order, reader):
+    path = write_order('LONG.xlsx', _items(40))
+    _drop_dimension(path)
+    assert MergeEngine.sheet_extent(path, (30, 1 << 30)) is None
+
+    data = MergeEngine.parse_order_file(path, reader, budget=(30, 1 << 30))
+    assert len(data['data_rows']) == 40
+    assert 'truncated' not in data and 'bloated_dimension' not in data
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_budget_that_cuts_the_item_area_marks_order_truncated(tmp_path, write_order, reader):
+    path = write_order('LONG.xlsx', _items(40))
+    data = MergeEngine.parse_order_file(path, reader, budget=(30, 1 << 30))
+    assert data['truncated'] == 30
+    assert len(data['data_rows']) == 30 - 9  # NO başlığı 9. satırda
+
+    engine = MergeEngine(reader=reader, parse_cache=ParseCache(path=None), read_budget=(30, 1 << 30))
+    output = tmp_path / 'MERGED.xlsx'
+    stats = engine.create_merged_file([path], output)
+    result, = engine.verify_merged_file(output, stats)
+    assert not result['ok']
+    assert any('kesildi' in problem for problem in result['problems'])
+
+
+@pytest.mark.parametrize('reader', READERS)
+def test_bloated_sheet_within_budget_is_not_truncated(tmp_path, reader):
+    from quote_generator import write_quote
+
+    path = tmp_path / 'BLOATED.xlsx'
+    count = write_quote(path, items=10, bloat=True)
+    data = MergeEngine.parse_order_file(path, reader)
+    assert data['bloated_dimension'].endswith(':XFD1048576')
+    assert len(data['data_rows']) == count
+    assert 'truncated' not in data
+
+
+def _comparable(data):
+    """Okuyucu sonucunu karşılaştırılabilir yap: NaN -> None, satır sonundaki boşluklar atılır.
+
+    Akış okuyucusu satırları TOTAL'e kadar görülen en geniş satıra göre doldurur,
+    pandas tüm sayfaya bakar; aradaki fark sadece sondaki boş sütunlardır.
+    """
+    rows = []
+    for row in data['data_rows']:
+        row = [None if isinstance(v, float) and math.isnan(v) else v for v in row]
+        while row and row[-1] is None:
+            row.pop()
+        rows.append(row)
+    return {**data, 'data_rows': rows}
+
+
+@pytest.fixture(scope='module')
+def generated_quotes(tmp_path_factory):
+    folder = tmp_path_factory.mktemp('quotes')
+    return generate_quotes(folder, files=6, items=15, seed=11, bloat=0.5)
+
+
+@pytest.mark.parametrize('reader', ['streaming', 'calamine'])
+def test_readers_return_same_rows_as_pandas(generated_quotes, reader):
+    if reader == 'calamine':
+        pytest.importorskip('python_calamine')
+    bloated = 0
+    for path, count in generated_quotes:
+        expected = _comparable(MergeEngine.parse_order_file(path, 'pandas'))
+        assert len(expected['data_rows']) == count
+        assert _comparable(MergeEngine.parse_order_file(path, reader)) == expected, path.name
+        bloated += 'bloated_dimension' in expected
+    assert 0 < bloated < len(generated_quotes)
+
+
+@pytest.mark.parametrize('reader', ['streaming', 'calamine'])
+def test_readers_agree_on_narrow_and_text_cells(write_order, reader):
+    if reader == 'calamine':
+        pytest.importorskip('python_calamine')
+    path = write_order('MIXED.xlsx', [(1, 'Valve', 'V-1', 'two', 'PCS', 3.5), ('2A', 'Seal', None, 4.0, 'NA', 0.1),
+                                      ('2B', 'Seal', 'S-2', 1, None, None)], columns=6)
+    assert _comparable(MergeEngine.parse_order_file(path, reader)) == \
+        _comparable(MergeEngine.parse_order_file(path, 'pandas'))
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from merger_engine import HEAVY_MODULES, STARTUP_BUDGET_SECONDS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# final_list_merger'in arayüz dışı bağımlılıkları; temiz bir süreçte import edilir
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import merger_engine, scan_scheduler, folder_watcher, output_shards
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+# Arayüz süreci gibi: ana modül final_list_merger.py iken spawn ile işçi başlatılır;
+# işçi ana betiği __mp_main__ olarak yeniden import eder
+SPAWN_SCRIPT = """
+import json, multiprocessing, sys
+from concurrent.futures import ProcessPoolExecutor
+sys.modules['__main__'].__file__ = 'final_list_merger.py'
+if __name__ == '__main__':
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        modules = pool.submit(eval, "sorted(__import__('sys').modules)").result()
+    print(json.dumps(modules))
+"""
+GUI_MODULES = ('tkinter', 'customtkinter', 'tkinterdnd2')
+
+
+def _has_display():
+    if sys.platform.startswith('linux'):
+        return bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return True
+
+
+def test_engine_imports_skip_heavy_modules_and_fit_budget():
+    proc = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], cwd=ROOT,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    loaded = [name for name in HEAVY_MODULES if name in result['modules']]
+    assert loaded == [], f'ağır modüller açılışta yüklendi: {loaded}'
+    assert result['elapsed'] < STARTUP_BUDGET_SECONDS
+
+
+def test_spawned_workers_do_not_load_gui_or_heavy_modules():
+    proc = subprocess.run([sys.executable, '-c', SPAWN_SCRIPT], cwd=ROOT,
+                          capture_output=True, text=True, timeout=120)
+    assert proc.returncode == 0, proc.stderr
+    modules = set(json.loads(proc.stdout.strip().splitlines()[-1]))
+    assert '__mp_main__' in modules  # ana betik işçide gerçekten yüklendi
+    loaded = [name for name in GUI_MODULES + HEAVY_MODULES if name in modules]
+    assert loaded == [], f'işçi süreçte yüklendi: {loaded}'
+
+
+def test_window_opens_within_budget():
+    pytest.importorskip('customtkinter')
+    if not _has_display():
+        pytest.skip('pencere açmak için ekran gerekir')
+    proc = subprocess.run([sys.executable, 'final_list_merger.py', '--startup-budget'], cwd=ROOT,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert 'UYGUN' in proc.stdout